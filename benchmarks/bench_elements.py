@@ -0,0 +1,46 @@
+"""Construction cost and memory footprint of optical elements.
+
+Usage:
+    python benchmarks/bench_elements.py [count]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from optix.matrixopt import FreeSpace, ThinLens, CurvedInterface, ThickLens, PlanoConvexLens
+
+CASES = {
+    "FreeSpace": lambda i: FreeSpace(0.001 * (i % 100 + 1)),
+    "ThinLens": lambda i: ThinLens(0.01 * (i % 100 + 1)),
+    "CurvedInterface": lambda i: CurvedInterface(1, 1.5, 0.01 * (i % 100 + 1)),
+    "ThickLens": lambda i: ThickLens(0.01 * (i % 100 + 1), 1.5, 0.02, 0.005),
+    "PlanoConvexLens": lambda i: PlanoConvexLens(0.01 * (i % 100 + 1), 0.005, 1.5),
+}
+
+
+def measure(factory, count: int):
+    """Returns (seconds per element, bytes per element) for building count elements."""
+    gc.collect()
+    start = time.perf_counter()
+    elements = [factory(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    del elements
+
+    gc.collect()
+    tracemalloc.start()
+    elements = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del elements
+    return elapsed / count, size / count
+
+
+def main(count: int = 20000):
+    print(f"{'element':<18}{'us/element':>12}{'bytes/element':>16}")
+    for name, factory in CASES.items():
+        seconds, size = measure(factory, count)
+        print(f"{name:<18}{seconds * 1e6:>12.2f}{size:>16.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
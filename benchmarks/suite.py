@@ -0,0 +1,177 @@
+"""Reproducible timing suite guarding the hot paths against performance regressions.
+
+Every case is timed in repeated rounds of an automatically calibrated number of calls and
+reported by its best (min) and median time per call; inputs are deterministic and nothing
+needs a network or a display (Drawer uses the Agg backend). Results are stored as JSON
+baselines and later runs are compared against them case by case on the best time.
+
+Usage:
+    python benchmarks/suite.py                          # print timings
+    python benchmarks/suite.py --save baseline.json     # record a baseline
+    python benchmarks/suite.py --compare baseline.json  # exit code 1 when a case is slower than
+                                                        # threshold x baseline (default 1.3)
+    python benchmarks/suite.py -k propagate --quick     # subset of cases, fewer rounds
+
+Run it with optix importable (installed, or PYTHONPATH pointing at the repository). Baselines
+only compare meaningfully on the machine that recorded them.
+"""
+import argparse
+import gc
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from bench_elements import CASES as ELEMENT_CASES
+from optix.matrixopt import OpticalPath, FreeSpace, ThinLens
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+PATH_LENGTHS = (1, 10, 100, 1000, 10000)
+ARRAY_SIZE = 1_000_000
+
+# name -> setup returning the callable that is timed
+Case = Callable[[], Callable[[], object]]
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(setup: Case) -> Case:
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _elements(n: int) -> list:
+    """Deterministic alternating free spaces and lenses."""
+    return [FreeSpace(0.01 * (i % 10 + 1)) if i % 2 == 0 else ThinLens(0.05 * (i % 7 + 1)) for i in range(n)]
+
+
+BEAM = GaussianBeam(633e-9, w0=1e-3)
+
+for _name in ("ThickLens", "PlanoConvexLens"):
+    # Construction of 100 elements, the factories are shared with bench_elements.py
+    case(f"construct/{_name}/100")(lambda factory=ELEMENT_CASES[_name]: lambda: [factory(i) for i in range(100)])
+
+for _n in PATH_LENGTHS:
+    # A fresh path builds its matrix on the first propagation, a reused path hits the cache
+    case(f"propagate/build/{_n}")(lambda elements=_elements(_n): lambda: OpticalPath(*elements).propagate(BEAM))
+
+    @case(f"propagate/cached/{_n}")
+    def _propagate_cached(n=_n):
+        path = OpticalPath(*_elements(n))
+        path.propagate(BEAM)
+        return lambda: path.propagate(BEAM)
+
+
+@case(f"cbeam_parameter/GaussianBeam/{ARRAY_SIZE}")
+def _cbeam_parameter():
+    z = np.linspace(-1, 1, ARRAY_SIZE)
+    return lambda: BEAM.cbeam_parameter(z)
+
+
+@case(f"cbeam_parameter/GaussianBeamArray/{ARRAY_SIZE}")
+def _cbeam_parameter_array():
+    beams = GaussianBeamArray(np.linspace(400e-9, 1600e-9, ARRAY_SIZE), w0=1e-3)
+    return lambda: beams.cbeam_parameter(0.5)
+
+
+@case("draw/Drawer/10")
+def _draw():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from optix.matrixopt import Drawer
+    path = OpticalPath(*_elements(10))
+
+    def draw():
+        figure = Drawer(path, BEAM).draw()
+        figure.canvas.draw()
+        plt.close(figure)
+    return draw
+
+
+def measure(function: Callable[[], object], rounds: int = 7, min_time: float = 0.05) -> Dict[str, float]:
+    """Seconds per call, best and median over rounds of a calibrated number of calls."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(1.2 * min_time / elapsed) + 1))
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"min": min(times), "median": statistics.median(times), "number": number, "rounds": rounds}
+
+
+def run(pattern: str = None, rounds: int = 7, min_time: float = 0.05) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, setup in CASES.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        results[name] = measure(setup(), rounds, min_time)
+        print(f"{name:<44}{results[name]['min'] * 1e6:>14.2f} us{results[name]['median'] * 1e6:>14.2f} us", flush=True)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform()}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[Tuple[str, float]]:
+    """Cases whose best time exceeds threshold times their baseline, with the ratio."""
+    slower = []
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result["min"] / baseline[name]["min"]
+            if ratio > threshold:
+                slower.append((name, ratio))
+    return slower
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Times the optix hot paths.")
+    parser.add_argument("-k", dest="pattern", help="Only run cases matching this regular expression.")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="FILE", help="JSON baseline to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.3, help="Allowed slowdown factor against the baseline.")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per case.")
+    parser.add_argument("--quick", action="store_true", help="Three short rounds per case.")
+    args = parser.parse_args(argv)
+
+    rounds, min_time = (3, 0.01) if args.quick else (args.rounds, 0.05)
+    print(f"{'case':<44}{'best':>17}{'median':>17}")
+    results = run(args.pattern, rounds, min_time)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        slower = compare(results, baseline, args.threshold)
+        for name, ratio in slower:
+            print(f"REGRESSION {name}: {ratio:.2f}x the baseline (allowed {args.threshold:.2f}x)")
+        missing = sorted(set(results) - set(baseline))
+        if missing:
+            print(f"No baseline for {', '.join(missing)}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
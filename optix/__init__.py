@@ -1,2 +1,7 @@
 import optix.beams
-import optix.matrixopt
\ No newline at end of file
+import optix.matrixopt
+import optix.optimize
+import optix.instrumentation
+
+# OPTIX_INSTRUMENT switches instrumentation on for the whole process
+optix.instrumentation._enable_from_environment()
@@ -1 +1,4 @@
-from optix.beams.beams import *
\ No newline at end of file
+from optix.beams.beams import *
+from optix.beams.field import *
+from optix.beams.coupling import *
+from optix.beams.modes import *
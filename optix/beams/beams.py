@@ -3,7 +3,7 @@ from collections import namedtuple
 import numpy as np
 from typing import Union
 
-__all__ = ["GaussianBeam"]
+__all__ = ["GaussianBeam", "GaussianBeamArray"]
 
 class GaussianBeam:
     _SUPPORTED_KWARGS = ["w0", "zr", "div"] #waist radius, rayleigh range, divergence
@@ -99,9 +99,143 @@ class GaussianBeam:
 
     def cbeam_parameter(self, z: Union[complex, np.ndarray]) -> Union[complex, np.ndarray]:
         if isinstance(z, np.ndarray):
-            return np.array([self.cbeam_parameter(i) for i in z])
+            return (z - self.waist_location) + 1j * self.rayleigh_range
         return complex(z- self.waist_location, self.rayleigh_range)
 
 
 class LaserBeam(GaussianBeam):
-    pass
\ No newline at end of file
+    pass
+
+
+class GaussianBeamArray:
+    """Batch of gaussian beams stored as contiguous arrays (struct of arrays).
+
+    All beam parameters are broadcast to one common shape, so every method evaluates
+    the whole batch with a single NumPy expression instead of a per-beam Python loop.
+    Positions passed to beam_radius, curviture and cbeam_parameter follow the usual
+    NumPy broadcasting rules against the batch shape.
+    """
+    _SUPPORTED_KWARGS = GaussianBeam._SUPPORTED_KWARGS
+
+    @property
+    def divergence(self) -> np.ndarray:
+        return self._wavelength / (np.pi * self.waist_radius * self._refractive_index)
+
+    @property
+    def waist_radius(self) -> np.ndarray:
+        return np.sqrt((self._wavelength * self._rayleigh_range) / (np.pi * self._refractive_index))
+
+    @property
+    def rayleigh_range(self) -> np.ndarray:
+        return self._rayleigh_range
+
+    @property
+    def wavelength(self) -> np.ndarray:
+        return self._wavelength
+
+    @property
+    def refractive_index(self) -> np.ndarray:
+        return self._refractive_index
+
+    @property
+    def amplitude(self) -> np.ndarray:
+        return self._amplitude
+
+    @property
+    def waist_location(self) -> np.ndarray:
+        return self._waist_location
+
+    @property
+    def shape(self) -> tuple:
+        return self._wavelength.shape
+
+    @property
+    def size(self) -> int:
+        return self._wavelength.size
+
+    def __init__(self,
+                wave_length,
+                amplitude = 1,
+                refractive_index = 1,
+                waist_location = 0,
+                **beam_param) -> None:
+        """
+        Args:
+            wave_length, amplitude, refractive_index, waist_location: Scalars or arrays broadcastable to a common shape.
+            beam_param: Specifiy one of the following parameters: waist radius ("w0"), rayleigh range ("zr"), divergence ("div")
+
+        Raises:
+            ValueError: When no or more then 1 beam parameter is presented.
+        """
+        if len(beam_param) != 1 or not list(beam_param)[0] in self._SUPPORTED_KWARGS:
+            raise ValueError(f"One of {', '.join(self._SUPPORTED_KWARGS)} arguments must be presented!")
+        name, value = next(iter(beam_param.items()))
+
+        arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (wave_length, amplitude, refractive_index, waist_location, value)))
+        wave_length, amplitude, refractive_index, waist_location, value = (np.ascontiguousarray(a) for a in arrays)
+
+        if name == "w0":
+            rayleigh_range = np.pi * refractive_index * value**2 / wave_length
+        elif name == "div":
+            rayleigh_range = wave_length / (np.pi * refractive_index * value**2)
+        else:
+            rayleigh_range = value
+
+        self._wavelength = wave_length
+        self._amplitude = amplitude
+        self._refractive_index = refractive_index
+        self._waist_location = waist_location
+        self._rayleigh_range = rayleigh_range
+
+    @staticmethod
+    def from_q(wave_length, q: np.ndarray, z_pos, refractive_index=1, amplitude=1) -> GaussianBeamArray:
+        """Creates a GaussianBeamArray from an array of complex beam parameters "q".
+
+        Args:
+            q (np.ndarray): complex beam parameters
+            z_pos (float or np.ndarray): position at which the complex beam parameters have been evaluated
+        """
+        q = np.asarray(q)
+        return GaussianBeamArray(wave_length, amplitude, refractive_index, z_pos - q.real, zr=q.imag)
+
+    @staticmethod
+    def from_beams(beams) -> GaussianBeamArray:
+        """Packs an iterable of GaussianBeam instances into a single GaussianBeamArray."""
+        beams = list(beams)
+        return GaussianBeamArray(
+            [b.wavelength for b in beams],
+            [b.amplitude for b in beams],
+            [b.refractive_index for b in beams],
+            [b.waist_location for b in beams],
+            zr=[b.rayleigh_range for b in beams])
+
+    def __len__(self) -> int:
+        return len(self._wavelength)
+
+    def __getitem__(self, index) -> Union[GaussianBeam, GaussianBeamArray]:
+        if np.ndim(self._wavelength[index]) == 0:
+            return GaussianBeam(
+                float(self._wavelength[index]),
+                float(self._amplitude[index]),
+                float(self._refractive_index[index]),
+                float(self._waist_location[index]),
+                zr=float(self._rayleigh_range[index]))
+        return GaussianBeamArray(
+            self._wavelength[index],
+            self._amplitude[index],
+            self._refractive_index[index],
+            self._waist_location[index],
+            zr=self._rayleigh_range[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def beam_radius(self, z: Union[float, np.ndarray]) -> np.ndarray:
+        return self.waist_radius * np.sqrt(1 + ((z - self._waist_location) / self._rayleigh_range)**2)
+
+    def curviture(self, z: Union[float, np.ndarray]) -> np.ndarray:
+        return (z - self._waist_location) * (1 + (self._rayleigh_range / (z - self._waist_location))**2)
+
+    def cbeam_parameter(self, z: Union[float, np.ndarray]) -> np.ndarray:
+        return (z - self._waist_location) + 1j * self._rayleigh_range
\ No newline at end of file
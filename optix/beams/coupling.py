@@ -0,0 +1,48 @@
+import numpy as np
+
+__all__ = ["mode_overlap", "coupling_efficiency"]
+
+
+def mode_overlap(q, q_target, wavelength, offset=0, tilt=0, refractive_index=1) -> np.ndarray:
+    """Power coupling efficiency between two 1-D Gaussian modes given by their complex beam parameters.
+
+    With a = ik / (2q) the modes are exp(-a x^2) and exp(-a_t (x - offset)^2 - ik tilt x), so the
+    overlap integral has the closed form
+    2 sqrt(Re a Re a_t) / |s| exp(2 Re(t^2 / (4s) - b offset^2)), b = conj(a_t), s = a + b, t = 2 b offset + ik tilt.
+    All arguments broadcast against each other.
+
+    Args:
+        q, q_target (complex or np.ndarray): Complex beam parameters of the beam and the target mode, taken at the same plane.
+        wavelength (float or np.ndarray): Vacuum wavelength.
+        offset (float or np.ndarray): Lateral offset of the target mode.
+        tilt (float or np.ndarray): Tilt of the target mode in radians.
+        refractive_index (float): Refractive index at the plane of the overlap.
+    """
+    k = 2 * np.pi * refractive_index / np.asarray(wavelength, dtype=float)
+    a = 1j * k / (2 * np.asarray(q, dtype=complex))
+    b = np.conj(1j * k / (2 * np.asarray(q_target, dtype=complex)))
+    s = a + b
+    t = 2 * b * offset + 1j * k * tilt
+    return 2 * np.sqrt(a.real * b.real) / np.abs(s) * np.exp(2 * (t**2 / (4 * s) - b * offset**2).real)
+
+
+def coupling_efficiency(beam, target, z=0, offset=(0, 0), tilt=(0, 0), sagittal=None, target_sagittal=None) -> np.ndarray:
+    """Fraction of the beam power coupled into a target Gaussian mode, e.g. a fiber mode or a cavity eigenmode.
+
+    The 2-D efficiency is the product of the overlaps in x and y, see mode_overlap. No field
+    is sampled, so the cost does not depend on any grid and batches evaluate in one pass.
+
+    Args:
+        beam (GaussianBeam or GaussianBeamArray): Beam (batch) in the x plane.
+        target (GaussianBeam or GaussianBeamArray): Target mode in the x plane, in the same medium.
+        z (float): Plane at which both are compared, any plane gives the same result for aligned modes.
+        offset (tuple): Lateral (x, y) offset of the target mode, entries may be arrays.
+        tilt (tuple): Tilt (x, y) of the target mode in radians, entries may be arrays.
+        sagittal, target_sagittal (optional): Beams in the y plane for elliptical beams, default to the x plane ones.
+    """
+    sagittal = beam if sagittal is None else sagittal
+    target_sagittal = target if target_sagittal is None else target_sagittal
+    overlap = [
+        mode_overlap(b.cbeam_parameter(z), t.cbeam_parameter(z), b.wavelength, o, a, b.refractive_index)
+        for b, t, o, a in ((beam, target, offset[0], tilt[0]), (sagittal, target_sagittal, offset[1], tilt[1]))]
+    return overlap[0] * overlap[1]
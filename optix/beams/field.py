@@ -0,0 +1,76 @@
+import numpy as np
+
+__all__ = ["field", "intensity"]
+
+
+def _profile(beam, coordinate: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """One dimensional factor sqrt(q0/q) exp(-i k u^2 / (2q)) of the field, shape (len(z), len(u))."""
+    k = 2 * np.pi * beam.refractive_index / beam.wavelength
+    q = np.asarray(beam.cbeam_parameter(z), dtype=complex)[:, None]
+    q0 = 1j * beam.rayleigh_range
+    return np.sqrt(q0 / q) * np.exp(-0.5j * k * coordinate[None, :]**2 / q)
+
+
+def _prepare(x, y, z, out, dtype, default_dtype):
+    x = np.asarray(x, dtype=float).reshape(-1)
+    y = np.asarray(y, dtype=float).reshape(-1)
+    scalar_z = np.ndim(z) == 0
+    z = np.asarray(z, dtype=float).reshape(-1)
+    shape = (len(z), len(y), len(x))
+    if out is None:
+        out = np.empty(shape[1:] if scalar_z else shape, dtype=dtype or default_dtype)
+    elif out.shape != (shape[1:] if scalar_z else shape):
+        raise ValueError(f"Output array must have shape {shape[1:] if scalar_z else shape}, got {out.shape}.")
+    # A plane view of a 2-D output, so memory mapped outputs are written in place
+    planes = out[None] if out.ndim == 2 else out
+    return x, y, z, out, planes
+
+
+def field(beam, x, y, z=0, sagittal=None, out: np.ndarray = None, dtype=None, chunk_size: int = 8) -> np.ndarray:
+    """Complex transverse field E(x, y, z) of a Gaussian beam on a rectangular grid.
+
+    The field is A sqrt(q0x/qx) sqrt(q0y/qy) exp(-ik x^2/(2qx) - ik y^2/(2qy)) exp(-ikz), i.e. the
+    peak amplitude A at the waist, the Gouy phase and the wavefront curvature included. It is
+    separable, so only 1-D profiles along x and y are evaluated and every plane is their outer
+    product, written straight into the output. Planes are processed chunk_size at a time.
+
+    Args:
+        beam (GaussianBeam): Beam in the x (tangential) plane.
+        x, y (np.ndarray): 1-D grid coordinates.
+        z (float or np.ndarray): Position(s) along the beam axis.
+        sagittal (GaussianBeam, optional): Beam in the y plane for elliptical beams, defaults to "beam".
+        out (np.ndarray, optional): Preallocated (or np.memmap) output of shape (len(z), len(y), len(x)),
+            (len(y), len(x)) for scalar z. Its dtype takes precedence over "dtype".
+        dtype (optional): np.complex128 (default) or np.complex64 to halve memory.
+        chunk_size (int): Number of z planes evaluated at once.
+
+    Returns:
+        np.ndarray: Field of shape (len(z), len(y), len(x)), or (len(y), len(x)) for scalar z.
+    """
+    sagittal = beam if sagittal is None else sagittal
+    x, y, z, out, planes = _prepare(x, y, z, out, dtype, np.complex128)
+    k = 2 * np.pi * beam.refractive_index / beam.wavelength
+    for start in range(0, len(z), chunk_size):
+        chunk = z[start:start + chunk_size]
+        profile_x = _profile(beam, x, chunk)
+        profile_y = _profile(sagittal, y, chunk)
+        # Amplitude and carrier are folded into the 1-D y profile
+        profile_y *= (beam.amplitude * np.exp(-1j * k * chunk))[:, None]
+        np.multiply(profile_y.astype(out.dtype)[:, :, None], profile_x.astype(out.dtype)[:, None, :], out=planes[start:start + chunk_size])
+    return out
+
+
+def intensity(beam, x, y, z=0, sagittal=None, out: np.ndarray = None, dtype=None, chunk_size: int = 8) -> np.ndarray:
+    """Intensity |E(x, y, z)|^2 on a rectangular grid, see field. The planes are products of real 1-D profiles.
+
+    Args:
+        dtype (optional): np.float64 (default) or np.float32 to halve memory.
+    """
+    sagittal = beam if sagittal is None else sagittal
+    x, y, z, out, planes = _prepare(x, y, z, out, dtype, np.float64)
+    for start in range(0, len(z), chunk_size):
+        chunk = z[start:start + chunk_size]
+        intensity_x = np.abs(_profile(beam, x, chunk))**2
+        intensity_y = np.abs(_profile(sagittal, y, chunk))**2 * abs(beam.amplitude)**2
+        np.multiply(intensity_y.astype(out.dtype)[:, :, None], intensity_x.astype(out.dtype)[:, None, :], out=planes[start:start + chunk_size])
+    return out
@@ -0,0 +1,509 @@
+"""Higher-order Hermite-Gauss and Laguerre-Gauss modes and embedded-Gaussian (M^2) beams.
+
+A higher-order mode is fully described by its fundamental Gaussian beam and its mode orders,
+so ABCD propagation only transforms the fundamental beam and the orders are carried along
+(OpticalPath.propagate_mode). Fields are normalized like optix.beams.field: the 00 mode is the
+fundamental Gaussian field with peak amplitude A at the waist.
+
+The transverse profiles are tables of normalized Hermite (or Laguerre) functions of the
+scaled grid coordinates. They are cached per grid, beam radius and order, so evaluating
+hundreds of modes at a plane computes every recurrence only once.
+"""
+from collections import OrderedDict
+import hashlib
+from math import lgamma
+from typing import Tuple, Union
+import numpy as np
+from optix.beams.beams import GaussianBeam
+from optix.beams.field import _prepare
+
+__all__ = ["HermiteGaussMode", "LaguerreGaussMode", "EmbeddedGaussianBeam", "hermite_gauss", "laguerre_gauss", "clear_mode_cache"]
+
+# Total size of the cached polynomial tables
+CACHE_BYTES = 256 * 2**20
+
+
+class _TableCache:
+    """Least recently used tables, bounded by their total size in bytes."""
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._tables = OrderedDict()
+        self._size = 0
+
+    def get(self, key) -> np.ndarray:
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+        return table
+
+    def put(self, key, table: np.ndarray) -> None:
+        if key in self._tables:
+            self._size -= self._tables.pop(key).nbytes
+        if table.nbytes > self.max_bytes:
+            return
+        table.flags.writeable = False
+        self._tables[key] = table
+        self._size += table.nbytes
+        while self._size > self.max_bytes:
+            self._size -= self._tables.popitem(last=False)[1].nbytes
+
+    def clear(self) -> None:
+        self._tables.clear()
+        self._size = 0
+
+
+_CACHE = _TableCache(CACHE_BYTES)
+
+
+def clear_mode_cache() -> None:
+    """Drops all cached Hermite and Laguerre tables."""
+    _CACHE.clear()
+
+
+def _digest(coordinate: np.ndarray) -> bytes:
+    return hashlib.blake2b(np.ascontiguousarray(coordinate).view(np.uint8), digest_size=16).digest()
+
+
+def _grow(table: np.ndarray, order: int, first_rows, double: bool = True) -> Tuple[np.ndarray, int]:
+    """Table with room for order + 1 rows holding the rows computed so far, and their count.
+
+    With double, tables at least double when they grow, so raising the order one by one stays
+    linear. Otherwise they hold exactly order + 1 rows.
+    """
+    if table is None:
+        rows = first_rows()[:order + 1]
+        known = len(rows)
+        grown = np.empty((max(order + 1, known),) + rows[0].shape)
+        grown[:known] = rows
+        return grown, known
+    known = len(table)
+    grown = np.empty((max(order + 1, 2 * known if double else known),) + table.shape[1:])
+    grown[:known] = table
+    return grown, known
+
+
+def _hermite_table(x: np.ndarray, w: float, order: int) -> np.ndarray:
+    """Normalized Hermite functions psi_m(xi), xi = sqrt(2) x / w, for m = 0..order (at least).
+
+    The functions psi_m = H_m(xi) exp(-xi^2/2) / sqrt(2^m m! sqrt(pi)) follow the stable recurrence
+    psi_m = sqrt(2/m) xi psi_(m-1) - sqrt((m-1)/m) psi_(m-2), which never overflows.
+    """
+    key = ("hermite", _digest(x), float(w))
+    table = _CACHE.get(key)
+    if table is not None and len(table) > order:
+        return table
+    xi = np.sqrt(2) * x / w
+
+    def first_rows():
+        psi0 = np.pi**-0.25 * np.exp(-0.5 * xi**2)
+        return [psi0, np.sqrt(2) * xi * psi0]
+    table, known = _grow(table, order, first_rows)
+    for m in range(known, len(table)):
+        table[m] = np.sqrt(2 / m) * xi * table[m - 1] - np.sqrt((m - 1) / m) * table[m - 2]
+    _CACHE.put(key, table)
+    return table
+
+
+def _distinct_squares(coordinate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct squares of the coordinates and the index of every coordinate into them.
+
+    Squares closer than a few ulps of the largest one are merged, so that grids which are only
+    symmetric up to rounding (e.g. np.linspace(-a, a, n)) share the values of x and -x.
+    """
+    squares = coordinate**2
+    step = 16 * np.spacing(squares.max(initial=0))
+    keys = np.round(squares / step) if step > 0 else squares
+    _, first, index = np.unique(keys, return_index=True, return_inverse=True)
+    return squares[first], index
+
+
+def _radii(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct squared radii x^2 + y^2 of the grid, and the (len(y), len(x)) index of every grid point into them.
+
+    Symmetric grids have far fewer distinct radii than points, so radial tables stay small.
+    """
+    key = ("radii", _digest(x), _digest(y))
+    radii, index = _CACHE.get(key + ("r2",)), _CACHE.get(key + ("index",))
+    if radii is None or index is None:
+        x2, index_x = _distinct_squares(x)
+        y2, index_y = _distinct_squares(y)
+        radii, pairs = np.unique(y2[:, None] + x2[None, :], return_inverse=True)
+        pairs = pairs.reshape(len(y2), len(x2)).astype(np.int32 if len(radii) < 2**31 else np.intp)
+        index = pairs[index_y.reshape(-1)[:, None], index_x.reshape(-1)[None, :]]
+        _CACHE.put(key + ("r2",), radii)
+        _CACHE.put(key + ("index",), index)
+    return radii, index
+
+
+def _laguerre_table(r2: np.ndarray, w: float, l: int, order: int) -> np.ndarray:
+    """Normalized Laguerre functions g_p(rho) = sqrt(p!/(p+l)!) rho^(l/2) L_p^l(rho) exp(-rho/2), rho = 2 r^2 / w^2.
+
+    Rows p = 0..order on the distinct squared radii r2 of a grid (see _radii), built with the
+    normalized three term recurrence of the generalized Laguerre polynomials.
+    """
+    key = ("laguerre", _digest(r2), float(w), l)
+    table = _CACHE.get(key)
+    if table is not None and len(table) > order:
+        return table
+    rho = 2 * r2 / w**2
+
+    def first_rows():
+        # rho^(l/2) exp(-rho/2) / sqrt(l!) in log space, rho = 0 only contributes for l = 0
+        with np.errstate(divide="ignore"):
+            g0 = np.exp(0.5 * l * np.log(rho) - 0.5 * rho - 0.5 * lgamma(l + 1)) if l else np.exp(-0.5 * rho)
+        return [g0, (1 + l - rho) / np.sqrt(1 + l) * g0]
+    table, known = _grow(table, order, first_rows, double=False)
+    for p in range(known, len(table)):
+        table[p] = ((2 * p - 1 + l - rho) * np.sqrt(p / (p + l)) * table[p - 1]
+                    - (p - 1 + l) * np.sqrt(p * (p - 1) / ((p + l) * (p + l - 1))) * table[p - 2]) / p
+    _CACHE.put(key, table)
+    return table
+
+
+def _plane(beam, z: float):
+    """Beam radius, Gouy phase and wavefront curvature term Re(1/q) of the fundamental beam at z."""
+    q = complex(beam.cbeam_parameter(float(z)))
+    return float(beam.beam_radius(z)), np.arctan2(q.real, q.imag), (1 / q).real
+
+
+def _orders(*orders) -> Tuple[bool, Tuple[np.ndarray, ...]]:
+    arrays = np.broadcast_arrays(*(np.asarray(o) for o in orders))
+    if any(not np.issubdtype(a.dtype, np.integer) for a in arrays):
+        raise ValueError("Mode orders must be integers.")
+    return arrays[0].ndim == 0, tuple(a.reshape(-1) for a in arrays)
+
+
+def _output(out, dtype, x, y, count: int, scalar: bool, default_dtype):
+    """Output array of shape (count, len(y), len(x)), or (len(y), len(x)) for a single mode, and its plane view."""
+    if scalar:
+        x, y, _, out, planes = _prepare(x, y, 0, out, dtype, default_dtype)
+        return x, y, out, planes
+    x, y, _, out, _ = _prepare(x, y, np.zeros(count), out, dtype, default_dtype)
+    return x, y, out, out
+
+
+def hermite_gauss(beam, m, n, x, y, z: float = 0, sagittal=None, out: np.ndarray = None, dtype=None) -> np.ndarray:
+    """Complex fields of Hermite-Gauss modes HG_mn on a rectangular grid.
+
+    HG_mn is A sqrt(w0x/wx) sqrt(w0y/wy) h_m(sqrt(2) x/wx) h_n(sqrt(2) y/wy) exp(-ik x^2/(2Rx) - ik y^2/(2Ry))
+    exp(i (m + 1/2) psi_x + i (n + 1/2) psi_y) exp(-ikz), with h_m = H_m exp(-xi^2/2) / sqrt(2^m m!) and
+    psi the Gouy phase, so HG_00 equals optix.beams.field. The modes are separable and every one
+    is the outer product of two rows of cached Hermite tables.
+
+    Args:
+        beam (GaussianBeam): Fundamental beam in the x plane.
+        m, n (int or array of int): Mode orders along x and y, arrays evaluate many modes at once.
+        x, y (np.ndarray): 1-D grid coordinates.
+        z (float): Position along the beam axis.
+        sagittal (GaussianBeam, optional): Fundamental beam in the y plane, defaults to "beam".
+        out (np.ndarray, optional): Preallocated (or np.memmap) output of shape (number of modes, len(y), len(x)),
+            (len(y), len(x)) for scalar orders.
+        dtype (optional): np.complex128 (default) or np.complex64.
+
+    Raises:
+        ValueError: When an order is negative or not an integer.
+    """
+    sagittal = beam if sagittal is None else sagittal
+    scalar, (m, n) = _orders(m, n)
+    if m.size and min(m.min(), n.min()) < 0:
+        raise ValueError("Hermite-Gauss orders must not be negative.")
+    x, y, out, planes = _output(out, dtype, x, y, len(m), scalar, np.complex128)
+    k = 2 * np.pi * beam.refractive_index / beam.wavelength
+    profiles = []
+    for fundamental, coordinate, orders in ((beam, x, m), (sagittal, y, n)):
+        w, gouy, curvature = _plane(fundamental, z)
+        table = _hermite_table(coordinate, w, int(orders.max(initial=0)))
+        envelope = np.sqrt(fundamental.waist_radius / w) * np.pi**0.25 * np.exp(0.5j * gouy - 0.5j * k * curvature * coordinate**2)
+        profiles.append((table, envelope, np.exp(1j * orders * gouy)))
+    (table_x, envelope_x, gouy_x), (table_y, envelope_y, gouy_y) = profiles
+    envelope_y = envelope_y * beam.amplitude * np.exp(-1j * k * z)
+    for i in range(len(m)):
+        profile_x = (table_x[m[i]] * envelope_x * gouy_x[i]).astype(out.dtype)
+        profile_y = (table_y[n[i]] * envelope_y * gouy_y[i]).astype(out.dtype)
+        np.multiply(profile_y[:, None], profile_x[None, :], out=planes[i])
+    return out
+
+
+def laguerre_gauss(beam, p, l, x, y, z: float = 0, out: np.ndarray = None, dtype=None) -> np.ndarray:
+    """Complex fields of Laguerre-Gauss modes LG_pl on a rectangular grid.
+
+    LG_pl is A (w0/w) g_p^|l|(2r^2/w^2) exp(il phi) exp(-ik r^2/(2R)) exp(i (2p + |l| + 1) psi) exp(-ikz),
+    with g_p^l = sqrt(p!/(p+l)!) rho^(l/2) L_p^l(rho) exp(-rho/2), so LG_00 equals optix.beams.field.
+    The Laguerre tables are evaluated on the distinct radii of the grid only and cached per grid,
+    beam radius and |l|, every mode gathers its values from them.
+
+    Args:
+        beam (GaussianBeam): Round fundamental beam.
+        p (int or array of int): Radial orders.
+        l (int or array of int): Azimuthal orders, may be negative.
+        x, y (np.ndarray): 1-D grid coordinates.
+        z (float): Position along the beam axis.
+        out (np.ndarray, optional): Preallocated (or np.memmap) output of shape (number of modes, len(y), len(x)),
+            (len(y), len(x)) for scalar orders.
+        dtype (optional): np.complex128 (default) or np.complex64.
+
+    Raises:
+        ValueError: When a radial order is negative or an order is not an integer.
+    """
+    scalar, (p, l) = _orders(p, l)
+    if p.size and p.min() < 0:
+        raise ValueError("Laguerre-Gauss radial orders must not be negative.")
+    x, y, out, planes = _output(out, dtype, x, y, len(p), scalar, np.complex128)
+    k = 2 * np.pi * beam.refractive_index / beam.wavelength
+    w, gouy, curvature = _plane(beam, z)
+    # The curvature term is separable, the azimuthal phase is built once per distinct l
+    phase_x = np.exp(-0.5j * k * curvature * x**2)
+    phase_y = np.exp(-0.5j * k * curvature * y**2) * beam.amplitude * beam.waist_radius / w * np.exp(1j * gouy - 1j * k * z)
+    phase = phase_y[:, None] * phase_x[None, :]
+    # exp(i phi) as a unit phasor, its integer powers are much cheaper than complex exponentials
+    azimuth = x[None, :] + 1j * y[:, None]
+    radius = np.abs(azimuth)
+    radius[radius == 0] = 1
+    azimuth /= radius
+    radii, index = _radii(x, y)
+    # Modes are grouped by |l|, so every Laguerre table is used while it is at hand
+    for order in np.unique(np.abs(l)):
+        group = np.flatnonzero(np.abs(l) == order)
+        table = _laguerre_table(radii, w, int(order), int(p[group].max()))
+        for charge in np.unique(l[group]):
+            spiral = phase * (azimuth if charge > 0 else np.conj(azimuth))**abs(int(charge)) if charge else phase
+            for i in group[l[group] == charge]:
+                np.multiply(np.take(table[p[i]], index), spiral, out=planes[i], casting="same_kind")
+                planes[i] *= np.exp(1j * (2 * p[i] + order) * gouy)
+    return out
+
+
+class HermiteGaussMode:
+    """Hermite-Gauss mode HG_mn of a (possibly elliptical) fundamental Gaussian beam."""
+
+    @property
+    def beam(self) -> GaussianBeam:
+        """Fundamental beam in the x (tangential) plane."""
+        return self._beam
+
+    @property
+    def sagittal(self) -> GaussianBeam:
+        """Fundamental beam in the y (sagittal) plane."""
+        return self._sagittal
+
+    @property
+    def m(self) -> int:
+        return self._m
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    @property
+    def m_squared(self) -> Tuple[int, int]:
+        """Beam quality factors (2m + 1, 2n + 1) along x and y."""
+        return 2 * self._m + 1, 2 * self._n + 1
+
+    def __init__(self, beam: GaussianBeam, m: int = 0, n: int = 0, sagittal: GaussianBeam = None) -> None:
+        """
+        Args:
+            beam (GaussianBeam): Fundamental beam in the x plane.
+            m, n (int): Mode orders along x and y.
+            sagittal (GaussianBeam, optional): Fundamental beam in the y plane, defaults to "beam".
+
+        Raises:
+            ValueError: When an order is negative.
+        """
+        if m < 0 or n < 0:
+            raise ValueError("Hermite-Gauss orders must not be negative.")
+        self._beam = beam
+        self._sagittal = beam if sagittal is None else sagittal
+        self._m = int(m)
+        self._n = int(n)
+
+    def __repr__(self) -> str:
+        return f"HermiteGaussMode(m={self._m}, n={self._n})"
+
+    def beam_radius(self, z: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Second moment radii sqrt(2m + 1) w_x(z) and sqrt(2n + 1) w_y(z)."""
+        M2x, M2y = self.m_squared
+        return np.sqrt(M2x) * self._beam.beam_radius(z), np.sqrt(M2y) * self._sagittal.beam_radius(z)
+
+    def gouy_phase(self, z: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Gouy phase (m + 1/2) psi_x(z) + (n + 1/2) psi_y(z) relative to the waists."""
+        return (self._m + 0.5) * _gouy(self._beam, z) + (self._n + 0.5) * _gouy(self._sagittal, z)
+
+    def field(self, x, y, z: float = 0, out: np.ndarray = None, dtype=None) -> np.ndarray:
+        """Complex field on a rectangular grid, see hermite_gauss."""
+        return hermite_gauss(self._beam, self._m, self._n, x, y, z, self._sagittal, out, dtype)
+
+    def intensity(self, x, y, z: float = 0) -> np.ndarray:
+        return np.abs(self.field(x, y, z))**2
+
+    def with_beams(self, tangential: GaussianBeam, sagittal: GaussianBeam) -> "HermiteGaussMode":
+        """Same mode of other fundamental beams, e.g. after propagation."""
+        return HermiteGaussMode(tangential, self._m, self._n, sagittal)
+
+
+class LaguerreGaussMode:
+    """Laguerre-Gauss mode LG_pl of a round fundamental Gaussian beam."""
+
+    @property
+    def beam(self) -> GaussianBeam:
+        return self._beam
+
+    @property
+    def sagittal(self) -> GaussianBeam:
+        return self._beam
+
+    @property
+    def p(self) -> int:
+        return self._p
+
+    @property
+    def l(self) -> int:
+        return self._l
+
+    @property
+    def m_squared(self) -> int:
+        """Beam quality factor 2p + |l| + 1."""
+        return 2 * self._p + abs(self._l) + 1
+
+    def __init__(self, beam: GaussianBeam, p: int = 0, l: int = 0) -> None:
+        """
+        Args:
+            beam (GaussianBeam): Round fundamental beam.
+            p (int): Radial order.
+            l (int): Azimuthal order (topological charge), may be negative.
+
+        Raises:
+            ValueError: When p is negative.
+        """
+        if p < 0:
+            raise ValueError("Laguerre-Gauss radial orders must not be negative.")
+        self._beam = beam
+        self._p = int(p)
+        self._l = int(l)
+
+    def __repr__(self) -> str:
+        return f"LaguerreGaussMode(p={self._p}, l={self._l})"
+
+    def beam_radius(self, z: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Second moment radius sqrt(2p + |l| + 1) w(z)."""
+        return np.sqrt(self.m_squared) * self._beam.beam_radius(z)
+
+    def gouy_phase(self, z: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Gouy phase (2p + |l| + 1) psi(z) relative to the waist."""
+        return self.m_squared * _gouy(self._beam, z)
+
+    def field(self, x, y, z: float = 0, out: np.ndarray = None, dtype=None) -> np.ndarray:
+        """Complex field on a rectangular grid, see laguerre_gauss."""
+        return laguerre_gauss(self._beam, self._p, self._l, x, y, z, out, dtype)
+
+    def intensity(self, x, y, z: float = 0) -> np.ndarray:
+        return np.abs(self.field(x, y, z))**2
+
+    def with_beams(self, tangential: GaussianBeam, sagittal: GaussianBeam) -> "LaguerreGaussMode":
+        """Same mode of another fundamental beam, e.g. after propagation.
+
+        Raises:
+            ValueError: When the planes differ, an astigmatic system does not preserve LG modes.
+        """
+        _check_round(tangential, sagittal, "Laguerre-Gauss modes")
+        return LaguerreGaussMode(tangential, self._p, self._l)
+
+
+class EmbeddedGaussianBeam:
+    """Real (M^2 > 1) beam described by its embedded Gaussian beam.
+
+    The beam has the waist location and Rayleigh range of the embedded Gaussian, while its
+    radii and divergence are sqrt(M^2) times larger. It propagates through ABCD systems exactly
+    like the embedded Gaussian.
+    """
+
+    @property
+    def beam(self) -> GaussianBeam:
+        """Embedded Gaussian beam."""
+        return self._beam
+
+    @property
+    def sagittal(self) -> GaussianBeam:
+        return self._beam
+
+    @property
+    def m_squared(self) -> float:
+        return self._m_squared
+
+    @property
+    def wavelength(self):
+        return self._beam.wavelength
+
+    @property
+    def refractive_index(self):
+        return self._beam.refractive_index
+
+    @property
+    def amplitude(self):
+        return self._beam.amplitude
+
+    @property
+    def waist_location(self):
+        return self._beam.waist_location
+
+    @property
+    def rayleigh_range(self):
+        return self._beam.rayleigh_range
+
+    @property
+    def waist_radius(self):
+        return np.sqrt(self._m_squared) * self._beam.waist_radius
+
+    @property
+    def divergence(self):
+        return np.sqrt(self._m_squared) * self._beam.divergence
+
+    def __init__(self, beam: GaussianBeam, m_squared: float) -> None:
+        """
+        Args:
+            beam (GaussianBeam): Embedded Gaussian beam.
+            m_squared (float): Beam quality factor, at least 1.
+
+        Raises:
+            ValueError: When m_squared is smaller than 1.
+        """
+        if m_squared < 1:
+            raise ValueError("M^2 must be at least 1.")
+        self._beam = beam
+        self._m_squared = float(m_squared)
+
+    @staticmethod
+    def from_waist(wave_length, waist_radius, m_squared, refractive_index=1, waist_location=0, amplitude=1) -> "EmbeddedGaussianBeam":
+        """Creates the beam from its measured waist radius, the embedded waist is waist_radius / sqrt(M^2)."""
+        embedded = GaussianBeam(wave_length, amplitude, refractive_index, waist_location, w0=waist_radius / np.sqrt(m_squared))
+        return EmbeddedGaussianBeam(embedded, m_squared)
+
+    def __repr__(self) -> str:
+        return f"EmbeddedGaussianBeam(m_squared={self._m_squared})"
+
+    def beam_radius(self, z: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return np.sqrt(self._m_squared) * self._beam.beam_radius(z)
+
+    def curviture(self, z: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        return self._beam.curviture(z)
+
+    def cbeam_parameter(self, z: Union[float, np.ndarray]) -> Union[complex, np.ndarray]:
+        """Complex beam parameter of the embedded Gaussian."""
+        return self._beam.cbeam_parameter(z)
+
+    def with_beams(self, tangential: GaussianBeam, sagittal: GaussianBeam) -> "EmbeddedGaussianBeam":
+        """Same beam quality around another embedded Gaussian, e.g. after propagation.
+
+        Raises:
+            ValueError: When the planes differ, use one EmbeddedGaussianBeam per plane for astigmatic systems.
+        """
+        _check_round(tangential, sagittal, "Round embedded Gaussian beams")
+        return EmbeddedGaussianBeam(tangential, self._m_squared)
+
+
+def _gouy(beam, z):
+    return np.arctan((z - beam.waist_location) / beam.rayleigh_range)
+
+
+def _check_round(tangential, sagittal, what: str) -> None:
+    if not np.allclose(tangential.cbeam_parameter(0), sagittal.cbeam_parameter(0), rtol=1e-12, atol=0):
+        raise ValueError(f"{what} are not preserved by astigmatic systems.")
@@ -0,0 +1,193 @@
+"""Streaming batch propagation.
+
+Reads one JSON request per line and writes one JSON result per line, in input order::
+
+    {"id": 1, "beam": {"wavelength": 633e-9, "w0": 1e-3}, "path": [{"type": "FreeSpace", "d": 0.1}, {"type": "ThinLens", "f": 0.05}]}
+    {"id": 1, "waist_radius": 1.007e-05, "waist_location": 0.150005, "rayleigh_range": 0.000504, "q": [-0.050005, 0.000504]}
+
+A beam takes "wavelength" and one of "w0", "zr" or "div", optionally "waist_location",
+"refractive_index" and "amplitude". Path elements name any element of optix.matrixopt in
+"type" and pass its arguments by name, composites take "elements" (OpticalPath) or "element"
+(Repeat) and generic elements take "matrix". "q" is the complex beam parameter at the end of
+the path, invalid requests produce {"id": ..., "error": ...}. Consecutive requests with the same path are
+propagated together as one GaussianBeamArray, and batches may run on a process pool.
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import itertools
+import json
+import sys
+from typing import Iterable, Iterator, List, TextIO, Tuple
+import numpy as np
+import optix.matrixopt as matrixopt
+from optix.beams import GaussianBeamArray
+
+__all__ = ["main", "process"]
+
+# Element types a request may name, generic ABCD matrices are built from "matrix"
+_ELEMENTS = {
+    name: getattr(matrixopt, name) for name in (
+        "FreeSpace", "Media", "ThinLens", "FlatInterface", "CurvedInterface", "CurvedMirror",
+        "ThickLens", "PlanoConvexLens", "OpticalPath", "Repeat")}
+
+
+def _element(spec: dict) -> matrixopt.ABCDElement:
+    spec = dict(spec)
+    kind = spec.pop("type", "ABCDElement")
+    if kind == "ABCDElement":
+        return matrixopt.ABCDElement(np.array(spec["matrix"], dtype=float))
+    if kind not in _ELEMENTS:
+        raise ValueError(f"Unknown element type {kind!r}.")
+    if kind == "OpticalPath":
+        return matrixopt.OpticalPath(*(_element(e) for e in spec["elements"]))
+    if "element" in spec:
+        spec["element"] = _element(spec["element"])
+    return _ELEMENTS[kind](**spec)
+
+
+@lru_cache(maxsize=256)
+def _path(key: str) -> matrixopt.OpticalPath:
+    """Path of a request, built once per distinct path and reused across batches."""
+    return matrixopt.OpticalPath(*(_element(e) for e in json.loads(key)))
+
+
+def _beams(beams: List[dict]) -> GaussianBeamArray:
+    """Packs the beams of a batch, every beam parameter is converted to a Rayleigh range."""
+    wavelength = np.array([b["wavelength"] for b in beams], dtype=float)
+    index = np.array([b.get("refractive_index", 1) for b in beams], dtype=float)
+    zr = np.empty(len(beams))
+    for i, beam in enumerate(beams):
+        given = [k for k in ("w0", "zr", "div") if k in beam]
+        if len(given) != 1:
+            raise ValueError("A beam needs exactly one of w0, zr or div.")
+        zr[i] = beam[given[0]]
+        if given[0] == "w0":
+            zr[i] = np.pi * zr[i]**2 * index[i] / wavelength[i]
+        elif given[0] == "div":
+            zr[i] = wavelength[i] / (np.pi * index[i] * zr[i]**2)
+    waist_location = np.array([b.get("waist_location", 0) for b in beams], dtype=float)
+    amplitude = np.array([b.get("amplitude", 1) for b in beams], dtype=float)
+    return GaussianBeamArray(wavelength, amplitude, index, waist_location, zr=zr)
+
+
+def _error(request_id, message: str) -> str:
+    return json.dumps({"id": request_id, "error": message})
+
+
+def _run_batch(batch: Tuple[str, List[Tuple[object, dict]]]) -> List[str]:
+    """Propagates all beams of a batch through their common path, returns the output lines."""
+    key, requests = batch
+    try:
+        path = _path(key)
+    except Exception as e:
+        return [_error(request_id, f"Invalid path: {e}") for request_id, _ in requests]
+    try:
+        beams = _beams([beam for _, beam in requests])
+    except Exception as e:
+        # A bad beam should not fail the whole batch, so the batch is split into single requests
+        if len(requests) > 1:
+            return [line for request in requests for line in _run_batch((key, [request]))]
+        return [_error(requests[0][0], f"Invalid beam: {e}")]
+    # Non-physical outputs (e.g. a negative Rayleigh range) are reported per request instead of as NaN
+    with np.errstate(invalid="ignore", divide="ignore"):
+        output = path.propagate_batch(beams)
+        q = output.cbeam_parameter(path.length)
+        columns = (output.waist_radius, output.waist_location, output.rayleigh_range)
+    valid = np.isfinite(q) & (output.rayleigh_range > 0)
+    for column in columns:
+        valid &= np.isfinite(column)
+    lines = []
+    for i, (request_id, _) in enumerate(requests):
+        if not valid[i]:
+            lines.append(_error(request_id, "Non-physical output beam."))
+            continue
+        lines.append(json.dumps({
+            "id": request_id,
+            "waist_radius": float(columns[0][i]),
+            "waist_location": float(columns[1][i]),
+            "rayleigh_range": float(columns[2][i]),
+            "q": [float(q[i].real), float(q[i].imag)]}, allow_nan=False))
+    return lines
+
+
+def _batches(lines: Iterable[str], batch_size: int) -> Iterator[Tuple[str, List[Tuple[object, dict]]]]:
+    """Groups consecutive requests sharing the same path. Malformed lines become batches of their own."""
+    key, requests = None, []
+    for line in lines:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            request_key = json.dumps(request["path"], sort_keys=True)
+            item = (request_id, request["beam"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            if requests:
+                yield key, requests
+                key, requests = None, []
+            yield None, [(request_id, f"Invalid request: {e!r}")]
+            continue
+        if requests and (request_key != key or len(requests) >= batch_size):
+            yield key, requests
+            requests = []
+        key = request_key
+        requests.append(item)
+    if requests:
+        yield key, requests
+
+
+def _evaluate(batch) -> List[str]:
+    key, requests = batch
+    if key is None:
+        # Malformed request, carries its error message instead of a beam
+        return [_error(*requests[0])]
+    return _run_batch(batch)
+
+
+def process(lines: Iterable[str], output: TextIO, batch_size: int = 1024, workers: int = 1, max_pending: int = None) -> None:
+    """Streams results of JSON-lines requests to output, keeping their order.
+
+    At most max_pending batches are in flight, reading stops until the oldest one is written,
+    so memory stays bounded for inputs of any length.
+    """
+    batches = _batches(lines, batch_size)
+    if workers <= 1:
+        for batch in batches:
+            output.writelines(line + "\n" for line in _evaluate(batch))
+        return
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque(pool.submit(_evaluate, batch) for batch in itertools.islice(batches, max_pending))
+        while pending:
+            lines_out = pending.popleft().result()
+            for batch in itertools.islice(batches, 1):
+                pending.append(pool.submit(_evaluate, batch))
+            output.writelines(line + "\n" for line in lines_out)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="optix-propagate", description="Propagates JSON-lines beam/path requests.")
+    parser.add_argument("input", nargs="?", default="-", help="Request file, '-' reads stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Result file, '-' writes stdout.")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Maximal number of requests propagated together.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--max-pending", type=int, default=None, help="Batches in flight, defaults to twice the workers.")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    target = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        process(source, target, args.batch_size, args.workers, args.max_pending)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
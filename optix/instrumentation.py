@@ -0,0 +1,202 @@
+"""Opt-in counters and timings of the optix hot paths.
+
+Nothing is measured by default. Instrumentation is switched on for a block of code with::
+
+    with instrument() as profile:
+        path.propagate(beam)
+    profile.as_dict()
+
+or for the whole process by setting the environment variable OPTIX_INSTRUMENT before optix
+is imported. OPTIX_INSTRUMENT=<file>.json additionally writes a Chrome trace (readable by
+chrome://tracing and Perfetto) to that file at exit. The measured methods are only wrapped
+while instrumentation is enabled, so disabled instrumentation costs nothing.
+"""
+import atexit
+from contextlib import contextmanager
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List
+
+__all__ = ["Profile", "instrument", "enable", "disable", "active_profile"]
+
+ENVIRONMENT_VARIABLE = "OPTIX_INSTRUMENT"
+
+# (class, attribute) pairs that are measured, overrides in subclasses are measured as well
+TARGETS = [
+    ("ABCDElement", "matrix"),
+    ("ABCDElement", "act"),
+    ("ABCDCompositeElement", "_build_matrix"),
+    ("OpticalPath", "propagate"),
+    ("OpticalPath", "propagate_batch"),
+]
+
+_active = None
+# Original class attributes replaced by wrappers, restored by disable()
+_patched: List[tuple] = []
+# (label, id) of the calls being measured, overrides calling their base are only counted once
+_running = set()
+
+
+class Profile:
+    """Measurements collected while instrumentation is enabled.
+
+    Every call records its count, inclusive wall time and the net number of memory blocks
+    allocated by the interpreter (sys.getallocatedblocks), per measured function and per
+    element type. Calls on composite elements are also attributed to the path, identified by
+    its name or by its type and id.
+    """
+    def __init__(self, trace: bool = True, max_events: int = 1_000_000) -> None:
+        """
+        Args:
+            trace (bool): Whether to keep individual calls for the Chrome trace.
+            max_events (int): Maximal number of calls kept for the trace, later calls are only counted.
+        """
+        self.trace = trace
+        self.max_events = max_events
+        self.functions: Dict[str, Dict[str, list]] = {}
+        self.paths: Dict[str, Dict[str, list]] = {}
+        self.events: List[tuple] = []
+        self.dropped_events = 0
+        self._origin = time.perf_counter_ns()
+
+    def _record(self, function: str, element, start: int, end: int, blocks: int) -> None:
+        element_type = type(element).__name__
+        for table, key in ((self.functions, element_type), (self.paths, self._path_label(element))):
+            if key is None:
+                continue
+            entry = table.setdefault(function, {}).setdefault(key, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += end - start
+            entry[2] += blocks
+        if self.trace:
+            if len(self.events) < self.max_events:
+                self.events.append((function, element_type, start, end))
+            else:
+                self.dropped_events += 1
+
+    @staticmethod
+    def _path_label(element):
+        if not hasattr(element, "childs"):
+            return None
+        # Composites build their matrix while being constructed, before their name is set
+        name = getattr(element, "_name", None)
+        return name if name else f"{type(element).__name__}@{id(element):#x}"
+
+    @staticmethod
+    def _table(table: Dict[str, Dict[str, list]]) -> dict:
+        return {
+            function: {key: {"calls": calls, "time": ns * 1e-9, "blocks": blocks} for key, (calls, ns, blocks) in entries.items()}
+            for function, entries in table.items()}
+
+    def as_dict(self) -> dict:
+        """Counters as {"functions": {function: {element type: stats}}, "paths": {function: {path: stats}}}.
+
+        Stats hold "calls", inclusive "time" in seconds and net allocated memory "blocks".
+        """
+        return {"functions": self._table(self.functions), "paths": self._table(self.paths)}
+
+    def chrome_trace(self) -> dict:
+        """Recorded calls in the Chrome trace event format."""
+        pid = os.getpid()
+        events = [
+            {"name": function, "cat": element_type, "ph": "X", "pid": pid, "tid": 0,
+             "ts": (start - self._origin) / 1000, "dur": (end - start) / 1000}
+            for function, element_type, start, end in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_events": self.dropped_events}}
+
+    def save_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _wrap(function, label: str):
+    def measured(self, *args, **kwargs):
+        profile = _active
+        call = (label, id(self))
+        if profile is None or call in _running:
+            return function(self, *args, **kwargs)
+        _running.add(call)
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            end = time.perf_counter_ns()
+            _running.discard(call)
+            profile._record(label, self, start, end, sys.getallocatedblocks() - blocks)
+    measured.__name__ = getattr(function, "__name__", label)
+    measured.__doc__ = getattr(function, "__doc__", None)
+    measured.__wrapped__ = function
+    return measured
+
+
+def _subclasses(cls) -> Iterator[type]:
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _subclasses(subclass)
+
+
+def _install() -> None:
+    import optix.matrixopt as matrixopt
+    for base_name, attribute in TARGETS:
+        label = f"{base_name}.{attribute}"
+        seen = set()
+        for cls in _subclasses(getattr(matrixopt, base_name)):
+            if cls in seen or attribute not in cls.__dict__:
+                continue
+            seen.add(cls)
+            original = cls.__dict__[attribute]
+            if isinstance(original, property):
+                replacement = property(_wrap(original.fget, label), original.fset, original.fdel, original.__doc__)
+            else:
+                replacement = _wrap(original, label)
+            _patched.append((cls, attribute, original))
+            setattr(cls, attribute, replacement)
+
+
+def enable(profile: Profile = None) -> Profile:
+    """Starts recording into profile (a new one by default) and returns it."""
+    global _active
+    if not _patched:
+        _install()
+    _active = profile if profile is not None else Profile()
+    return _active
+
+
+def disable() -> None:
+    """Stops recording and restores the original, unmeasured methods."""
+    global _active
+    _active = None
+    while _patched:
+        cls, attribute, original = _patched.pop()
+        setattr(cls, attribute, original)
+
+
+def active_profile() -> Profile:
+    """Profile currently recording, None when instrumentation is disabled."""
+    return _active
+
+
+@contextmanager
+def instrument(trace: bool = True) -> Iterator[Profile]:
+    """Records the calls made inside the with block into a new Profile."""
+    previous = _active
+    profile = enable(Profile(trace))
+    try:
+        yield profile
+    finally:
+        if previous is None:
+            disable()
+        else:
+            enable(previous)
+
+
+def _enable_from_environment() -> None:
+    value = os.environ.get(ENVIRONMENT_VARIABLE, "")
+    if not value or value == "0":
+        return
+    profile = enable(Profile(trace=value.endswith(".json")))
+    if value.endswith(".json"):
+        atexit.register(profile.save_chrome_trace, value)
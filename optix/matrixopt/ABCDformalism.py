@@ -1,43 +1,223 @@
+from collections.abc import Sequence
 from functools import reduce
-from typing import List
+from typing import Iterator, List
+import weakref
 import numpy as np
 
 __all__ = [
     "ABCDElement", "Media", "FreeSpace", "ThinLens", 
-    "FlatInterface", "CurvedInterface", "ABCDCompositeElement", 
-    "ThickLens", "PlanoConvexLens"]
+    "FlatInterface", "CurvedInterface", "CurvedMirror", "CylindricalLens", "TiltedMirror", "ABCDCompositeElement", 
+    "ThickLens", "PlanoConvexLens", "Repeat"]
+
+# Instances handed out by ABCDElement.shared, keyed by type and parameters
+_SHARED = weakref.WeakValueDictionary()
+
+
+def _stack_matrix(A, B, C, D) -> np.ndarray:
+    """Builds a (2, 2) matrix, or a (..., 2, 2) stack when any entry is an array."""
+    entries = (A, B, C, D)
+    if any(isinstance(e, np.ndarray) and e.ndim for e in entries):
+        entries = np.broadcast_arrays(*entries)
+        return np.stack(entries, axis=-1).reshape(entries[0].shape + (2, 2))
+    return np.array([[A, B], [C, D]])
+
+
+def _slot_names(cls: type) -> List[str]:
+    """Names of the slots of a class and its bases that are pickled, private names mangled."""
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ("__dict__", "__weakref__", "_parents"):
+                continue
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            names.append(name)
+    return names
+
     
 class ABCDElement:
+    # Elements are created by the million in catalogs and searches, so they carry no __dict__.
+    # _revision is bumped on every mutation of this element, _parents holds weak references
+    # to the composites containing it (one per occurrence), which a mutation invalidates.
+    __slots__ = ("_A", "_B", "_C", "_D", "_name", "_revision", "_frozen", "_aperture", "_parents", "__weakref__")
+
     @property
     def length(self) -> float:
         return 0
 
-    def __init__(self, *args, name="") -> None:
-        self.name = name
+    @property
+    def name(self) -> str:
+        # Names are only formatted when asked for, most elements never need them
+        return self._name if self._name is not None else self._default_name()
+
+    @name.setter
+    def name(self, value: str):
+        if self._frozen:
+            raise AttributeError(f"Shared element {self.name} is immutable.")
+        self._name = value
+
+    @property
+    def aperture(self) -> float:
+        """Clear aperture radius, None for an unlimited element. Only used by ray tracing."""
+        return self._aperture
+
+    @aperture.setter
+    def aperture(self, value: float):
+        if self._frozen:
+            raise AttributeError(f"Shared element {self.name} is immutable.")
+        self._aperture = value
+
+    def __init__(self, *args, name=None) -> None:
         """Accepts A, B, C, D matrix elements or a matrix itself"""
+        self._name = name
+        self._revision = 0
+        self._frozen = False
+        self._aperture = None
+        self._parents = None
         if len(args) == 4:
             self._A = args[0]
             self._B = args[1]
             self._C = args[2]
             self._D = args[3]
         elif len(args) == 1 and isinstance(args[0], np.ndarray) and self.__is_square_matrix_of_dim(args[0], 2):
-            self.matrix = args[0]
+            self._assign(args[0])
         else:
             raise ValueError("No matrix definition present in init.")
 
+    @classmethod
+    def shared(cls, *args, **kwargs) -> "ABCDElement":
+        """Returns an immutable instance shared by everyone asking for the same parameters.
+
+        Falls back to a new (mutable) instance when the parameters are not hashable, e.g. arrays.
+        """
+        try:
+            key = (cls, tuple((type(a), a) for a in args), tuple(sorted((k, type(v), v) for k, v in kwargs.items())))
+            element = _SHARED.get(key)
+        except TypeError:
+            return cls(*args, **kwargs)
+        if element is None:
+            element = cls(*args, **kwargs)
+            element._frozen = True
+            _SHARED[key] = element
+        return element
+
+    def _default_name(self) -> str:
+        return ""
+
     def __is_square_matrix_of_dim(self, m: np.ndarray, dim: int):
+        if m.ndim > 2:
+            # Stack of matrices with shape (..., dim, dim)
+            return m.shape[-2:] == (dim, dim)
         return all(len(row) == len(m) for row in m) and len(m) == dim
 
+    @property
+    def parameters(self) -> dict:
+        """Named parameters the element was built from. Generic elements have none."""
+        return {}
+
+    def with_parameters(self, **parameters) -> "ABCDElement":
+        """Returns a new element of the same type with some of its parameters replaced.
+
+        Parameters may be arrays, in which case the new element holds a stack of matrices.
+
+        Raises:
+            ValueError: When the element has no parameter of a given name.
+        """
+        unknown = set(parameters) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"{type(self).__name__} has no parameter(s) {', '.join(sorted(unknown))}.")
+        return type(self)(**{**self.parameters, **parameters})
+
     @property
     def matrix(self) -> np.ndarray:
-        return np.array([[self._A, self._B], [self._C, self._D]])
+        """ABCD matrix of shape (2, 2), or (..., 2, 2) when the element has array-valued parameters.
+
+        For astigmatic elements this is the matrix of the tangential (x) plane.
+        """
+        return _stack_matrix(self._A, self._B, self._C, self._D)
+
+    @property
+    def astigmatic(self) -> bool:
+        """Whether the element acts differently in the tangential and sagittal planes."""
+        return False
+
+    @property
+    def sagittal_matrix(self) -> np.ndarray:
+        """ABCD matrix of the sagittal (y) plane, equal to "matrix" unless the element is astigmatic."""
+        return self.matrix
+
+    @property
+    def planes(self) -> np.ndarray:
+        """Tangential and sagittal matrices stacked along axis -3, shape (..., 2, 2, 2)."""
+        tangential = self.matrix
+        if not self.astigmatic:
+            return np.stack([tangential, tangential], axis=-3)
+        return np.stack(np.broadcast_arrays(tangential, self.sagittal_matrix), axis=-3)
 
     @matrix.setter
     def matrix(self, value: np.ndarray):
-        self._A = value[0][0]
-        self._B = value[0][1]
-        self._C = value[1][0]
-        self._D = value[1][1]
+        if self._frozen:
+            raise AttributeError(f"Shared element {self.name} is immutable.")
+        self._assign(value)
+        self._touch()
+
+    def _touch(self) -> None:
+        """Marks the element as mutated, so composites containing it rebuild their matrices."""
+        self._revision += 1
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._parents:
+            for ref in self._parents:
+                parent = ref()
+                if parent is not None:
+                    parent._invalidate()
+
+    def _adopt(self, parent: "ABCDCompositeElement") -> None:
+        """Registers a composite containing this element. Shared elements never change and keep no parents."""
+        if self._frozen:
+            return
+        if self._parents is None:
+            self._parents = []
+        elif len(self._parents) >= 16 and len(self._parents) & (len(self._parents) - 1) == 0:
+            # Drop composites that no longer exist whenever the list doubles
+            self._parents = [ref for ref in self._parents if ref() is not None]
+        self._parents.append(weakref.ref(parent))
+
+    def _abandon(self, parent: "ABCDCompositeElement") -> None:
+        """Unregisters one occurrence of this element in a composite."""
+        if self._parents:
+            for i, ref in enumerate(self._parents):
+                if ref() is parent:
+                    del self._parents[i]
+                    return
+
+    def _stamp(self) -> int:
+        return self._revision
+
+    def __getstate__(self) -> tuple:
+        # Parent references are weak and process local, composites register again when unpickled
+        slots = {name: getattr(self, name) for name in _slot_names(type(self)) if hasattr(self, name)}
+        return getattr(self, "__dict__", None) or None, slots
+
+    def __setstate__(self, state: tuple) -> None:
+        attributes, slots = state
+        self._parents = None
+        if attributes:
+            self.__dict__.update(attributes)
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
+
+    def _assign(self, value: np.ndarray) -> None:
+        if value.ndim > 2:
+            self._A = value[..., 0, 0]
+            self._B = value[..., 0, 1]
+            self._C = value[..., 1, 0]
+            self._D = value[..., 1, 1]
+            return
+        # Plain Python scalars are smaller and faster to work with than NumPy scalars
+        (self._A, self._B), (self._C, self._D) = value.tolist()
     
     def act(self, q_param: complex) -> complex:
         nom = self._A * q_param + self._B
@@ -45,39 +225,81 @@ class ABCDElement:
         return nom / denom
 
 class Media(ABCDElement):
+    __slots__ = ("_d", "_n")
+
     @property
     def length(self) -> float:
         return self._d
+
+    @property
+    def n(self) -> float:
+        return self._n
+
+    @n.setter
+    def n(self, value: float):
+        if self._frozen:
+            raise AttributeError(f"Shared element {self.name} is immutable.")
+        self._n = value
+
+    @property
+    def parameters(self) -> dict:
+        return {"d": self._d, "n": self._n}
+
     def __init__(self, d, n):
         self._d = d
-        self.n = n
-        super().__init__(1, d, 0, 1, name=f"Media(d={d}, n={n})")
+        self._n = n
+        super().__init__(1, d, 0, 1)
+
+    def _default_name(self) -> str:
+        return f"Media(d={self._d}, n={self.n})"
 
 
 class FreeSpace(Media):
     """Propagation in free space or in a medium of constant refractive index"""
+    __slots__ = ()
+
     @property
     def length(self) -> float:
         return self._d
 
+    @property
+    def parameters(self) -> dict:
+        return {"d": self._d}
+
     def __init__(self, d) -> None:
-        self._d = d
         super().__init__(d=d, n=1)
-        self.name = f"FreeSpace(d={d})"
+
+    def _default_name(self) -> str:
+        return f"FreeSpace(d={self._d})"
 
 class ThinLens(ABCDElement):
     """Thin lens aproximation. Only valid if the focal length is much greater than the thickness of the lens"""
+    __slots__ = ("_f",)
+
     @property
     def f(self):
         return self._f
 
+    @property
+    def parameters(self) -> dict:
+        return {"f": self._f}
+
     def __init__(self, f: float) -> None:
         self._f = f
-        super().__init__(1, 0, -1/f, 1, name=f"ThinLens(f={f})")
+        super().__init__(1, 0, -1/f, 1)
+
+    def _default_name(self) -> str:
+        return f"ThinLens(f={self._f})"
 
 
 class FlatInterface(ABCDElement):
     """Refraction at a flat interface"""
+    __slots__ = ("_n1", "_n2")
+
+    @property
+    def parameters(self) -> dict:
+        return {"n1": self._n1, "n2": self._n2}
+
     def __init__(self, n1, n2) -> None:
         """
 
@@ -85,11 +307,18 @@ class FlatInterface(ABCDElement):
             n1 (float): Refractive index of first media
             n2 (float): Refractive index of second media
         """
-        super().__init__(1, 0, 0, n1 / n2, name=f"FlatInterface(n1={n1}, n2={n2})")
+        self._n1 = n1
+        self._n2 = n2
+        super().__init__(1, 0, 0, n1 / n2)
+
+    def _default_name(self) -> str:
+        return f"FlatInterface(n1={self._n1}, n2={self._n2})"
 
 
 class CurvedInterface(ABCDElement):
     """Refraction at a curved interface"""
+    __slots__ = ("_n1", "_n2", "_R")
+
     @property
     def n1(self):
         return self._n1
@@ -102,6 +331,10 @@ class CurvedInterface(ABCDElement):
     def R(self):
         return self._R
 
+    @property
+    def parameters(self) -> dict:
+        return {"n1": self._n1, "n2": self._n2, "R": self._R}
+
     def __init__(self, n1, n2, R) -> None:
         """
         Args:
@@ -112,32 +345,240 @@ class CurvedInterface(ABCDElement):
         self._n1 = n1
         self._n2 = n2
         self._R = R
-        super().__init__(self.__build_matrix(), name=f"CurvedInterface(n1={n1}, n2={n2}, R={R})")
+        super().__init__(
+            1,                                              0,
+            -1*(self.n2 - self.n1) / (self.n2 * self.R),    self.n1 / self.n2)
+
+    def _default_name(self) -> str:
+        return f"CurvedInterface(n1={self._n1}, n2={self._n2}, R={self._R})"
+
+class CurvedMirror(ABCDElement):
+    """Reflection on a spherical mirror, the beam keeps propagating along +z after the reflection."""
+    __slots__ = ("_R",)
+
+    @property
+    def R(self):
+        return self._R
+
+    @property
+    def parameters(self) -> dict:
+        return {"R": self._R}
+
+    def __init__(self, R: float) -> None:
+        """
+        Args:
+            R (float): Radius of curvature, positive for a concave (focusing) mirror, inf for a flat one.
+        """
+        self._R = R
+        super().__init__(1, 0, -2/R, 1)
+
+    def _default_name(self) -> str:
+        return f"CurvedMirror(R={self._R})"
+
+
+class CylindricalLens(ABCDElement):
+    """Thin lens focusing in one plane only."""
+    __slots__ = ("_f", "_plane")
+
+    @property
+    def f(self):
+        return self._f
+
+    @property
+    def plane(self) -> str:
+        return self._plane
+
+    @property
+    def parameters(self) -> dict:
+        return {"f": self._f, "plane": self._plane}
+
+    @property
+    def astigmatic(self) -> bool:
+        return True
+
+    @property
+    def sagittal_matrix(self) -> np.ndarray:
+        return _stack_matrix(1, 0, -1/self._f if self._plane == "sagittal" else 0, 1)
+
+    def __init__(self, f: float, plane: str = "tangential") -> None:
+        """
+        Args:
+            f (float): Focal length in the focusing plane.
+            plane (str): Focusing plane, "tangential" (x) or "sagittal" (y).
+        """
+        if plane not in ("tangential", "sagittal"):
+            raise ValueError(f"Unknown plane {plane!r}, expected 'tangential' or 'sagittal'.")
+        self._f = f
+        self._plane = plane
+        super().__init__(1, 0, -1/f if plane == "tangential" else 0, 1)
+
+    def _default_name(self) -> str:
+        return f"CylindricalLens(f={self._f}, plane={self._plane})"
+
+
+class TiltedMirror(ABCDElement):
+    """Spherical mirror hit at an angle of incidence, focusing more strongly in the tangential plane."""
+    __slots__ = ("_R", "_angle")
+
+    @property
+    def R(self):
+        return self._R
+
+    @property
+    def angle(self):
+        return self._angle
+
+    @property
+    def parameters(self) -> dict:
+        return {"R": self._R, "angle": self._angle}
+
+    @property
+    def astigmatic(self) -> bool:
+        return True
+
+    @property
+    def sagittal_matrix(self) -> np.ndarray:
+        return _stack_matrix(1, 0, -2*np.cos(self._angle)/self._R, 1)
+
+    def __init__(self, R: float, angle: float) -> None:
+        """
+        Args:
+            R (float): Radius of curvature, positive for a concave mirror.
+            angle (float): Angle of incidence in radians, in the tangential plane.
+        """
+        self._R = R
+        self._angle = angle
+        super().__init__(1, 0, -2/(R*np.cos(angle)), 1)
+
+    def _default_name(self) -> str:
+        return f"TiltedMirror(R={self._R}, angle={self._angle})"
+
+
+class _ChildrenView(Sequence):
+    """Read-only view of the childs of a composite, edits go through the composite's own methods."""
+    __slots__ = ("_items",)
+
+    def __init__(self, items: List[ABCDElement]) -> None:
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[ABCDElement]:
+        return iter(self._items)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._items!r})"
 
-    def __build_matrix(self) -> np.ndarray:
-        return np.array([
-            [1,                                             0],
-            [-1*(self.n2 - self.n1) / (self.n2 * self.R),   self.n1 / self.n2]
-        ])
 
 class ABCDCompositeElement(ABCDElement):
-    """Represents ABCDelement that consists of child elements"""
+    """Represents ABCDelement that consists of child elements.
+
+    The composite matrix and length are cached. Children hold weak references to the
+    composites containing them and mark them dirty when mutated, so the cache is rebuilt
+    lazily and validating it costs nothing while no child changes. childs is read-only.
+    """
+    __slots__ = ("_childs", "_view", "_length", "_dirty", "_sagittal_cache")
+
+    @property
+    def childs(self) -> Sequence:
+        return self._view
+
     @property
     def length(self) -> float:
-        return reduce(lambda a, b: a +b , [e.length for e in self.childs])
+        self._refresh()
+        return self._length
+
+    @property
+    def matrix(self) -> np.ndarray:
+        self._refresh()
+        return ABCDElement.matrix.fget(self)
+
+    @matrix.setter
+    def matrix(self, value: np.ndarray):
+        ABCDElement.matrix.fset(self, value)
 
-    def __init__(self, childs: List[ABCDElement], name="") -> None:
-        self.name = ""
-        self.childs = childs
+    def __init__(self, childs: List[ABCDElement], name=None) -> None:
+        self._childs = childs
+        self._view = _ChildrenView(childs) if isinstance(childs, list) else childs
         super().__init__(self._build_matrix(), name=name)
+        self._length = self._sum_lengths()
+        self._dirty = False
+        self._sagittal_cache = None
+        for child in self._distinct_childs():
+            child._adopt(self)
+
+    def __setstate__(self, state: tuple) -> None:
+        super().__setstate__(state)
+        for child in self._distinct_childs():
+            child._adopt(self)
+
+    @property
+    def astigmatic(self) -> bool:
+        return self._sagittal_state()[0]
+
+    @property
+    def sagittal_matrix(self) -> np.ndarray:
+        astigmatic, sagittal = self._sagittal_state()
+        return sagittal if astigmatic else self.matrix
+
+    def _sagittal_state(self) -> tuple:
+        """Whether any child is astigmatic and the sagittal product, built lazily and kept until the next rebuild."""
+        revision = self._stamp()
+        if self._sagittal_cache is None or self._sagittal_cache[0] != revision:
+            astigmatic = self._any_astigmatic()
+            self._sagittal_cache = (revision, astigmatic, self._build_sagittal() if astigmatic else None)
+        return self._sagittal_cache[1:]
+
+    def _any_astigmatic(self) -> bool:
+        return any(e.astigmatic for e in self._childs)
+
+    def _build_sagittal(self) -> np.ndarray:
+        return reduce(np.matmul, [e.sagittal_matrix for e in reversed(self._childs)])
+
+    def act(self, q_param: complex) -> complex:
+        self._refresh()
+        return super().act(q_param)
+
+    def _stamp(self) -> int:
+        self._refresh()
+        return self._revision
+
+    def _distinct_childs(self):
+        # Every occurrence is registered, so removing one occurrence keeps the others
+        return self._childs
+
+    def _sum_lengths(self) -> float:
+        return sum((e.length for e in self._childs), 0)
+
+    def _invalidate(self) -> None:
+        """Called by a mutated child. A dirty child always has dirty parents, so propagation stops early."""
+        if not self._dirty:
+            self._dirty = True
+            self._notify()
+
+    def _refresh(self) -> None:
+        """Rebuilds the cached matrix and length if any child changed since the last build."""
+        if self._dirty:
+            self._assign(self._build_matrix())
+            self._length = self._sum_lengths()
+            self._dirty = False
+            # The parents were invalidated together with this composite
+            self._revision += 1
 
     def _build_matrix(self) -> np.ndarray:
-        if len(self.childs) == 0:
+        if len(self._childs) == 0:
             return np.identity(2)
-        return reduce(lambda c, b: c.dot(b), [e.matrix for e in reversed(self.childs)])
+        # matmul broadcasts over stacks of matrices produced by array-valued parameters
+        return reduce(np.matmul, [e.matrix for e in reversed(self._childs)])
 
 class ThickLens(ABCDCompositeElement):
     """Propagation through ThickLens."""
+    __slots__ = ("_n", "_R1", "_R2", "_d")
+
     @property
     def f(self) -> float:
         # Using Lens Maker's formula
@@ -145,6 +586,10 @@ class ThickLens(ABCDCompositeElement):
         f_inv =  (self._n/1 - 1) * (1/self._R1 + 1/self._R2) 
         return 1/f_inv
 
+    @property
+    def parameters(self) -> dict:
+        return {"R1": self._R1, "n": self._n, "R2": self._R2, "d": self._d}
+
     def __init__(self, R1, n, R2, d) -> None:
         """ It is assumed, that the refractive index of free space is 1
 
@@ -159,29 +604,122 @@ class ThickLens(ABCDCompositeElement):
         self._R2 = R2
         self._d = d
 
+        # Lenses of a catalog share their surfaces, so the children are shared immutable instances
         components = [
-            CurvedInterface(1, n, R1),
-            Media(d, n),
-            CurvedInterface(n, 1, -R2)
+            CurvedInterface.shared(1, n, R1),
+            Media.shared(d, n),
+            CurvedInterface.shared(n, 1, -R2)
         ]
 
-        super().__init__(components, name=f"ThickLens(R1={R1}, d={d}, R2={R2}, n={n})")
+        super().__init__(components)
+
+    def _default_name(self) -> str:
+        return f"ThickLens(R1={self._R1}, d={self._d}, R2={self._R2}, n={self._n})"
 
 
 
 
 
 class PlanoConvexLens(ThickLens):
+    __slots__ = ("_R", "__inversed")
+
     @property
     def is_inversed(self):
         return self.__inversed
+
+    @property
+    def parameters(self) -> dict:
+        return {"R": self._R, "d": self._d, "n": self._n, "inversed": self.__inversed}
     
     def __init__(self, R, d, n, inversed=False) -> None:
+        self._R = R
         if inversed:
             super().__init__(R, n, float("inf"), d)
-            self.name = f"PlanConvexLens(R={R}, d={d}, n={n})"
         else:
             super().__init__(float("inf"), n, R, d)
-            self.name = f"PlanConvexLens(R={R}, d={d}, n={n})"
         self.__inversed = inversed
 
+    def _default_name(self) -> str:
+        return f"PlanConvexLens(R={self._R}, d={self._d}, n={self._n})"
+
+
+class _RepeatedElements(Sequence):
+    """Read-only view of one element repeated n times, stores the element only once."""
+    __slots__ = ("_element", "_count")
+
+    def __init__(self, element: ABCDElement, count: int) -> None:
+        self._element = element
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._element] * len(range(*index.indices(self._count)))
+        if not -self._count <= index < self._count:
+            raise IndexError("Repeat index out of range")
+        return self._element
+
+    def __iter__(self) -> Iterator[ABCDElement]:
+        for _ in range(self._count):
+            yield self._element
+
+
+class Repeat(ABCDCompositeElement):
+    """Element (unit cell) traversed n times in a row, e.g. a periodic lens relay or a multipass cell.
+
+    The matrix is the n-th power of the unit cell matrix, computed by binary exponentiation,
+    so the cost grows with log(n). The childs are a lazy view of the unit cell repeated n times.
+    """
+    __slots__ = ("_element", "_count")
+
+    @property
+    def element(self) -> ABCDElement:
+        return self._element
+
+    @property
+    def n(self) -> int:
+        return self._count
+
+    @property
+    def parameters(self) -> dict:
+        return {"element": self._element, "n": self._count}
+
+    def __init__(self, element: ABCDElement, n: int, name=None) -> None:
+        """
+        Args:
+            element (ABCDElement): Unit cell, e.g. OpticalPath(FreeSpace(d), ThinLens(f)).
+            n (int): Number of passes through the unit cell.
+        """
+        if n < 0:
+            raise ValueError("Number of repetitions must be non-negative.")
+        self._element = element
+        self._count = int(n)
+        super().__init__(_RepeatedElements(element, self._count), name=name)
+
+    def q_sequence(self, q_param: complex) -> Iterator[complex]:
+        """Lazily yields the complex beam parameter after every pass through the unit cell."""
+        for _ in range(self._count):
+            q_param = self._element.act(q_param)
+            yield q_param
+
+    def _distinct_childs(self):
+        # All children are the same element, it is registered once
+        return (self._element,)
+
+    def _sum_lengths(self) -> float:
+        return self._count * self._element.length
+
+    def _build_matrix(self) -> np.ndarray:
+        # matrix_power squares repeatedly and works on stacks of matrices as well
+        return np.linalg.matrix_power(np.asarray(self._element.matrix, dtype=float), self._count)
+
+    def _any_astigmatic(self) -> bool:
+        return self._element.astigmatic
+
+    def _build_sagittal(self) -> np.ndarray:
+        return np.linalg.matrix_power(np.asarray(self._element.sagittal_matrix, dtype=float), self._count)
+
+    def _default_name(self) -> str:
+        return f"Repeat({self._element.name}, n={self._count})"
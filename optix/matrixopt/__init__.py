@@ -1,2 +1,19 @@
 from optix.matrixopt.ABCDformalism import *
-from optix.matrixopt.optical_system import OpticalPath
\ No newline at end of file
+from optix.matrixopt.optical_system import OpticalPath
+from optix.matrixopt.editable_path import EditableOpticalPath
+from optix.matrixopt.envelope import *
+from optix.matrixopt.compiled import CompiledPath
+from optix.matrixopt.gradients import *
+from optix.matrixopt.tolerance import *
+from optix.matrixopt.resonator import *
+from optix.matrixopt.rays import *
+from optix.matrixopt.dispersion import *
+from optix.matrixopt.astigmatic import *
+
+
+def __getattr__(name):
+    # Plotting is optional, matplotlib is only imported when Drawer is requested
+    if name == "Drawer":
+        from optix.matrixopt.plotting import Drawer
+        return Drawer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,53 @@
+from collections import namedtuple
+from typing import Union
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDCompositeElement, Media
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+__all__ = ["AstigmaticBeam", "propagate_astigmatic"]
+
+AstigmaticBeam = namedtuple("AstigmaticBeam", "tangential sagittal")
+AstigmaticBeam.__doc__ = """Elliptical (simple astigmatic) Gaussian beam given by one beam per principal plane.
+
+Both fields are GaussianBeam instances, or GaussianBeamArray instances for batches."""
+
+
+def propagate_astigmatic(
+        path: ABCDCompositeElement,
+        tangential: Union[GaussianBeam, GaussianBeamArray],
+        sagittal: Union[GaussianBeam, GaussianBeamArray] = None) -> AstigmaticBeam:
+    """Propagates the tangential (x) and sagittal (y) beams through the path in one stacked evaluation.
+
+    The complex beam parameters of both planes are stacked along a leading axis of length 2 and
+    transformed by the (2, 2, 2) stack of plane matrices of the path, which composites cache
+    just like their regular matrix.
+
+    Args:
+        path (ABCDCompositeElement): Optical path, may contain astigmatic elements (CylindricalLens, TiltedMirror).
+        tangential (GaussianBeam or GaussianBeamArray): Beam (batch) in the tangential plane.
+        sagittal (GaussianBeam or GaussianBeamArray, optional): Beam (batch) in the sagittal plane, defaults to a round beam.
+
+    Returns:
+        AstigmaticBeam whose beams have the shape of the path parameters followed by the batch shape of the beams.
+    """
+    sagittal = tangential if sagittal is None else sagittal
+    q_in = np.stack(np.broadcast_arrays(tangential.cbeam_parameter(0), sagittal.cbeam_parameter(0)))
+    planes = np.moveaxis(path.planes, -3, 0)
+    # Layout: plane axis, then the axes of array-valued parameters, then the batch axes of the beams
+    sweep, batch = planes.shape[1:-2], q_in.shape[1:]
+    planes = planes.reshape((2,) + sweep + (1,) * len(batch) + (2, 2))
+    q_in = q_in.reshape((2,) + (1,) * len(sweep) + batch)
+    A, B, C, D = planes[..., 0, 0], planes[..., 0, 1], planes[..., 1, 0], planes[..., 1, 1]
+    q_out = (A * q_in + B) / (C * q_in + D)
+    length = path.length
+    if np.ndim(length):
+        length = np.reshape(length, np.shape(length) + (1,) * len(batch))
+
+    refractive_index = path.childs[-1].n if len(path.childs) and isinstance(path.childs[-1], Media) else 1
+    beams = []
+    for beam, q in zip((tangential, sagittal), q_out):
+        if isinstance(beam, GaussianBeam) and np.ndim(q) == 0:
+            beams.append(GaussianBeam.from_q(wave_length=beam.wavelength, q=complex(q), z_pos=length, refractive_index=refractive_index, amplitude=beam.amplitude))
+        else:
+            beams.append(GaussianBeamArray.from_q(beam.wavelength, q, length, refractive_index, beam.amplitude))
+    return AstigmaticBeam(*beams)
@@ -0,0 +1,223 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from optix.matrixopt.ABCDformalism import (
+    ABCDElement, ABCDCompositeElement, Media, ThinLens, FlatInterface, CurvedInterface, ThickLens, PlanoConvexLens, Repeat)
+from optix.beams import GaussianBeam
+
+__all__ = ["CompiledPath"]
+
+# Record kinds, the parameters stored in a record are listed next to them
+MATRIX = 0          # A, B, C, D
+MEDIA = 1           # d, n (its length is d, the length slot stays 0)
+THIN_LENS = 2       # f
+FLAT_INTERFACE = 3  # n1, n2
+CURVED_INTERFACE = 4  # n1, n2, R
+
+# Record layout: kind, four parameter slots, length
+RECORD_WIDTH = 6
+LENGTH = 5
+
+# Paths of at most this many records are multiplied as Python floats instead of by tree reduction
+SMALL_PATH = 32
+
+
+def _records(element: ABCDElement) -> List[Tuple[float, ...]]:
+    """Flattens an element into (kind, p0, p1, p2, p3, length) records in propagation order."""
+    if isinstance(element, Repeat):
+        # Unrolling would cost one record per pass, the power of the unit cell is kept as one matrix
+        matrix = element.matrix
+        if matrix.ndim > 2:
+            raise ValueError(f"Cannot compile element with array-valued parameters: {element.name}")
+        return [(MATRIX, *matrix.reshape(-1), element.length)]
+    if isinstance(element, ABCDCompositeElement):
+        return [r for child in element.childs for r in _records(child)]
+    if np.ndim(element._A) or np.ndim(element._B) or np.ndim(element._C) or np.ndim(element._D):
+        raise ValueError(f"Cannot compile element with array-valued parameters: {element.name}")
+    if isinstance(element, Media):
+        return [(MEDIA, element._d, element.n, 0, 0, 0)]
+    if isinstance(element, ThinLens):
+        return [(THIN_LENS, element.f, 0, 0, 0, 0)]
+    if isinstance(element, FlatInterface):
+        return [(FLAT_INTERFACE, element._n1, element._n2, 0, 0, 0)]
+    if isinstance(element, CurvedInterface):
+        return [(CURVED_INTERFACE, element.n1, element.n2, element.R, 0, 0)]
+    return [(MATRIX, element._A, element._B, element._C, element._D, element.length)]
+
+
+def _slots(element: ABCDElement) -> Dict[str, List[Tuple[int, int, float]]]:
+    """Where the parameters of an element are stored: name -> [(row, column, factor)] within its records.
+
+    Elements not listed here (and parameters missing from the map) are updated by rebuilding their records.
+    """
+    if isinstance(element, PlanoConvexLens):
+        curved = (0, 3, 1) if element.parameters["inversed"] else (2, 3, -1)
+        return {"R": [curved], "d": [(1, 1, 1)], "n": [(0, 2, 1), (1, 2, 1), (2, 1, 1)]}
+    if isinstance(element, ThickLens):
+        # CurvedInterface(1, n, R1), Media(d, n), CurvedInterface(n, 1, -R2)
+        return {"R1": [(0, 3, 1)], "R2": [(2, 3, -1)], "d": [(1, 1, 1)], "n": [(0, 2, 1), (1, 2, 1), (2, 1, 1)]}
+    if isinstance(element, Media):
+        return {"d": [(0, 1, 1)], "n": [(0, 2, 1)]}
+    if isinstance(element, ThinLens):
+        return {"f": [(0, 1, 1)]}
+    if isinstance(element, FlatInterface):
+        return {"n1": [(0, 1, 1)], "n2": [(0, 2, 1)]}
+    if isinstance(element, CurvedInterface):
+        return {"n1": [(0, 1, 1)], "n2": [(0, 2, 1)], "R": [(0, 3, 1)]}
+    return {}
+
+
+class CompiledPath:
+    """Optical path flattened into a packed float64 array of element records.
+
+    Every leaf element becomes one row (kind, p0, p1, p2, p3, length) of "records". The
+    evaluator builds all leaf matrices with a few masked NumPy expressions and multiplies
+    them by pairwise (tree) reduction, so no element objects are touched per evaluation.
+    Parameters can be changed in place either through update() or by writing to records
+    (a MEDIA record's length is its d).
+    """
+    @property
+    def records(self) -> np.ndarray:
+        return self._records
+
+    @property
+    def length(self) -> float:
+        return float(self._records[:, LENGTH].sum() + self._records[self._media, 1].sum())
+
+    def __init__(self, path: ABCDCompositeElement) -> None:
+        records = []
+        self._slices: Dict[int, List[slice]] = {}
+        self._elements: Dict[int, ABCDElement] = {}
+        self._slot_cache: Dict[int, dict] = {}
+        for element in path.childs:
+            self.__index(element, records)
+        self._records = np.array(records, dtype=float).reshape(-1, RECORD_WIDTH)
+        kinds = self._records[:, 0]
+        self._masks = [(kind, np.flatnonzero(kinds == kind)) for kind in (MATRIX, MEDIA, THIN_LENS, FLAT_INTERFACE, CURVED_INTERFACE)]
+        self._masks = [(kind, index) for kind, index in self._masks if len(index)]
+        self._media = np.flatnonzero(kinds == MEDIA)
+        # Identity matrices every evaluation starts from, only the parameter entries are rewritten
+        self._identity = np.zeros((len(self._records), 2, 2))
+        self._identity[:, 0, 0] = 1
+        self._identity[:, 1, 1] = 1
+        # Same convention as OpticalPath.propagate: the output medium is given by the last element,
+        # its index is read from its record so that updates are taken into account
+        last = path.childs[-1] if len(path.childs) else None
+        self._output_row = len(self._records) - 1 if isinstance(last, Media) else None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __index(self, element: ABCDElement, records: list) -> None:
+        """Appends the records of an element, remembering which rows belong to every occurrence of it and its children."""
+        start = len(records)
+        if isinstance(element, ABCDCompositeElement) and not isinstance(element, Repeat):
+            for child in element.childs:
+                self.__index(child, records)
+        else:
+            records.extend(_records(element))
+        self._slices.setdefault(id(element), []).append(slice(start, len(records)))
+        self._elements.setdefault(id(element), element)
+
+    def records_of(self, element: ABCDElement) -> List[slice]:
+        """Rows of records that belong to the given element, one slice per occurrence in the compiled path."""
+        try:
+            return self._slices[id(element)]
+        except KeyError:
+            raise KeyError(f"{element.name} is not part of the compiled path.") from None
+
+    def update(self, element: ABCDElement, **parameters) -> None:
+        """Re-parameterizes an element of the compiled path in place, at every occurrence of it.
+
+        Args:
+            element (ABCDElement): Element of the original path.
+            parameters: New values of the element parameters, see ABCDElement.parameters.
+
+        Raises:
+            ValueError: When the new parameters change the structure of the element.
+        """
+        occurrences = self.records_of(element)
+        original = self._elements[id(element)]
+        slots = self._slot_cache.get(id(element))
+        if slots is None:
+            # Only the element's own parameters, e.g. FreeSpace has no "n" although it is a Media
+            slots = {name: slot for name, slot in _slots(original).items() if name in original.parameters}
+            self._slot_cache[id(element)] = slots
+        if not slots or not slots.keys() >= parameters.keys():
+            records = np.array(_records(original.with_parameters(**parameters)), dtype=float)
+            rows = occurrences[0]
+            if records.shape != self._records[rows].shape or (records[:, 0] != self._records[rows, 0]).any():
+                raise ValueError(f"New parameters change the structure of {element.name}.")
+            for rows in occurrences:
+                self._records[rows] = records
+            return
+        # Leaves and lenses are written straight into their record slots
+        if any(np.ndim(value) for value in parameters.values()):
+            raise ValueError(f"Cannot compile element with array-valued parameters: {element.name}")
+        for name, value in parameters.items():
+            for row, column, factor in slots[name]:
+                for rows in occurrences:
+                    self._records[rows.start + row, column] = factor * value
+
+    def matrices(self) -> np.ndarray:
+        """Matrices of all leaf elements, shape (n, 2, 2)."""
+        p = self._records
+        m = self._identity.copy()
+        for kind, i in self._masks:
+            if kind == MATRIX:
+                m[i] = p[i, 1:5].reshape(-1, 2, 2)
+            elif kind == MEDIA:
+                m[i, 0, 1] = p[i, 1]
+            elif kind == THIN_LENS:
+                m[i, 1, 0] = -1 / p[i, 1]
+            elif kind == FLAT_INTERFACE:
+                m[i, 1, 1] = p[i, 1] / p[i, 2]
+            elif kind == CURVED_INTERFACE:
+                m[i, 1, 0] = -(p[i, 2] - p[i, 1]) / (p[i, 2] * p[i, 3])
+                m[i, 1, 1] = p[i, 1] / p[i, 2]
+        return m
+
+    def _product(self) -> Tuple[float, float, float, float]:
+        """System matrix entries of a short path, evaluated straight from the records as Python floats.
+
+        Per call NumPy overhead dominates paths of a few elements, this avoids building the leaf matrices.
+        """
+        a, b, c, d = 1.0, 0.0, 0.0, 1.0
+        for kind, p0, p1, p2, p3, _ in self._records.tolist():
+            if kind == MEDIA:
+                a, b = a + p0 * c, b + p0 * d
+                continue
+            if kind == MATRIX:
+                A, B, C, D = p0, p1, p2, p3
+            elif kind == THIN_LENS:
+                A, B, C, D = 1.0, 0.0, -1 / p0, 1.0
+            elif kind == FLAT_INTERFACE:
+                A, B, C, D = 1.0, 0.0, 0.0, p0 / p1
+            else:
+                A, B, C, D = 1.0, 0.0, -(p1 - p0) / (p1 * p2), p0 / p1
+            a, b, c, d = A * a + B * c, A * b + B * d, C * a + D * c, C * b + D * d
+        return a, b, c, d
+
+    def matrix(self) -> np.ndarray:
+        """System matrix of the compiled path."""
+        if len(self._records) <= SMALL_PATH:
+            a, b, c, d = self._product()
+            return np.array([[a, b], [c, d]])
+        m = self.matrices()
+        while len(m) > 1:
+            # Later elements multiply from the left: (e0, e1) -> e1 @ e0
+            odd = len(m) % 2
+            pairs = np.matmul(m[1::2], m[0:len(m) - odd:2])
+            m = np.concatenate([pairs, m[-1:]]) if odd else pairs
+        return m[0]
+
+    def act(self, q_param):
+        if len(self._records) <= SMALL_PATH:
+            A, B, C, D = self._product()
+        else:
+            (A, B), (C, D) = self.matrix().tolist()
+        return (A * q_param + B) / (C * q_param + D)
+
+    def propagate(self, input: GaussianBeam) -> GaussianBeam:
+        q_out = self.act(input.cbeam_parameter(0))
+        output_index = self._records[self._output_row, 2] if self._output_row is not None else 1
+        return GaussianBeam.from_q(wave_length=input.wavelength, q=q_out, z_pos=self.length, refractive_index=output_index, amplitude=input.amplitude)
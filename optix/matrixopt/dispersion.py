@@ -0,0 +1,141 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Sequence
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement, Media
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+__all__ = ["Material", "Sellmeier", "Cauchy", "BK7", "FUSED_SILICA", "SpectralPropagation", "propagate_spectrum"]
+
+SpectralPropagation = namedtuple("SpectralPropagation", "wavelength q waist_radius waist_location focal_shift")
+SpectralPropagation.__doc__ = """Output beam of a path over a wavelength grid.
+
+"focal_shift" is the waist location relative to the one at the wavelength of the input beam."""
+
+# Fraunhofer d line, the usual reference of catalog refractive indices
+D_LINE = 587.56e-9
+
+
+class Material(float, ABC):
+    """Dispersive refractive index.
+
+    The value of the float is the refractive index at the reference wavelength, so a material
+    can be passed wherever elements expect a scalar n. The dispersion is only used by spectral
+    propagation, which evaluates n(wavelength) once per wavelength grid and caches it.
+    Wavelengths are in meters, like everywhere in optix. Subclasses implement _formula.
+    """
+    # Number of wavelength grids remembered per material
+    CACHE_SIZE = 16
+
+    def __new__(cls, *coefficients, reference_wavelength: float = D_LINE):
+        # float.__new__ bypasses the abstract method check of object.__new__
+        if cls.__abstractmethods__:
+            raise TypeError(f"Can't instantiate abstract class {cls.__name__} with abstract method(s) {', '.join(sorted(cls.__abstractmethods__))}")
+        nominal = float(cls._formula(np.asarray(reference_wavelength, dtype=float), *coefficients))
+        material = super().__new__(cls, nominal)
+        material.coefficients = coefficients
+        material.reference_wavelength = reference_wavelength
+        material._cache = {}
+        return material
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self.coefficients, self.reference_wavelength))
+
+    @staticmethod
+    @abstractmethod
+    def _formula(wavelength: np.ndarray, *coefficients) -> np.ndarray:
+        """Refractive index over a wavelength grid for the given coefficients."""
+
+    def refractive_index(self, wavelength) -> np.ndarray:
+        """Refractive index over a wavelength (grid), cached per grid. The returned array is read-only."""
+        wavelength = np.asarray(wavelength, dtype=float)
+        key = (wavelength.shape, wavelength.tobytes())
+        index = self._cache.get(key)
+        if index is None:
+            if len(self._cache) >= self.CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+            index = np.array(self._formula(wavelength, *self.coefficients), dtype=float)
+            index.setflags(write=False)
+            self._cache[key] = index
+        return index
+
+
+class Sellmeier(Material):
+    """Sellmeier dispersion formula n^2 = 1 + sum(B_i l^2 / (l^2 - C_i)), l in micrometers.
+
+    Takes the sequences B and C as published in glass catalogs, C in square micrometers.
+    """
+    @staticmethod
+    def _formula(wavelength: np.ndarray, B: Sequence[float], C: Sequence[float]) -> np.ndarray:
+        l2 = (wavelength * 1e6)**2
+        return np.sqrt(1 + sum(b * l2 / (l2 - c) for b, c in zip(B, C)))
+
+
+class Cauchy(Material):
+    """Cauchy dispersion formula n = A + B / l^2 + C / l^4, l in micrometers."""
+    @staticmethod
+    def _formula(wavelength: np.ndarray, A: float, B: float, C: float = 0) -> np.ndarray:
+        l2 = (wavelength * 1e6)**2
+        return A + B / l2 + C / l2**2
+
+
+def _rebuild(cls, coefficients, reference_wavelength) -> Material:
+    return cls(*coefficients, reference_wavelength=reference_wavelength)
+
+
+# Schott N-BK7 and Malitson's fused silica
+BK7 = Sellmeier((1.03961212, 0.231792344, 1.01046945), (0.00600069867, 0.0200179144, 103.560653))
+FUSED_SILICA = Sellmeier((0.6961663, 0.4079426, 0.8974794), (0.0684043**2, 0.1162414**2, 9.896161**2))
+
+
+def _disperse(element: ABCDElement, wavelength: np.ndarray) -> ABCDElement:
+    """Rebuilds an element with its materials evaluated over the wavelength grid, yielding stacked matrices."""
+    parameters = element.parameters
+    if isinstance(element, ABCDCompositeElement) and not parameters:
+        childs = [_disperse(child, wavelength) for child in element.childs]
+        if all(a is b for a, b in zip(childs, element.childs)):
+            return element
+        return ABCDCompositeElement(childs)
+    changes = {}
+    for name, value in parameters.items():
+        if isinstance(value, Material):
+            changes[name] = value.refractive_index(wavelength)
+        elif isinstance(value, ABCDElement):
+            dispersed = _disperse(value, wavelength)
+            if dispersed is not value:
+                changes[name] = dispersed
+    return element.with_parameters(**changes) if changes else element
+
+
+def propagate_spectrum(path: ABCDCompositeElement, input: GaussianBeam, wavelength: np.ndarray) -> SpectralPropagation:
+    """Propagates a beam through the path at every wavelength of a grid in one vectorized pass.
+
+    The input beam keeps its waist radius and location at every wavelength. Elements built with
+    Material refractive indices are evaluated at every wavelength, all others are achromatic.
+
+    Args:
+        path (ABCDCompositeElement): Optical path.
+        input (GaussianBeam): Input beam, its wavelength is the reference of the focal shift.
+        wavelength (np.ndarray): Wavelength grid.
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    # The reference wavelength is evaluated together with the grid
+    grid = np.append(wavelength.reshape(-1), input.wavelength)
+    beams = GaussianBeamArray(grid, w0=input.waist_radius, waist_location=input.waist_location, refractive_index=input.refractive_index)
+
+    childs = [_disperse(e, grid) for e in path.childs]
+    q_out = ABCDCompositeElement(childs).act(beams.cbeam_parameter(0)) if childs else beams.cbeam_parameter(0)
+    q_out = np.broadcast_to(q_out, grid.shape)
+
+    last = path.childs[-1] if len(path.childs) else None
+    refractive_index = 1
+    if isinstance(last, Media):
+        refractive_index = last.n.refractive_index(grid) if isinstance(last.n, Material) else last.n
+    waist_radius = np.sqrt(grid * q_out.imag / (np.pi * refractive_index))
+    waist_location = path.length - q_out.real
+    focal_shift = waist_location[:-1] - waist_location[-1]
+
+    shape = wavelength.shape
+    return SpectralPropagation(
+        wavelength, q_out[:-1].reshape(shape), waist_radius[:-1].reshape(shape),
+        waist_location[:-1].reshape(shape), focal_shift.reshape(shape))
@@ -0,0 +1,208 @@
+import random
+from typing import Optional, Tuple
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement
+from optix.matrixopt.optical_system import OpticalPath
+
+__all__ = ["EditableOpticalPath"]
+
+
+class _Node:
+    """Node of an implicit treap keyed by element position.
+
+    product is the partial ABCD product of the whole subtree, i.e. right @ own @ left,
+    since elements to the left come first along the path.
+    """
+    __slots__ = ("element", "matrix", "length", "product", "total_length", "size", "priority", "left", "right")
+
+    def __init__(self, element: ABCDElement) -> None:
+        self.element = element
+        self.matrix = element.matrix
+        self.length = element.length
+        self.product = self.matrix
+        self.total_length = self.length
+        self.size = 1
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+
+
+def _pull(node: _Node) -> None:
+    product = node.matrix
+    size = 1
+    length = node.length
+    if node.left is not None:
+        product = np.matmul(product, node.left.product)
+        size += node.left.size
+        length = node.left.total_length + length
+    if node.right is not None:
+        product = np.matmul(node.right.product, product)
+        size += node.right.size
+        length = length + node.right.total_length
+    node.product = product
+    node.size = size
+    node.total_length = length
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _split(node: Optional[_Node], k: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Splits the tree into the first k elements and the rest."""
+    if node is None:
+        return None, None
+    if k <= _size(node.left):
+        left, node.left = _split(node.left, k)
+        _pull(node)
+        return left, node
+    node.right, right = _split(node.right, k - _size(node.left) - 1)
+    _pull(node)
+    return node, right
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _pull(left)
+        return left
+    right.left = _merge(left, right.left)
+    _pull(right)
+    return right
+
+
+def _build(elements) -> Optional[_Node]:
+    """Builds the treap in linear time using the stack based cartesian tree construction.
+
+    Partial products are not computed yet, call _reload on the returned root.
+    """
+    stack = []
+    for element in elements:
+        node = _Node(element)
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+    return stack[0] if stack else None
+
+
+def _reload(node: Optional[_Node]) -> None:
+    """Re-reads the element matrices and recomputes all partial products bottom-up."""
+    if node is None:
+        return
+    _reload(node.left)
+    _reload(node.right)
+    node.matrix = node.element.matrix
+    node.length = node.element.length
+    _pull(node)
+
+
+class EditableOpticalPath(OpticalPath):
+    """OpticalPath supporting local edits in O(log n).
+
+    The elements are kept in a balanced binary tree (an implicit treap) whose nodes store
+    partial products of their subtrees, so insert, replace, remove and sub-range matrix
+    queries only re-multiply O(log n) matrices instead of the whole path.
+    """
+    def __init__(self, *elements: ABCDElement, name="") -> None:
+        self._root = _build(elements)
+        super().__init__(*elements, name=name)
+
+    def _build_matrix(self) -> np.ndarray:
+        # Called on init and whenever a child has been mutated
+        if self._root is None:
+            return np.identity(2)
+        _reload(self._root)
+        return self._root.product
+
+    def append(self, element: ABCDElement) -> None:
+        self.insert(len(self), element)
+
+    def insert(self, index: int, element: ABCDElement) -> None:
+        """Inserts an element before the given position, following list.insert semantics."""
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        self._refresh()
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(element)), right)
+        self._childs.insert(index, element)
+        element._adopt(self)
+        self._commit()
+
+    def replace(self, index: int, element: ABCDElement) -> ABCDElement:
+        """Replaces the element at the given position and returns the replaced one."""
+        index = self.__check_index(index)
+        self._refresh()
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        old = node.element
+        old._abandon(self)
+        node = _Node(element)
+        self._root = _merge(_merge(left, node), right)
+        self._childs[index] = element
+        element._adopt(self)
+        self._commit()
+        return old
+
+    def remove(self, index: int) -> ABCDElement:
+        """Removes the element at the given position and returns it."""
+        index = self.__check_index(index)
+        self._refresh()
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        node.element._abandon(self)
+        del self._childs[index]
+        self._commit()
+        return node.element
+
+    def range_matrix(self, start: int, stop: int) -> np.ndarray:
+        """ABCD matrix of the sub-path made of elements start, ..., stop - 1."""
+        self._refresh()
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return np.identity(2)
+        left, rest = _split(self._root, start)
+        middle, right = _split(rest, stop - start)
+        product = middle.product
+        self._root = _merge(_merge(left, middle), right)
+        return product
+
+    def range_length(self, start: int, stop: int) -> float:
+        """Length of the sub-path made of elements start, ..., stop - 1."""
+        self._refresh()
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return 0
+        left, rest = _split(self._root, start)
+        middle, right = _split(rest, stop - start)
+        length = middle.total_length
+        self._root = _merge(_merge(left, middle), right)
+        return length
+
+    def _commit(self) -> None:
+        """Publishes the root product as the path matrix after an edit of the tree.
+
+        Edits refresh the tree first, so the root product is current and no child needs to be re-read.
+        """
+        if self._root is None:
+            self._assign(np.identity(2))
+            self._length = 0
+        else:
+            self._assign(self._root.product)
+            self._length = self._root.total_length
+        self._dirty = False
+        self._touch()
+
+    def __check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("EditableOpticalPath index out of range")
+        return index
@@ -0,0 +1,122 @@
+from collections import namedtuple
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement, Media
+from optix.beams import GaussianBeam
+
+__all__ = ["BeamEnvelope", "beam_envelope", "BeamCaustics", "beam_caustics"]
+
+BeamEnvelope = namedtuple("BeamEnvelope", "z w R boundaries")
+BeamEnvelope.__doc__ = """Beam radius "w" and wavefront curviture "R" sampled at positions "z" along a path.
+"boundaries" holds the position at which every top level element of the path ends."""
+
+BeamCaustics = namedtuple("BeamCaustics", "z_start z_end waist_location waist_radius w_min w_max")
+BeamCaustics.__doc__ = """Closed form beam caustics of every medium (element of nonzero length) along a path.
+
+Every field has shape (segments,) followed by the shape of the input beam batch.
+"waist_location" is NaN for segments that contain no waist, "waist_radius" is the waist
+radius of the beam propagating in the segment, wherever its waist lies. "w_min" and "w_max"
+are the extreme beam radii inside the segment."""
+
+_Segments = namedtuple("_Segments", "z_start z_end q_end refractive_index boundaries")
+
+
+def _walk(path: ABCDCompositeElement, q_in) -> _Segments:
+    """Carries the complex beam parameter through the leaves of the path exactly once.
+
+    Only leaves of nonzero length (media) are recorded, together with the complex beam
+    parameter at their end and the refractive index the beam propagates in.
+    """
+    z_start, z_end, q_end, refractive_index, boundaries = [], [], [], [], []
+    z = 0
+    q = q_in
+
+    def walk(element: ABCDElement):
+        nonlocal z, q
+        if isinstance(element, ABCDCompositeElement):
+            for child in element.childs:
+                walk(child)
+            return
+        q = element.act(q)
+        length = element.length
+        if length > 0:
+            z_start.append(z)
+            z_end.append(z + length)
+            q_end.append(q)
+            refractive_index.append(element.n if isinstance(element, Media) else 1)
+        z += length
+
+    for element in path.childs:
+        walk(element)
+        boundaries.append(z)
+
+    # Positions are broadcast against the batch shape of q
+    batch = (1,) * np.ndim(q_in)
+    return _Segments(
+        np.array(z_start, dtype=float).reshape((-1,) + batch),
+        np.array(z_end, dtype=float).reshape((-1,) + batch),
+        np.array(q_end, dtype=complex).reshape((-1,) + np.shape(q_in)),
+        np.array(refractive_index, dtype=float).reshape((-1,) + batch),
+        np.array(boundaries, dtype=float))
+
+
+def beam_envelope(path: ABCDCompositeElement, beam: GaussianBeam, samples: int = 100) -> BeamEnvelope:
+    """Samples the beam radius and wavefront curviture along the whole path in a single pass.
+
+    Args:
+        path (ABCDCompositeElement): Optical path (or any composite element) the beam propagates through.
+        beam (GaussianBeam): Input beam, its complex beam parameter is taken at z = 0.
+        samples (int): Number of samples taken along every element of nonzero length.
+
+    Returns:
+        BeamEnvelope: Contiguous 1-D arrays z, w and R covering the whole path.
+    """
+    segments = _walk(path, beam.cbeam_parameter(0))
+    t = np.linspace(0, 1, samples)
+    z_start = segments.z_start[:, None]
+    z_end = segments.z_end[:, None]
+    z = z_start + (z_end - z_start) * t
+    # Inside a medium the complex beam parameter only grows by the distance travelled
+    q = segments.q_end[:, None] - (z_end - z)
+
+    distance = q.real
+    rayleigh_range = q.imag
+    waist_radius = np.sqrt(beam.wavelength * rayleigh_range / (np.pi * segments.refractive_index[:, None]))
+    w = waist_radius * np.sqrt(1 + (distance / rayleigh_range)**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        R = distance * (1 + (rayleigh_range / distance)**2)
+
+    return BeamEnvelope(z.reshape(-1), w.reshape(-1), R.reshape(-1), segments.boundaries)
+
+
+def beam_caustics(path: ABCDCompositeElement, beam) -> BeamCaustics:
+    """Finds the waists and the extreme beam radii of every medium along the path in closed form.
+
+    The complex beam parameter is carried through the path once and every segment is
+    evaluated analytically from the q at its end, so no sampling is involved.
+
+    Args:
+        path (ABCDCompositeElement): Optical path (or any composite element) the beam propagates through.
+        beam (GaussianBeam or GaussianBeamArray): Input beam or batch of beams, taken at z = 0.
+    """
+    segments = _walk(path, beam.cbeam_parameter(0))
+    z_start = segments.z_start
+    z_end = segments.z_end
+    rayleigh_range = segments.q_end.imag
+    waist_location = z_end - segments.q_end.real
+    waist_radius = np.sqrt(beam.wavelength * rayleigh_range / (np.pi * segments.refractive_index))
+
+    w_start = waist_radius * np.sqrt(1 + ((z_start - waist_location) / rayleigh_range)**2)
+    w_end = waist_radius * np.sqrt(1 + ((z_end - waist_location) / rayleigh_range)**2)
+    # The beam radius is monotonic on both sides of the waist
+    inside = (waist_location >= z_start) & (waist_location <= z_end)
+    w_min = np.where(inside, waist_radius, np.minimum(w_start, w_end))
+    w_max = np.maximum(w_start, w_end)
+
+    shape = w_min.shape
+    return BeamCaustics(
+        np.broadcast_to(z_start, shape),
+        np.broadcast_to(z_end, shape),
+        np.where(inside, waist_location, np.nan),
+        waist_radius,
+        w_min,
+        w_max)
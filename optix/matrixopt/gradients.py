@@ -0,0 +1,193 @@
+from collections import namedtuple
+from typing import Dict, Sequence, Tuple, Union
+import numpy as np
+from optix.matrixopt.ABCDformalism import (
+    ABCDElement, ABCDCompositeElement, Media, ThinLens, FlatInterface, CurvedInterface, CurvedMirror, ThickLens, PlanoConvexLens)
+from optix.matrixopt.optical_system import OpticalPath
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+__all__ = ["BeamGradients", "beam_gradients", "ModeMatchResult", "mode_match"]
+
+BeamGradients = namedtuple("BeamGradients", "parameters q waist_radius waist_location dq dwaist_radius dwaist_location")
+BeamGradients.__doc__ = """Output beam of a path together with its exact derivatives.
+
+"parameters" lists (index, name) pairs, the index being the position of the element in path.childs.
+The derivative arrays have shape (len(parameters),) followed by the shape of the beam batch."""
+
+ModeMatchResult = namedtuple("ModeMatchResult", "path values waist_radius waist_location cost iterations converged")
+ModeMatchResult.__doc__ = """Outcome of mode_match. "values" maps the optimized (index, name) parameters to their final values."""
+
+# Parameters that move everything behind the element, i.e. change the length of the path
+_LENGTH_PARAMETERS = ("d",)
+
+
+def _curved_interface_derivatives(n1, n2, R) -> Dict[str, np.ndarray]:
+    return {
+        "n1": np.array([[0, 0], [1 / (n2 * R), 1 / n2]]),
+        "n2": np.array([[0, 0], [-n1 / (n2**2 * R), -n1 / n2**2]]),
+        "R": np.array([[0, 0], [(n2 - n1) / (n2 * R**2), 0]]),
+    }
+
+
+def _thick_lens_derivatives(R1, n, R2, d) -> Dict[str, np.ndarray]:
+    """Chain rule through the surfaces M3 @ M2 @ M1 of the lens."""
+    M1 = CurvedInterface(1, n, R1).matrix
+    M2 = Media(d, n).matrix
+    M3 = CurvedInterface(n, 1, -R2).matrix
+    front = _curved_interface_derivatives(1, n, R1)
+    back = _curved_interface_derivatives(n, 1, -R2)
+    return {
+        "R1": M3 @ M2 @ front["R"],
+        "n": M3 @ M2 @ front["n2"] + back["n1"] @ M2 @ M1,
+        "R2": -back["R"] @ M2 @ M1,
+        "d": M3 @ np.array([[0, 1], [0, 0]]) @ M1,
+    }
+
+
+def _matrix_derivatives(element: ABCDElement) -> Dict[str, np.ndarray]:
+    """Derivatives of the element matrix with respect to its differentiable parameters."""
+    if isinstance(element, PlanoConvexLens):
+        derivatives = _thick_lens_derivatives(element._R1, element._n, element._R2, element._d)
+        return {"R": derivatives["R1" if element.is_inversed else "R2"], "n": derivatives["n"], "d": derivatives["d"]}
+    if isinstance(element, ThickLens):
+        return _thick_lens_derivatives(element._R1, element._n, element._R2, element._d)
+    if isinstance(element, Media):
+        return {"d": np.array([[0, 1], [0, 0]])}
+    if isinstance(element, ThinLens):
+        return {"f": np.array([[0, 0], [1 / element.f**2, 0]])}
+    if isinstance(element, FlatInterface):
+        n1, n2 = element._n1, element._n2
+        return {"n1": np.array([[0, 0], [0, 1 / n2]]), "n2": np.array([[0, 0], [0, -n1 / n2**2]])}
+    if isinstance(element, CurvedInterface):
+        return _curved_interface_derivatives(element.n1, element.n2, element.R)
+    if isinstance(element, CurvedMirror):
+        return {"R": np.array([[0, 0], [2 / element.R**2, 0]])}
+    return {}
+
+
+def beam_gradients(path: ABCDCompositeElement, beam: Union[GaussianBeam, GaussianBeamArray]) -> BeamGradients:
+    """Propagates a beam (or batch of beams) and returns exact derivatives of the output.
+
+    Derivatives are taken with respect to the parameters of every top level element of the path
+    (FreeSpace.d, Media.d, ThinLens.f, FlatInterface.n1/n2, CurvedInterface.n1/n2/R,
+    CurvedMirror.R, ThickLens.R1/n/R2/d and PlanoConvexLens.R/n/d). They are computed by one forward pass
+    collecting prefix products and one backward pass collecting suffix products.
+    """
+    elements = path.childs
+    matrices = [e.matrix for e in elements]
+
+    prefixes = [np.identity(2)]
+    for m in matrices:
+        prefixes.append(m @ prefixes[-1])
+    system = prefixes[-1]
+
+    q_in = np.asarray(beam.cbeam_parameter(0))
+    A, B, C, D = system[0, 0], system[0, 1], system[1, 0], system[1, 1]
+    denom = C * q_in + D
+    q_out = (A * q_in + B) / denom
+    # dq_out/dM, shape batch + (2, 2)
+    G = np.stack([q_in / denom, 1 / denom, -q_in * q_out / denom, -q_out / denom], axis=-1).reshape(q_in.shape + (2, 2))
+
+    # Backward pass, blocks of derivatives are collected from the last element to the first
+    blocks = []
+    suffix = np.identity(2)
+    for index in reversed(range(len(elements))):
+        derivatives = _matrix_derivatives(elements[index])
+        if derivatives:
+            adjoint = suffix.T @ G @ prefixes[index].T
+            blocks.append([(index, name, (adjoint * dM).sum(axis=(-2, -1))) for name, dM in derivatives.items()])
+        suffix = suffix @ matrices[index]
+    rows = [row for block in reversed(blocks) for row in block]
+
+    parameters = [(index, name) for index, name, _ in rows]
+    dq = np.array([row[2] for row in rows], dtype=complex).reshape((len(rows),) + q_in.shape)
+    dlength = np.array([1.0 if name in _LENGTH_PARAMETERS else 0.0 for _, name in parameters]).reshape((len(rows),) + (1,) * q_in.ndim)
+
+    refractive_index = elements[-1].n if len(elements) and isinstance(elements[-1], Media) else 1
+    waist_radius = np.sqrt(beam.wavelength * q_out.imag / (np.pi * refractive_index))
+    waist_location = path.length - q_out.real
+    dwaist_radius = waist_radius * dq.imag / (2 * q_out.imag)
+    dwaist_location = dlength - dq.real
+    return BeamGradients(parameters, q_out, waist_radius, waist_location, dq, dwaist_radius, dwaist_location)
+
+
+def mode_match(
+        path: ABCDCompositeElement,
+        beam: GaussianBeam,
+        target_waist: float,
+        target_location: float,
+        parameters: Sequence[Tuple[ABCDElement, str]],
+        bounds: Dict[Tuple[ABCDElement, str], Tuple[float, float]] = None,
+        max_iter: int = 100,
+        tol: float = 1e-14) -> ModeMatchResult:
+    """Tunes element parameters so the output beam has the target waist radius and location.
+
+    Runs Levenberg-Marquardt iterations on the residuals ((w0 - target_waist) / target_waist,
+    (z0 - target_location) / zR) where zR is the Rayleigh range of the target beam, using the
+    exact Jacobian from beam_gradients.
+
+    Args:
+        path (ABCDCompositeElement): Path to tune, it is not modified.
+        beam (GaussianBeam): Input beam.
+        parameters: (element, name) pairs of top level elements of the path to tune, e.g. [(gap, "d"), (lens, "f")].
+        bounds (dict, optional): (low, high) bounds per (element, name). Distances "d" default to (0, inf).
+        max_iter (int): Maximal number of iterations.
+        tol (float): Iterations stop once the cost drops below tol.
+
+    Returns:
+        ModeMatchResult: The tuned path (a new OpticalPath) with its output waist and final cost.
+    """
+    bounds = bounds or {}
+    positions = {id(e): i for i, e in enumerate(path.childs)}
+    tuned = []
+    for element, name in parameters:
+        if id(element) not in positions:
+            raise ValueError(f"{element.name} is not a top level element of the path.")
+        low, high = bounds.get((element, name), (0, np.inf) if name in _LENGTH_PARAMETERS else (-np.inf, np.inf))
+        tuned.append((positions[id(element)], name, low, high))
+
+    rayleigh_range = np.pi * target_waist**2 / beam.wavelength
+    childs = list(path.childs)
+
+    def evaluate(childs):
+        gradients = beam_gradients(OpticalPath(*childs), beam)
+        residual = np.array([
+            (gradients.waist_radius - target_waist) / target_waist,
+            (gradients.waist_location - target_location) / rayleigh_range])
+        columns = [gradients.parameters.index((index, name)) for index, name, _, _ in tuned]
+        jacobian = np.array([
+            gradients.dwaist_radius[columns] / target_waist,
+            gradients.dwaist_location[columns] / rayleigh_range])
+        return gradients, residual, jacobian
+
+    def step(childs, delta):
+        childs = list(childs)
+        for (index, name, low, high), change in zip(tuned, delta):
+            value = np.clip(childs[index].parameters[name] + change, low, high)
+            childs[index] = childs[index].with_parameters(**{name: float(value)})
+        return childs
+
+    gradients, residual, jacobian = evaluate(childs)
+    cost = float(residual @ residual)
+    damping = 1e-3
+    iterations = 0
+    while iterations < max_iter and cost > tol and np.isfinite(cost):
+        iterations += 1
+        JtJ = jacobian.T @ jacobian
+        g = jacobian.T @ residual
+        delta = -np.linalg.solve(JtJ + damping * np.diag(np.diag(JtJ) + 1e-30), g)
+        candidate = step(childs, delta)
+        c_gradients, c_residual, c_jacobian = evaluate(candidate)
+        c_cost = float(c_residual @ c_residual)
+        if np.isfinite(c_cost) and c_cost < cost:
+            childs, gradients, residual, jacobian, cost = candidate, c_gradients, c_residual, c_jacobian, c_cost
+            damping = max(damping / 3, 1e-12)
+        else:
+            damping *= 4
+            if damping > 1e12:
+                break
+
+    values = {(index, name): childs[index].parameters[name] for index, name, _, _ in tuned}
+    return ModeMatchResult(
+        OpticalPath(*childs), values, float(gradients.waist_radius), float(gradients.waist_location),
+        cost, iterations, cost <= tol)
@@ -1,22 +1,38 @@
 from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement, Media
-from optix.beams import GaussianBeam
-import matplotlib.pyplot as plt
+from optix.matrixopt.envelope import BeamCaustics, beam_caustics
+from optix.matrixopt.compiled import CompiledPath
+from optix.matrixopt.tolerance import ToleranceResult, tolerance_analysis
+from optix.matrixopt.rays import RayTrace, trace_rays
+from optix.matrixopt.dispersion import SpectralPropagation, propagate_spectrum
+from optix.matrixopt.astigmatic import AstigmaticBeam, propagate_astigmatic
+from optix.beams import GaussianBeam, GaussianBeamArray, coupling_efficiency
+from optix.beams import HermiteGaussMode, LaguerreGaussMode, EmbeddedGaussianBeam
+from functools import reduce
+from typing import Dict, Union
 import numpy as np
 
-__all__ = ["OpticalPath", "Drawer"]
+__all__ = ["OpticalPath"]
 
 class OpticalPath(ABCDCompositeElement):
     def __init__(self, *elements: ABCDElement, name="") -> None:
         super().__init__(list(elements), name=name)
     
     def append(self, element: ABCDElement) -> None:
-        self.childs.append(element)
+        """Appends an element, updating the cached system matrix incrementally when it is up to date."""
+        matrix = element.matrix
+        self._childs.append(element)
+        element._adopt(self)
+        if self._dirty:
+            return
+        self._assign(np.matmul(matrix, ABCDElement.matrix.fget(self)))
+        self._length = self._length + element.length
+        self._touch()
 
     def __len__(self) -> int:
-        return len(self.childs)
+        return len(self._childs)
 
     def propagate(self, input: GaussianBeam) -> GaussianBeam:
-        self.__update_matrix()
+        self._refresh()
         q_in = input.cbeam_parameter(0)
         q_out = self.act(q_in)
         # If output is in some kind of media, take the refractive index of it 
@@ -25,68 +41,90 @@ class OpticalPath(ABCDCompositeElement):
         amplitude = input.amplitude
         return GaussianBeam.from_q(wave_length=input.wavelength, q=q_out, z_pos=self.length, refractive_index=refractive_index, amplitude=amplitude)
 
-    def __update_matrix(self):
-        self.matrix = self._build_matrix()
-
-class Drawer:
-    __UNITS = {
-        "um": 10**6,
-        "mm": 10**3,
-        "cm": 10**2,
-        "dm": 10**1,
-        "m":  10**0
-    }
-
-
-    def __init__(self, op: OpticalPath, gauss_in: GaussianBeam, **kwargs) -> None:
-        self._elements = op.childs
-        self.z_unit = kwargs.get("z_unit", "mm")
-        self.w_unit = kwargs.get("w_unit", "mm")
-        self.color = kwargs.get("color", "blue")
-        self.draw_childs = kwargs.get("draw_childs", True)
-        self._op_temp = OpticalPath()
-        self._gauss_in = gauss_in
-        self._fig, self._ax = plt.subplots()
-        self._current_z = 0
-
-
-    def show(self):
-        self.draw().show()
-
-    def draw(self):
-        for i, element in enumerate(self._elements):
-            self.draw_element(element)
-            self._ax.axvline(self.__z_unit_transform(self._current_z) , linewidth=1, color="black")
-            # self.ax.annotate(f" {i+1}.", (self.__z_unit_transform(self.current_z), 0))
-
-            self._ax.set_xlabel(f"Distance [{self.z_unit}]")
-            self._ax.set_ylabel(f"W [{self.w_unit}]")
-        # self.ax.legend(self.__build_legend(),handletextpad=-2.0, handlelength=0)
-        return self._fig      
-
-    def draw_element(s, element):
-        if isinstance(element, ABCDCompositeElement):
-            if s.draw_childs:   
-                for child in element.childs:
-                    s.draw_element(child)
-            else:
-                assert False, "Not implemented!"
-                s.__op_temp.append(element)
-        elif isinstance(element, ABCDElement):
-            s._op_temp.append(element)
-            if element.length > 0:
-                gauss_temp = s._op_temp.propagate(s._gauss_in)
-                z = np.linspace(s._current_z, s._current_z + element.length, 100)
-                w = gauss_temp.beam_radius(z)
-                s._ax.plot(s.__z_unit_transform(z), s.__w_unit_transform(w), label=element.name, color=s.color)
-                s._current_z += element.length
-
-    def __z_unit_transform(self, z):
-        return z * self.__UNITS[self.z_unit]
-
-    def __w_unit_transform(self, w):
-        return w * self.__UNITS[self.w_unit]
-            
-    def __build_legend(self):
-        labels = [f"{i+1}. {e.name}" for i, e in enumerate(self._elements)]
-        return labels
\ No newline at end of file
+    def propagate_batch(self, input: Union[GaussianBeamArray, np.ndarray], out: np.ndarray = None) -> Union[GaussianBeamArray, np.ndarray]:
+        """Propagates a whole batch of beams through the path in one vectorized pass.
+
+        Args:
+            input (GaussianBeamArray or np.ndarray): Batch of beams or complex beam parameters evaluated at the path input.
+            out (np.ndarray, optional): Preallocated complex array receiving the output complex beam parameters.
+
+        Returns:
+            GaussianBeamArray when a beam batch is given, otherwise the array of output complex beam parameters.
+        """
+        self._refresh()
+        if isinstance(input, GaussianBeamArray):
+            q_in = input.cbeam_parameter(0)
+        else:
+            q_in = np.asarray(input, dtype=complex)
+        denom = self._C * q_in + self._D
+        q_out = np.multiply(q_in, self._A, out=out)
+        q_out += self._B
+        q_out /= denom
+        if not isinstance(input, GaussianBeamArray):
+            return q_out
+        refractive_index = self.childs[-1].n if len(self.childs) and isinstance(self.childs[-1], Media) else 1
+        return GaussianBeamArray.from_q(input.wavelength, q_out, self.length, refractive_index=refractive_index, amplitude=input.amplitude)
+
+    def propagate_astigmatic(self, tangential: Union[GaussianBeam, GaussianBeamArray], sagittal: Union[GaussianBeam, GaussianBeamArray] = None) -> AstigmaticBeam:
+        """Propagates the beams of both principal planes in one stacked evaluation, see propagate_astigmatic."""
+        return propagate_astigmatic(self, tangential, sagittal)
+
+    def propagate_mode(self, mode: Union[HermiteGaussMode, LaguerreGaussMode, EmbeddedGaussianBeam]) -> Union[HermiteGaussMode, LaguerreGaussMode, EmbeddedGaussianBeam]:
+        """Propagates a higher-order mode or M^2 beam, its fundamental beam(s) are transformed and its orders kept."""
+        return mode.with_beams(*propagate_astigmatic(self, mode.beam, mode.sagittal))
+
+    def propagate_spectrum(self, input: GaussianBeam, wavelength: np.ndarray) -> SpectralPropagation:
+        """Output waist and focal shift at every wavelength of a grid, for elements built with Material indices."""
+        return propagate_spectrum(self, input, wavelength)
+
+    def coupling_efficiency(self, input: Union[GaussianBeam, GaussianBeamArray], target: GaussianBeam, offset=(0, 0), tilt=(0, 0)) -> np.ndarray:
+        """Fraction of the output power coupled into a target mode located in path coordinates, see optix.beams.coupling_efficiency."""
+        output = self.propagate_batch(input) if isinstance(input, GaussianBeamArray) else self.propagate(input)
+        return coupling_efficiency(output, target, z=self.length, offset=offset, tilt=tilt)
+
+    def caustics(self, input: Union[GaussianBeam, GaussianBeamArray]) -> BeamCaustics:
+        """Waist locations, waist radii and extreme beam radii of every medium along the path, see beam_caustics."""
+        return beam_caustics(self, input)
+
+    def compile(self) -> CompiledPath:
+        """Flattens the path into a packed parameter array with a fast evaluator, see CompiledPath."""
+        return CompiledPath(self)
+
+    def sweep(self, parameters: Dict[ABCDElement, dict]) -> np.ndarray:
+        """Evaluates the system matrix over array-valued element parameters.
+
+        Args:
+            parameters (dict): Maps elements of the path to the parameters to sweep, e.g. {lens: {"f": np.linspace(0.1, 0.2, 100)}}.
+                Arrays of different elements are broadcast against each other, so a 2-D grid is
+                obtained by passing arrays of shapes (N, 1) and (1, M).
+
+        Returns:
+            np.ndarray: Stacked system matrices of shape (..., 2, 2).
+        """
+        childs = [e.with_parameters(**parameters[e]) if e in parameters else e for e in self.childs]
+        if len(childs) == 0:
+            return np.identity(2)
+        return reduce(np.matmul, [e.matrix for e in reversed(childs)])
+
+    def tolerance(self, input: GaussianBeam, perturbations: Dict[ABCDElement, dict], n_samples: int, **kwargs) -> ToleranceResult:
+        """Monte Carlo distribution of the output waist when element parameters are perturbed.
+
+        Args:
+            input (GaussianBeam): Input beam.
+            perturbations (dict): Maps elements of the path to {parameter: standard deviation}, e.g. {lens: {"f": 1e-3}}.
+            n_samples (int): Number of perturbed systems, evaluated in vectorized chunks.
+            kwargs: chunk_size, spec, quantiles, processes, seed and reservoir, see tolerance_analysis.
+        """
+        return tolerance_analysis(self, input, perturbations, n_samples, **kwargs)
+
+    def trace_rays(self, rays: np.ndarray, chunk_size: int = 1_000_000) -> RayTrace:
+        """Traces paraxial rays (y, theta) of shape (N, 2) in place, clipping them at element apertures, see trace_rays."""
+        return trace_rays(self, rays, chunk_size)
+
+
+def __getattr__(name):
+    # Drawer needs matplotlib, so it is only imported when actually requested
+    if name == "Drawer":
+        from optix.matrixopt.plotting import Drawer
+        return Drawer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
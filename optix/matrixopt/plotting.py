@@ -0,0 +1,71 @@
+"""Plotting of optical paths. Requires matplotlib (pip install optix[plotting])."""
+from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement
+from optix.matrixopt.envelope import beam_envelope
+from optix.matrixopt.optical_system import OpticalPath
+from optix.beams import GaussianBeam
+import matplotlib.pyplot as plt
+
+__all__ = ["Drawer"]
+
+class Drawer:
+    __UNITS = {
+        "um": 10**6,
+        "mm": 10**3,
+        "cm": 10**2,
+        "dm": 10**1,
+        "m":  10**0
+    }
+
+
+    def __init__(self, op: OpticalPath, gauss_in: GaussianBeam, **kwargs) -> None:
+        self._op = op
+        self._elements = op.childs
+        self.z_unit = kwargs.get("z_unit", "mm")
+        self.w_unit = kwargs.get("w_unit", "mm")
+        self.color = kwargs.get("color", "blue")
+        self.draw_childs = kwargs.get("draw_childs", True)
+        self.samples = kwargs.get("samples", 100)
+        self._gauss_in = gauss_in
+        self._fig, self._ax = plt.subplots()
+        self._envelope = None
+        self._segment = 0
+
+
+    def show(self):
+        self.draw().show()
+
+    def draw(self):
+        # The envelope is computed in one pass, every medium is then plotted from its own slice
+        self._envelope = beam_envelope(self._op, self._gauss_in, samples=self.samples)
+        self._segment = 0
+        for element in self._elements:
+            self.draw_element(element)
+        self._ax.vlines(self.__z_unit_transform(self._envelope.boundaries), 0, 1, transform=self._ax.get_xaxis_transform(), linewidth=1, color="black")
+        self._ax.set_xlabel(f"Distance [{self.z_unit}]")
+        self._ax.set_ylabel(f"W [{self.w_unit}]")
+        # self.ax.legend(self.__build_legend(),handletextpad=-2.0, handlelength=0)
+        return self._fig
+
+    def draw_element(s, element: ABCDElement):
+        if s._envelope is None:
+            s._envelope = beam_envelope(s._op, s._gauss_in, samples=s.samples)
+        if isinstance(element, ABCDCompositeElement):
+            if s.draw_childs:
+                for child in element.childs:
+                    s.draw_element(child)
+            else:
+                assert False, "Not implemented!"
+        elif element.length > 0:
+            samples = slice(s._segment * s.samples, (s._segment + 1) * s.samples)
+            s._ax.plot(s.__z_unit_transform(s._envelope.z[samples]), s.__w_unit_transform(s._envelope.w[samples]), label=element.name, color=s.color)
+            s._segment += 1
+
+    def __z_unit_transform(self, z):
+        return z * self.__UNITS[self.z_unit]
+
+    def __w_unit_transform(self, w):
+        return w * self.__UNITS[self.w_unit]
+            
+    def __build_legend(self):
+        labels = [f"{i+1}. {e.name}" for i, e in enumerate(self._elements)]
+        return labels
\ No newline at end of file
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from typing import List
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement
+
+__all__ = ["RayTrace", "trace_rays"]
+
+RayTrace = namedtuple("RayTrace", "names z transmitted fraction centroid rms_radius max_radius mean_angle rms_angle alive")
+RayTrace.__doc__ = """Statistics of a ray bundle at the exit of every top level element of a path.
+
+"transmitted" counts the rays that passed all apertures up to the element, "fraction" relates
+it to the bundle size. Centroid, RMS radius (about the centroid), maximal |y|, mean angle and
+RMS angle are taken over the transmitted rays only. "alive" flags the rays leaving the path."""
+
+# Operations of the flattened path
+_MATRIX = 0
+_APERTURE = 1
+_RECORD = 2
+
+
+def _flatten(path: ABCDCompositeElement) -> List[tuple]:
+    """Turns the path into a list of matrix, aperture and record operations.
+
+    Apertures are checked at the entrance and exit of their element. Rays travel in straight
+    lines inside an element of length, so this is exact for free space and media.
+    """
+    operations = []
+
+    def flatten(element: ABCDElement):
+        if element.aperture is not None:
+            operations.append((_APERTURE, element.aperture))
+        if isinstance(element, ABCDCompositeElement):
+            for child in element.childs:
+                flatten(child)
+        else:
+            matrix = element.matrix
+            if matrix.ndim > 2:
+                raise ValueError(f"Cannot trace rays through element with array-valued parameters: {element.name}")
+            if not (matrix == np.identity(2)).all():
+                operations.append((_MATRIX, *matrix.reshape(-1)))
+        if element.aperture is not None:
+            operations.append((_APERTURE, element.aperture))
+
+    for element in path.childs:
+        flatten(element)
+        operations.append((_RECORD,))
+    return operations
+
+
+def trace_rays(path: ABCDCompositeElement, rays: np.ndarray, chunk_size: int = 1_000_000) -> RayTrace:
+    """Traces a bundle of paraxial rays (y, theta) through the path, in place.
+
+    Rays are processed in chunks of chunk_size rows, every chunk being transformed in place
+    with the free space and thin lens special cases avoiding any temporary array. On return
+    "rays" holds the rays at the end of the path, vignetted rays are set to NaN.
+
+    Args:
+        path (ABCDCompositeElement): Optical path, elements may carry an aperture radius.
+        rays (np.ndarray): Float array of shape (N, 2) with ray heights and angles, modified in place.
+        chunk_size (int): Number of rays processed at once, bounds the temporary memory.
+    """
+    if rays.ndim != 2 or rays.shape[1] != 2:
+        raise ValueError("Rays must be given as an array of shape (N, 2).")
+    operations = _flatten(path)
+    n_records = len(path.childs)
+    transmitted = np.zeros(n_records, dtype=np.int64)
+    sums = np.zeros((n_records, 4))  # y, y^2, theta, theta^2
+    max_radius = np.zeros(n_records)
+    alive = np.ones(len(rays), dtype=bool)
+    buffer = np.empty((min(chunk_size, len(rays)), 2), dtype=rays.dtype)
+
+    for start in range(0, len(rays), chunk_size):
+        chunk = rays[start:start + chunk_size]
+        chunk_alive = alive[start:start + chunk_size]
+        y, theta = chunk[:, 0], chunk[:, 1]
+        record = 0
+        for operation in operations:
+            kind = operation[0]
+            if kind == _MATRIX:
+                _, A, B, C, D = operation
+                if A == 1 and C == 0 and D == 1:
+                    y += B * theta
+                elif A == 1 and B == 0:
+                    theta *= D
+                    theta += C * y
+                else:
+                    out = buffer[:len(chunk)]
+                    np.matmul(chunk, np.array([[A, C], [B, D]], dtype=rays.dtype), out=out)
+                    chunk[...] = out
+            elif kind == _APERTURE:
+                lost = np.abs(y) > operation[1]
+                lost &= chunk_alive
+                if lost.any():
+                    chunk_alive &= ~lost
+                    # Lost rays stay at zero under any ABCD matrix and drop out of the sums below
+                    chunk[lost] = 0
+            else:
+                transmitted[record] += np.count_nonzero(chunk_alive)
+                sums[record] += (y.sum(), y @ y, theta.sum(), theta @ theta)
+                if len(chunk):
+                    max_radius[record] = max(max_radius[record], np.abs(y).max())
+                record += 1
+        chunk[~chunk_alive] = np.nan
+
+    z = np.cumsum([e.length for e in path.childs])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / transmitted[:, None]
+        centroid, mean_angle = mean[:, 0], mean[:, 2]
+        rms_radius = np.sqrt(np.maximum(mean[:, 1] - centroid**2, 0))
+        rms_angle = np.sqrt(np.maximum(mean[:, 3] - mean_angle**2, 0))
+    fraction = transmitted / len(rays) if len(rays) else np.zeros(n_records)
+    return RayTrace(
+        [e.name for e in path.childs], z, transmitted, fraction,
+        centroid, rms_radius, max_radius, mean_angle, rms_angle, alive)
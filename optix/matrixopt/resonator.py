@@ -0,0 +1,79 @@
+from collections import namedtuple
+from typing import Dict, Union
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement
+from optix.matrixopt.optical_system import OpticalPath
+
+__all__ = ["ResonatorMode", "resonator_mode", "Resonator"]
+
+ResonatorMode = namedtuple("ResonatorMode", "stability stable gouy_phase q beam_radius waist_radius waist_location")
+ResonatorMode.__doc__ = """Self-consistent Gaussian mode of a resonator at its reference plane.
+
+"stability" is (A + D) / 2 of the round trip matrix, the resonator is "stable" where it lies
+strictly between -1 and 1. "gouy_phase" is the Gouy phase accumulated per round trip.
+"waist_location" is measured from the reference plane along the propagation direction.
+All fields are NaN where the resonator is unstable."""
+
+
+def resonator_mode(round_trip: Union[ABCDElement, np.ndarray], wavelength: float, refractive_index: float = 1) -> ResonatorMode:
+    """Eigenmode of a round trip matrix, or of a stack of them.
+
+    The mode follows in closed form from 1/q = (D - A) / (2B) - i sqrt(1 - m^2) / |B| with
+    m = (A + D) / 2, so whole stability maps are evaluated with a few array expressions.
+    Unstable and degenerate round trips are masked with NaN instead of raising.
+
+    Args:
+        round_trip (ABCDElement or np.ndarray): Round trip element or matrices of shape (..., 2, 2).
+        wavelength (float): Vacuum wavelength of the mode.
+        refractive_index (float): Refractive index at the reference plane.
+    """
+    matrix = round_trip.matrix if isinstance(round_trip, ABCDElement) else np.asarray(round_trip)
+    A, B, D = matrix[..., 0, 0], matrix[..., 0, 1], matrix[..., 1, 1]
+    stability = (A + D) / 2
+    stable = (np.abs(stability) < 1) & (B != 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = np.sqrt(np.where(stable, 1 - stability**2, np.nan))
+        inverse_q = (D - A) / (2 * B) - 1j * root / np.abs(B)
+        q = 1 / inverse_q
+        gouy_phase = np.sign(B) * np.arccos(np.where(stable, stability, np.nan))
+        beam_radius = np.sqrt(-wavelength / (np.pi * refractive_index * inverse_q.imag))
+    waist_radius = np.sqrt(wavelength * q.imag / (np.pi * refractive_index))
+    waist_location = -q.real
+    return ResonatorMode(stability, stable, gouy_phase, q, beam_radius, waist_radius, waist_location)
+
+
+class Resonator(OpticalPath):
+    """Optical resonator described by the elements of one round trip.
+
+    The reference plane, at which the mode is reported, lies in front of the first element.
+    Mirrors are modelled as CurvedMirror elements, the beam keeps travelling along +z.
+    """
+    def __init__(self, *elements: ABCDElement, linear: bool = False, name="") -> None:
+        """
+        Args:
+            elements (ABCDElement): Elements of one round trip, or with linear=True the elements from the
+                first end mirror to the second one, both included.
+            linear (bool): Unfolds a linear (standing wave) resonator: the reference plane is just after
+                the first mirror and the inner elements are traversed back to it. Inner elements are
+                reused as they are, so they must be reciprocal (free space, media, thin lenses).
+        """
+        elements = list(elements)
+        if linear:
+            if len(elements) < 2:
+                raise ValueError("A linear resonator needs at least two end mirrors.")
+            elements = elements[1:] + elements[-2::-1]
+        super().__init__(*elements, name=name)
+
+    def mode(self, wavelength: float, refractive_index: float = 1) -> ResonatorMode:
+        """Eigenmode of the resonator, see resonator_mode."""
+        return resonator_mode(self.matrix, wavelength, refractive_index)
+
+    def stability_map(self, wavelength: float, parameters: Dict[ABCDElement, dict], refractive_index: float = 1) -> ResonatorMode:
+        """Eigenmode over a grid of element parameters.
+
+        Args:
+            parameters (dict): Element parameters to sweep, broadcast against each other as in OpticalPath.sweep,
+                e.g. {gap: {"d": d[:, None]}, mirror: {"R": R[None, :]}} for a (len(d), len(R)) map.
+        """
+        return resonator_mode(self.sweep(parameters), wavelength, refractive_index)
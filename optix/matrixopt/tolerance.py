@@ -0,0 +1,195 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Sequence, Tuple, Union
+import numpy as np
+from optix.matrixopt.ABCDformalism import ABCDElement, ABCDCompositeElement, Media
+from optix.beams import GaussianBeam
+
+__all__ = ["StreamingStatistics", "ToleranceResult", "tolerance_analysis"]
+
+METRICS = ("waist_radius", "waist_location")
+
+ToleranceResult = namedtuple("ToleranceResult", "n_samples mean std min max quantiles yield_")
+ToleranceResult.__doc__ = """Statistics of the output beam over perturbed systems.
+
+"mean", "std", "min" and "max" map every metric (waist_radius, waist_location) to a float,
+"quantiles" maps them to {level: value}. "yield_" is the fraction of samples within the
+spec, or None when no spec was given."""
+
+# Perturbation of one parameter: either a standard deviation of a normal distribution,
+# or a callable (rng, size) -> array of deviations from the nominal value
+Perturbation = Union[float, Callable[[np.random.Generator, int], np.ndarray]]
+
+
+class StreamingStatistics:
+    """Mergeable running statistics of several metrics.
+
+    Mean and variance are accumulated with the parallel variant of Welford's algorithm, so
+    partial results of independent chunks can be merged exactly. Quantiles are estimated from
+    a uniform random subsample of bounded size (bottom-k of random keys), which merges exactly
+    as well.
+    """
+    def __init__(self, metrics: Sequence[str], reservoir: int = 100_000, spec: Dict[str, Tuple[float, float]] = None) -> None:
+        self.metrics = tuple(metrics)
+        self.reservoir = reservoir
+        self.spec = spec
+        self.count = 0
+        self.in_spec = 0
+        self.mean = {m: 0.0 for m in self.metrics}
+        self.m2 = {m: 0.0 for m in self.metrics}
+        self.min = {m: np.inf for m in self.metrics}
+        self.max = {m: -np.inf for m in self.metrics}
+        self._keys = np.empty(0)
+        self._samples = {m: np.empty(0) for m in self.metrics}
+
+    def update(self, values: Dict[str, np.ndarray], rng: np.random.Generator) -> None:
+        """Adds a chunk of samples, one array per metric."""
+        chunk = StreamingStatistics(self.metrics, self.reservoir, self.spec)
+        chunk.count = len(values[self.metrics[0]])
+        if chunk.count == 0:
+            return
+        for m in self.metrics:
+            v = values[m]
+            chunk.mean[m] = float(v.mean())
+            chunk.m2[m] = float(((v - chunk.mean[m])**2).sum())
+            chunk.min[m] = float(v.min())
+            chunk.max[m] = float(v.max())
+        if self.spec is not None:
+            ok = np.ones(chunk.count, dtype=bool)
+            for m, (low, high) in self.spec.items():
+                ok &= (values[m] >= low) & (values[m] <= high)
+            chunk.in_spec = int(ok.sum())
+        keys = rng.random(chunk.count)
+        keep = np.argsort(keys)[:self.reservoir]
+        chunk._keys = keys[keep]
+        chunk._samples = {m: values[m][keep] for m in self.metrics}
+        self.merge(chunk)
+
+    def merge(self, other: "StreamingStatistics") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        for m in self.metrics:
+            delta = other.mean[m] - self.mean[m]
+            self.mean[m] += delta * other.count / total
+            self.m2[m] += other.m2[m] + delta**2 * self.count * other.count / total
+            self.min[m] = min(self.min[m], other.min[m])
+            self.max[m] = max(self.max[m], other.max[m])
+        self.count = total
+        self.in_spec += other.in_spec
+        keys = np.concatenate([self._keys, other._keys])
+        keep = np.argsort(keys)[:self.reservoir]
+        self._keys = keys[keep]
+        self._samples = {m: np.concatenate([self._samples[m], other._samples[m]])[keep] for m in self.metrics}
+
+    def result(self, quantiles: Sequence[float]) -> ToleranceResult:
+        std = {m: float(np.sqrt(self.m2[m] / (self.count - 1))) if self.count > 1 else 0.0 for m in self.metrics}
+        q = {m: {level: float(np.quantile(self._samples[m], level)) for level in quantiles} for m in self.metrics}
+        yield_ = self.in_spec / self.count if self.spec is not None and self.count else None
+        return ToleranceResult(self.count, dict(self.mean), std, dict(self.min), dict(self.max), q, yield_)
+
+
+# State of a worker process, sent once through the pool initializer
+_job = None
+
+
+def _init_worker(job) -> None:
+    global _job
+    _job = job
+
+
+def _evaluate_chunk(task) -> StreamingStatistics:
+    """Draws one chunk of perturbed systems, evaluates them as a batch and reduces them to statistics."""
+    size, seed = task
+    childs, perturbations, q_in, wavelength, spec, reservoir = _job
+    rng = np.random.default_rng(seed)
+
+    matrices, length = [], 0
+    for index, element in enumerate(childs):
+        changes = {}
+        for name, perturbation in perturbations.get(index, {}).items():
+            nominal = element.parameters[name]
+            deviation = rng.normal(0, perturbation, size) if np.isscalar(perturbation) else np.asarray(perturbation(rng, size))
+            changes[name] = nominal + deviation
+        if changes:
+            element = element.with_parameters(**changes)
+        matrices.append(element.matrix)
+        length = length + element.length
+
+    system = matrices[0] if matrices else np.identity(2)
+    for m in matrices[1:]:
+        system = np.matmul(m, system)
+    system = np.broadcast_to(system, (size, 2, 2))
+    A, B, C, D = system[:, 0, 0], system[:, 0, 1], system[:, 1, 0], system[:, 1, 1]
+    q_out = (A * q_in + B) / (C * q_in + D)
+
+    last = childs[-1] if childs else None
+    refractive_index = last.n if isinstance(last, Media) else 1
+    values = {
+        "waist_radius": np.sqrt(wavelength * q_out.imag / (np.pi * refractive_index)),
+        "waist_location": np.broadcast_to(length - q_out.real, (size,)),
+    }
+    statistics = StreamingStatistics(METRICS, reservoir, spec)
+    statistics.update(values, rng)
+    return statistics
+
+
+def tolerance_analysis(
+        path: ABCDCompositeElement,
+        beam: GaussianBeam,
+        perturbations: Dict[ABCDElement, Dict[str, Perturbation]],
+        n_samples: int,
+        chunk_size: int = 100_000,
+        spec: Dict[str, Tuple[float, float]] = None,
+        quantiles: Sequence[float] = (0.01, 0.05, 0.5, 0.95, 0.99),
+        processes: int = 1,
+        seed: int = None,
+        reservoir: int = 100_000) -> ToleranceResult:
+    """Monte Carlo analysis of the output waist under random perturbations of the path.
+
+    Samples are drawn in chunks of at most chunk_size systems. Every chunk is evaluated as one
+    batch of stacked ABCD matrices and immediately reduced to streaming statistics, so memory
+    does not grow with n_samples. Chunks may be spread over a process pool, results do not
+    depend on the number of processes for a given seed.
+
+    Args:
+        path (ABCDCompositeElement): Nominal optical path.
+        beam (GaussianBeam): Input beam.
+        perturbations (dict): Maps top level elements to {parameter: perturbation}, a perturbation being
+            the standard deviation of a normal distribution or a picklable callable (rng, size) -> deviations.
+        n_samples (int): Number of perturbed systems.
+        spec (dict, optional): Acceptance range (low, high) of "waist_radius" and/or "waist_location", used for the yield.
+        quantiles (Sequence[float]): Quantile levels to report, estimated from a random subsample of size "reservoir".
+        processes (int): Number of worker processes, 1 evaluates in process.
+        seed (int, optional): Seed making the analysis reproducible.
+
+    Raises:
+        ValueError: When n_samples or chunk_size is smaller than 1, or a perturbation names an unknown element or parameter.
+    """
+    if n_samples < 1 or chunk_size < 1:
+        raise ValueError("n_samples and chunk_size must be at least 1.")
+    positions = {id(e): i for i, e in enumerate(path.childs)}
+    indexed = {}
+    for element, parameters in perturbations.items():
+        if id(element) not in positions:
+            raise ValueError(f"{element.name} is not a top level element of the path.")
+        unknown = set(parameters) - set(element.parameters)
+        if unknown:
+            raise ValueError(f"{element.name} has no parameter(s) {', '.join(sorted(unknown))}.")
+        indexed[positions[id(element)]] = dict(parameters)
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, seeds))
+    job = (list(path.childs), indexed, beam.cbeam_parameter(0), beam.wavelength, spec, reservoir)
+
+    statistics = StreamingStatistics(METRICS, reservoir, spec)
+    if processes == 1:
+        _init_worker(job)
+        for task in tasks:
+            statistics.merge(_evaluate_chunk(task))
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(job,)) as pool:
+            for partial in pool.map(_evaluate_chunk, tasks):
+                statistics.merge(partial)
+    return statistics.result(quantiles)
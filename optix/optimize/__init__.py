@@ -0,0 +1,2 @@
+from optix.optimize.catalog import *
+from optix.optimize.lens_search import *
@@ -0,0 +1,160 @@
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from optix.matrixopt import ABCDElement, ThickLens, PlanoConvexLens
+
+__all__ = ["LensCatalog"]
+
+
+class LensCatalog:
+    """Table of stock lenses held as columnar arrays and indexed by focal length.
+
+    Every part is described by the columns of a ThickLens: R1, n, R2 and d. A plano-convex
+    part has an infinite R1 (or R2 when inversed). Any number of extra columns, e.g. part,
+    diameter or material, can be used in queries. Focal lengths, principal planes and system
+    matrices of all parts are computed at once when the catalog is built, and elements are
+    only created for the parts that are asked for.
+    """
+    REQUIRED = ("R1", "n", "R2", "d")
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return self._columns
+
+    @property
+    def matrices(self) -> np.ndarray:
+        """System matrices of all parts, shape (len(catalog), 2, 2)."""
+        return self._matrices
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self._columns["d"]
+
+    @property
+    def f(self) -> np.ndarray:
+        """Effective focal lengths -1/C of the thick lenses."""
+        return self._f
+
+    @property
+    def front_principal_plane(self) -> np.ndarray:
+        """Position of the front principal plane, measured from the first surface."""
+        return self._front_principal_plane
+
+    @property
+    def back_principal_plane(self) -> np.ndarray:
+        """Position of the back principal plane, measured from the last surface."""
+        return self._back_principal_plane
+
+    def __init__(self, columns: Dict[str, Sequence]) -> None:
+        """
+        Args:
+            columns (dict): Column name to values, the columns R1, n, R2 and d are required.
+
+        Raises:
+            ValueError: When a required column is missing or the columns differ in length.
+        """
+        missing = [c for c in self.REQUIRED if c not in columns]
+        if missing:
+            raise ValueError(f"Lens catalog is missing column(s) {', '.join(missing)}.")
+        self._columns = {name: np.asarray(values) for name, values in columns.items()}
+        if len({len(v) for v in self._columns.values()}) > 1:
+            raise ValueError("All catalog columns must have the same length.")
+        for name in self.REQUIRED:
+            self._columns[name] = self._columns[name].astype(float)
+        R1, n, R2, d = (self._columns[name] for name in self.REQUIRED)
+
+        self._matrices = ThickLens(R1, n, R2, d).matrix.reshape(-1, 2, 2)
+        A, C, D = self._matrices[:, 0, 0], self._matrices[:, 1, 0], self._matrices[:, 1, 1]
+        with np.errstate(divide="ignore"):
+            self._f = -1 / C
+            self._front_principal_plane = (D - 1) / C
+            self._back_principal_plane = (1 - A) / C
+        self._order = np.argsort(self._f, kind="stable")
+        self._sorted_f = self._f[self._order]
+
+    @staticmethod
+    def from_csv(path: str, **kwargs) -> "LensCatalog":
+        """Loads a catalog from a CSV file with a header row naming the columns."""
+        table = np.genfromtxt(path, delimiter=",", names=True, dtype=None, encoding="utf-8", autostrip=True, **kwargs)
+        return LensCatalog({name: np.atleast_1d(table[name]) for name in table.dtype.names})
+
+    @staticmethod
+    def from_npy(path: str) -> "LensCatalog":
+        """Loads a catalog from a structured array saved by LensCatalog.save."""
+        table = np.load(path)
+        return LensCatalog({name: table[name] for name in table.dtype.names})
+
+    @staticmethod
+    def from_elements(elements: Iterable[ABCDElement], **columns) -> "LensCatalog":
+        """Builds a catalog from ThickLens (and PlanoConvexLens) instances, extra columns given as keyword arguments."""
+        elements = list(elements)
+        data = {"R1": [e._R1 for e in elements], "n": [e._n for e in elements], "R2": [e._R2 for e in elements], "d": [e._d for e in elements]}
+        return LensCatalog({**data, **columns})
+
+    def save(self, path: str) -> None:
+        """Saves the columns as one structured array in NumPy's .npy format."""
+        names = list(self._columns)
+        table = np.empty(len(self), dtype=[(name, self._columns[name].dtype) for name in names])
+        for name in names:
+            table[name] = self._columns[name]
+        np.save(path, table)
+
+    def __len__(self) -> int:
+        return len(self._f)
+
+    def __getitem__(self, index: int) -> ABCDElement:
+        """Element of a part, a PlanoConvexLens for parts with a flat face and a ThickLens otherwise."""
+        R1, n, R2, d = (float(self._columns[name][index]) for name in self.REQUIRED)
+        if np.isinf(R1) and not np.isinf(R2):
+            element = PlanoConvexLens(R2, d, n)
+        elif np.isinf(R2) and not np.isinf(R1):
+            element = PlanoConvexLens(R1, d, n, inversed=True)
+        else:
+            element = ThickLens(R1, n, R2, d)
+        if "part" in self._columns:
+            element.name = str(self._columns["part"][index])
+        return element
+
+    def elements(self, indices: Iterable[int]) -> List[ABCDElement]:
+        return [self[int(i)] for i in indices]
+
+    def select(self, **constraints) -> np.ndarray:
+        """Mask of the parts meeting all constraints.
+
+        A constraint is column=value for equality, column=(low, high) for an inclusive range,
+        or column=[values] / {values} for membership, e.g. select(diameter=(10e-3, 30e-3), material={"N-BK7", "UVFS"}).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in constraints.items():
+            if name not in self._columns and name != "f":
+                raise KeyError(f"Lens catalog has no column {name!r}.")
+            column = self._f if name == "f" else self._columns[name]
+            if isinstance(value, tuple):
+                low, high = value
+                mask &= (column >= low) & (column <= high)
+            elif isinstance(value, (list, set, frozenset, np.ndarray)):
+                mask &= np.isin(column, list(value))
+            else:
+                mask &= column == value
+        return mask
+
+    def nearest(self, f: float, k: int = 1, **constraints) -> np.ndarray:
+        """Indices of the k parts closest to focal length f (meeting the constraints), closest first."""
+        order, sorted_f = self._order, self._sorted_f
+        if constraints:
+            keep = self.select(**constraints)[order]
+            order, sorted_f = order[keep], sorted_f[keep]
+        k = min(k, len(order))
+        # The k nearest values lie within k positions on either side of the insertion point
+        position = np.searchsorted(sorted_f, f)
+        window = np.arange(max(position - k, 0), min(position + k, len(order)))
+        closest = window[np.argsort(np.abs(sorted_f[window] - f), kind="stable")[:k]]
+        return order[closest]
+
+    def within(self, f_min: float, f_max: float, **constraints) -> np.ndarray:
+        """Indices of the parts with focal length in [f_min, f_max] (meeting the constraints), sorted by focal length."""
+        start = np.searchsorted(self._sorted_f, f_min, side="left")
+        stop = np.searchsorted(self._sorted_f, f_max, side="right")
+        indices = self._order[start:stop]
+        if constraints:
+            indices = indices[self.select(**constraints)[indices]]
+        return indices
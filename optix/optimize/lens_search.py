@@ -0,0 +1,243 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
+from typing import List, Sequence, Tuple, Union
+import numpy as np
+from optix.matrixopt import ABCDElement, FreeSpace, OpticalPath
+from optix.beams import GaussianBeam
+from optix.optimize.catalog import LensCatalog
+
+__all__ = ["LensArrangement", "search_lenses"]
+
+
+class LensArrangement(namedtuple("LensArrangement", "cost lenses spacings waist_radius waist_location")):
+    """Candidate optical system found by search_lenses.
+
+    "spacings" holds the free space in front of every lens, the first one being the
+    distance between the input beam (z = 0) and the first lens.
+    """
+    __slots__ = ()
+
+    def to_path(self) -> OpticalPath:
+        path = OpticalPath()
+        for spacing, lens in zip(self.spacings, self.lenses):
+            path.append(FreeSpace(spacing))
+            path.append(lens)
+        return path
+
+
+# Everything a worker needs, sent once per worker instead of once per task
+_SearchContext = namedtuple("_SearchContext", [
+    "q_in", "wavelength", "matrices", "lengths", "powers_order", "powers_sorted",
+    "grid", "spacing", "target_waist", "target_location", "target_rayleigh_range",
+    "n_lenses", "max_radius", "neighbors", "top"])
+
+_context = None
+
+
+def _init_worker(context: _SearchContext) -> None:
+    global _context
+    _context = context
+
+
+def _beam_radius(q: np.ndarray, wavelength: float) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(wavelength / np.pi * np.abs(q)**2 / q.imag)
+
+
+def _act(matrices: np.ndarray, q: np.ndarray) -> np.ndarray:
+    A, B, C, D = (matrices[..., i, j] for i, j in ((0, 0), (0, 1), (1, 0), (1, 1)))
+    # Spacings without a solution are NaN and simply propagate
+    with np.errstate(invalid="ignore"):
+        return (A * q + B) / (C * q + D)
+
+
+def _expand(ctx: _SearchContext, q, z, lens_ids, spacing_ids, lenses: np.ndarray):
+    """Adds one more (spacing, lens) pair to every state, keeping only the states within bounds."""
+    q_at_lens = q[:, None] + ctx.grid[None, :]
+    z_at_lens = z[:, None] + ctx.grid[None, :]
+    q_out = _act(ctx.matrices[lenses], q_at_lens[..., None])
+    z_out = z_at_lens[..., None] + ctx.lengths[lenses]
+
+    keep = (q_out.imag > 0) & (z_out <= ctx.target_location)
+    if ctx.max_radius is not None:
+        keep &= (_beam_radius(q_at_lens, ctx.wavelength) <= ctx.max_radius)[..., None]
+    state, spacing, lens = np.nonzero(keep)
+    return (
+        q_out[state, spacing, lens],
+        z_out[state, spacing, lens],
+        np.column_stack([lens_ids[state], lenses[lens]]),
+        np.column_stack([spacing_ids[state], spacing]))
+
+
+def _last_spacing(ctx: _SearchContext, q: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Spacings in front of the last lens for which a thin lens can produce the target beam.
+
+    A thin lens keeps Im(1/q), which fixes the lens position through a quadratic equation.
+    Returns an array (N, 2) with NaN for roots that do not exist or lie outside the spacing range.
+    """
+    x, y = q.real, q.imag
+    zr = ctx.target_rayleigh_range
+    a = z - ctx.target_location
+    A = zr - y
+    B = 2 * (zr * x - y * a)
+    C = zr * (x**2 + y**2) - y * (a**2 + zr**2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_disc = np.sqrt(B**2 - 4 * A * C)
+        roots = np.stack([(-B + sqrt_disc) / (2 * A), (-B - sqrt_disc) / (2 * A)], axis=-1)
+        linear = np.abs(A) < 1e-12 * np.abs(B)
+        roots[linear] = (-C / B)[linear, None]
+    lo, hi = ctx.spacing
+    return np.where((roots >= lo) & (roots <= hi), roots, np.nan)
+
+
+def _finish(ctx: _SearchContext, q, z, lens_ids, spacing_ids) -> List[tuple]:
+    """Places the last lens, picked from the catalog by nearest optical power, and scores the states."""
+    spacing = _last_spacing(ctx, q, z)
+    # Only states with a feasible last spacing are scored
+    state, root = np.nonzero(np.isfinite(spacing))
+    if len(state) == 0:
+        return []
+    spacing = spacing[state, root]
+    q_at_lens = q[state] + spacing
+    z_at_lens = z[state] + spacing
+    if ctx.max_radius is not None:
+        fits = _beam_radius(q_at_lens, ctx.wavelength) <= ctx.max_radius
+        state, spacing, q_at_lens, z_at_lens = state[fits], spacing[fits], q_at_lens[fits], z_at_lens[fits]
+    q_target = (z_at_lens - ctx.target_location) + 1j * ctx.target_rayleigh_range
+    power = (1 / q_at_lens - 1 / q_target).real
+
+    # Candidate lenses are the catalog neighbours of the required power, found by binary search
+    position = np.searchsorted(ctx.powers_sorted, power)
+    offsets = np.arange(-ctx.neighbors, ctx.neighbors)
+    position = np.clip(position[:, None] + offsets, 0, len(ctx.powers_sorted) - 1)
+    lenses = ctx.powers_order[position]
+
+    q_out = _act(ctx.matrices[lenses], q_at_lens[:, None])
+    z_out = z_at_lens[:, None] + ctx.lengths[lenses]
+    with np.errstate(invalid="ignore"):
+        waist_radius = np.sqrt(ctx.wavelength * q_out.imag / np.pi)
+    waist_location = z_out - q_out.real
+    cost = ((waist_radius - ctx.target_waist) / ctx.target_waist)**2 + ((waist_location - ctx.target_location) / ctx.target_rayleigh_range)**2
+    valid = np.isfinite(cost) & (q_out.imag > 0) & (z_out <= ctx.target_location)
+    cost = np.where(valid, cost, np.inf)
+
+    flat = cost.reshape(-1)
+    count = min(ctx.top, int(np.isfinite(flat).sum()))
+    if count == 0:
+        return []
+    best = np.argpartition(flat, count - 1)[:count]
+    results = []
+    for i, neighbor in zip(*np.unravel_index(best, cost.shape)):
+        results.append((
+            float(cost[i, neighbor]),
+            tuple(int(l) for l in lens_ids[state[i]]) + (int(lenses[i, neighbor]),),
+            tuple(float(ctx.grid[s]) for s in spacing_ids[state[i]]) + (float(spacing[i]),),
+            float(waist_radius[i, neighbor]),
+            float(waist_location[i, neighbor])))
+    return results
+
+
+def _search(first_lenses: Sequence[int]) -> List[tuple]:
+    ctx = _context
+    q = np.array([ctx.q_in])
+    z = np.zeros(1)
+    lens_ids = np.empty((1, 0), dtype=int)
+    spacing_ids = np.empty((1, 0), dtype=int)
+    all_lenses = np.arange(len(ctx.matrices))
+    for stage in range(ctx.n_lenses - 1):
+        lenses = np.asarray(first_lenses) if stage == 0 else all_lenses
+        q, z, lens_ids, spacing_ids = _expand(ctx, q, z, lens_ids, spacing_ids, lenses)
+        if len(q) == 0:
+            return []
+    return _finish(ctx, q, z, lens_ids, spacing_ids)
+
+
+def search_lenses(
+        beam: GaussianBeam,
+        catalog: Union[LensCatalog, Sequence[ABCDElement]],
+        target_waist: float,
+        target_location: float,
+        spacing: Tuple[float, float],
+        n_lenses: int = 3,
+        spacing_steps: int = 10,
+        max_radius: float = None,
+        neighbors: int = 2,
+        top: int = 10,
+        processes: int = None,
+        chunk_size: int = 8) -> List[LensArrangement]:
+    """Searches arrangements of catalog lenses that focus the beam to a target waist.
+
+    The system is FreeSpace(s1), lens 1, ..., FreeSpace(sN), lens N, starting at the input
+    beam (z = 0). All spacings but the last one are taken from a grid over the spacing range.
+    The last spacing is solved for in closed form and the last lens is picked by binary search
+    over the catalog sorted by optical power, so the search only enumerates N - 1 lenses.
+    States that clip (max_radius) or pass the target location are pruned as soon as they
+    appear, and the first lens is distributed over a process pool.
+
+    Args:
+        beam (GaussianBeam): Input beam at z = 0, propagating in air.
+        catalog (LensCatalog or Sequence[ABCDElement]): Available lenses, e.g. ThinLens, ThickLens or PlanoConvexLens.
+            The precomputed matrices of a LensCatalog are used directly, elements are only built for the results.
+        target_waist (float): Required waist radius.
+        target_location (float): Required waist location, measured from the input.
+        spacing (tuple): Minimal and maximal distance in front of every lens.
+        n_lenses (int): Number of lenses of the arrangement.
+        spacing_steps (int): Grid resolution of the enumerated spacings.
+        max_radius (float, optional): Maximal beam radius allowed on any lens.
+        neighbors (int): Number of catalog lenses tried on each side of the required power.
+        top (int): Number of best arrangements returned.
+        processes (int, optional): Size of the process pool, defaults to the number of CPUs. 1 runs in process.
+        chunk_size (int): Number of first lenses handled by one task.
+
+    Returns:
+        List[LensArrangement]: Best arrangements, sorted by cost. The cost is the sum of squared
+            relative waist error and squared waist location error in units of the target Rayleigh range.
+    """
+    if n_lenses < 1:
+        raise ValueError("At least one lens is required.")
+    if isinstance(catalog, LensCatalog):
+        matrices, lengths = catalog.matrices, catalog.lengths
+    else:
+        catalog = list(catalog)
+        matrices = np.array([e.matrix for e in catalog], dtype=float)
+        lengths = np.array([e.length for e in catalog], dtype=float)
+
+    # Identical parts are evaluated once, the search runs over unique matrices
+    _, unique, inverse = np.unique(np.column_stack([matrices.reshape(-1, 4), lengths]), axis=0, return_index=True, return_inverse=True)
+    matrices, lengths = matrices[unique], lengths[unique]
+    powers = -matrices[:, 1, 0]
+    order = np.argsort(powers)
+
+    context = _SearchContext(
+        q_in=beam.cbeam_parameter(0),
+        wavelength=beam.wavelength,
+        matrices=matrices,
+        lengths=lengths,
+        powers_order=order,
+        powers_sorted=powers[order],
+        grid=np.linspace(spacing[0], spacing[1], spacing_steps),
+        spacing=spacing,
+        target_waist=target_waist,
+        target_location=target_location,
+        target_rayleigh_range=np.pi * target_waist**2 / beam.wavelength,
+        n_lenses=n_lenses,
+        max_radius=max_radius,
+        neighbors=neighbors,
+        top=top)
+
+    firsts = np.arange(len(matrices))
+    tasks = [firsts[i:i + chunk_size] for i in range(0, len(firsts), chunk_size)] if n_lenses > 1 else [firsts]
+    processes = processes or os.cpu_count()
+    if processes == 1 or len(tasks) == 1:
+        _init_worker(context)
+        results = [_search(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(context,)) as pool:
+            results = list(pool.map(_search, tasks))
+
+    best = heapq.nsmallest(top, (r for task in results for r in task), key=lambda r: r[0])
+    return [
+        LensArrangement(cost, [catalog[unique[i]] for i in lenses], list(spacings), waist_radius, waist_location)
+        for cost, lenses, spacings, waist_radius, waist_location in best]
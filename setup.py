@@ -1,7 +1,7 @@
-from setuptools import setup
+from setuptools import setup, find_packages
 setup(
   name = 'optix',         
-  packages = ['optix'],   
+  packages = find_packages(exclude=['tests*', 'benchmarks*']),
   version = '0.2.3',      
   license='MIT',        
   description = 'Optics simplified',   
@@ -13,6 +13,12 @@ setup(
   install_requires=[           
           'numpy>=1.19.4',
       ],
+  extras_require={
+          'plotting': ['matplotlib'],
+      },
+  entry_points={
+          'console_scripts': ['optix-propagate=optix.cli:main'],
+      },
   classifiers=[
     'Development Status :: 3 - Alpha',      
     'Intended Audience :: Science/Research',      
@@ -88,3 +88,43 @@ class TestGaussianBeam(unittest.TestCase):
         actual = str(gb)
 
         self.assertMultiLineEqual(actual, expected)
+
+
+class TestGaussianBeamArray(unittest.TestCase):
+    WAVELENGTHS = np.array([405e-9, 633e-9, 1064e-9])
+    WAISTS = np.array([1e-3, 0.5e-3, 2e-3])
+
+    def test_init_no_beam_param_fail(s):
+        with s.assertRaises(ValueError):
+            GaussianBeamArray(wave_length=s.WAVELENGTHS)
+
+    def test_matches_scalar_beams(s):
+        beams = GaussianBeamArray(s.WAVELENGTHS, refractive_index=1.2, waist_location=0.1, w0=s.WAISTS)
+        z = 0.7
+        for i, (wl, w0) in enumerate(zip(s.WAVELENGTHS, s.WAISTS)):
+            gb = GaussianBeam(wl, refractive_index=1.2, waist_location=0.1, w0=w0)
+            s.assertAlmostEqual(beams.rayleigh_range[i], gb.rayleigh_range)
+            s.assertAlmostEqual(beams.divergence[i], gb.divergence)
+            s.assertAlmostEqual(beams.beam_radius(z)[i], gb.beam_radius(z))
+            s.assertAlmostEqual(beams.curviture(z)[i], gb.curviture(z))
+            s.assertAlmostEqual(beams.cbeam_parameter(z)[i], gb.cbeam_parameter(z))
+
+    def test_broadcasting(s):
+        beams = GaussianBeamArray(s.WAVELENGTHS[:, None], w0=s.WAISTS[None, :])
+        s.assertEqual(beams.shape, (3, 3))
+        s.assertTrue(beams.wavelength.flags["C_CONTIGUOUS"])
+        s.assertEqual(beams.beam_radius(0).shape, (3, 3))
+
+    def test_from_q(s):
+        q = np.array([complex(3, 5), complex(-1, 2)])
+        beams = GaussianBeamArray.from_q(1, q, 10)
+        np.testing.assert_allclose(beams.cbeam_parameter(10), q)
+        np.testing.assert_allclose(beams.waist_location, [7, 11])
+
+    def test_getitem_returns_gaussian_beam(s):
+        beams = GaussianBeamArray.from_beams([GaussianBeam(1, zr=2), GaussianBeam(2, waist_location=1, zr=3)])
+        gb = beams[1]
+        s.assertIsInstance(gb, GaussianBeam)
+        s.assertEqual(gb.wavelength, 2)
+        s.assertEqual(gb.rayleigh_range, 3)
+        s.assertEqual(len(beams[0:1]), 1)
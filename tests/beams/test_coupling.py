@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from optix.beams import GaussianBeam, GaussianBeamArray, field, mode_overlap, coupling_efficiency
+
+
+def _numerical_overlap(beam, target, x, offset, tilt):
+    k = 2 * np.pi / beam.wavelength
+    E = field(beam, x, x, 0.2)
+    T = field(target, x - offset[0], x - offset[1], 0.2) * np.exp(-1j * k * (tilt[0] * x[None, :] + tilt[1] * x[:, None]))
+    return np.abs(np.vdot(T, E))**2 / (np.vdot(E, E).real * np.vdot(T, T).real)
+
+
+class TestCoupling(unittest.TestCase):
+    BEAM = GaussianBeam(1064e-9, w0=50e-6, waist_location=0.1)
+
+    def test_identical_modes(self):
+        self.assertAlmostEqual(coupling_efficiency(self.BEAM, self.BEAM, z=0.3), 1)
+
+    def test_waist_mismatch(self):
+        target = GaussianBeam(1064e-9, w0=100e-6, waist_location=0.1)
+        # Aligned waists: (2 w1 w2 / (w1^2 + w2^2))^2 in 2-D
+        self.assertAlmostEqual(coupling_efficiency(self.BEAM, target), (2 * 50 * 100 / (50**2 + 100**2))**2)
+
+    def test_matches_numerical_overlap(self):
+        target = GaussianBeam(1064e-9, w0=70e-6, waist_location=0.15)
+        x = np.linspace(-3e-3, 3e-3, 1601)
+        for offset, tilt in (((30e-6, -20e-6), (0, 0)), ((0, 0), (2e-3, 1e-3)), ((40e-6, 10e-6), (-3e-3, 2e-3))):
+            expected = _numerical_overlap(self.BEAM, target, x, offset, tilt)
+            self.assertAlmostEqual(coupling_efficiency(self.BEAM, target, z=0.2, offset=offset, tilt=tilt), expected, places=10)
+
+    def test_independent_of_plane(self):
+        target = GaussianBeam(1064e-9, w0=70e-6, waist_location=0.15)
+        np.testing.assert_allclose(
+            [coupling_efficiency(self.BEAM, target, z=z) for z in (0, 0.1, 0.5)],
+            coupling_efficiency(self.BEAM, target, z=0.2))
+
+    def test_vectorized(self):
+        beams = GaussianBeamArray(1064e-9, w0=np.linspace(20e-6, 100e-6, 5), waist_location=0.1)
+        offsets = np.linspace(0, 50e-6, 3)[:, None]
+        efficiency = coupling_efficiency(beams, self.BEAM, offset=(offsets, 0))
+        self.assertEqual(efficiency.shape, (3, 5))
+        for i, beam in enumerate(beams):
+            self.assertAlmostEqual(efficiency[2, i], coupling_efficiency(beam, self.BEAM, offset=(50e-6, 0)))
+        q = beams.cbeam_parameter(0)
+        np.testing.assert_allclose(mode_overlap(q, q, 1064e-9), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
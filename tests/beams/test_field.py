@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from optix.beams import GaussianBeam, field, intensity
+
+
+class TestField(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, amplitude=2, w0=0.5e-3)
+
+    def setUp(self):
+        self.x = np.linspace(-3e-3, 3e-3, 301)
+        self.y = np.linspace(-2e-3, 2e-3, 201)
+
+    def test_matches_textbook_formula(self):
+        beam = self.BEAM
+        z = np.array([0, 0.5 * beam.rayleigh_range, 2 * beam.rayleigh_range])
+        E = field(beam, self.x, self.y, z)
+        self.assertEqual(E.shape, (3, 201, 301))
+        X, Y = np.meshgrid(self.x, self.y)
+        k = 2 * np.pi / beam.wavelength
+        for i, zi in enumerate(z):
+            w = beam.beam_radius(zi)
+            gouy = np.arctan(zi / beam.rayleigh_range)
+            curvature = 0 if zi == 0 else k * (X**2 + Y**2) / (2 * beam.curviture(zi))
+            expected = 2 * beam.waist_radius / w * np.exp(-(X**2 + Y**2) / w**2) * np.exp(-1j * (k * zi - gouy + curvature))
+            np.testing.assert_allclose(E[i], expected, atol=1e-12)
+
+    def test_power_is_conserved(self):
+        x = np.linspace(-10e-3, 10e-3, 801)
+        I = intensity(self.BEAM, x, x, [0, 1, 5])
+        power = I.sum(axis=(1, 2)) * (x[1] - x[0])**2
+        np.testing.assert_allclose(power, 4 * np.pi * self.BEAM.waist_radius**2 / 2, rtol=1e-6)
+
+    def test_intensity_matches_field(self):
+        E = field(self.BEAM, self.x, self.y, 0.3)
+        self.assertEqual(E.shape, (201, 301))
+        np.testing.assert_allclose(intensity(self.BEAM, self.x, self.y, 0.3), np.abs(E)**2, rtol=1e-12)
+
+    def test_elliptical_beam(self):
+        sagittal = GaussianBeam(633e-9, amplitude=2, w0=0.2e-3, waist_location=0.1)
+        I = intensity(self.BEAM, self.x, self.y, 0.1, sagittal=sagittal)
+        np.testing.assert_allclose(I[100], 4 * np.exp(-2 * self.x**2 / self.BEAM.beam_radius(0.1)**2) * self.BEAM.waist_radius / self.BEAM.beam_radius(0.1))
+
+    def test_single_precision_and_chunks(self):
+        z = np.linspace(0, 1, 7)
+        E = field(self.BEAM, self.x, self.y, z, dtype=np.complex64, chunk_size=3)
+        self.assertEqual(E.dtype, np.complex64)
+        np.testing.assert_allclose(E, field(self.BEAM, self.x, self.y, z), atol=1e-5)
+        self.assertEqual(intensity(self.BEAM, self.x, self.y, z, dtype=np.float32).dtype, np.float32)
+
+    def test_memmap_output(self):
+        z = np.linspace(0, 1, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "field.dat")
+            out = np.memmap(path, dtype=np.complex64, mode="w+", shape=(5, 201, 301))
+            self.assertIs(field(self.BEAM, self.x, self.y, z, out=out, chunk_size=2), out)
+            out.flush()
+            stored = np.memmap(path, dtype=np.complex64, mode="r", shape=(5, 201, 301))
+            np.testing.assert_allclose(stored, field(self.BEAM, self.x, self.y, z), atol=1e-5)
+            del out, stored
+
+    def test_wrong_output_shape(self):
+        with self.assertRaises(ValueError):
+            field(self.BEAM, self.x, self.y, [0, 1], out=np.empty((201, 301), dtype=complex))
+
+
+if __name__ == "__main__":
+    unittest.main()
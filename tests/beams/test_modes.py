@@ -0,0 +1,133 @@
+import unittest
+from math import factorial
+import numpy as np
+from optix.beams import GaussianBeam, field, HermiteGaussMode, LaguerreGaussMode, EmbeddedGaussianBeam, hermite_gauss, laguerre_gauss
+from optix.beams import modes
+from optix.beams.modes import _hermite_table
+from optix.matrixopt import OpticalPath, FreeSpace, ThinLens, CylindricalLens
+
+
+class TestModes(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, amplitude=2, w0=0.5e-3)
+
+    def setUp(self):
+        self.x = np.linspace(-4e-3, 4e-3, 401)
+        self.y = np.linspace(-3e-3, 3e-3, 301)
+
+    def overlap(self, a, b):
+        return np.sum(np.conj(a) * b) * (self.x[1] - self.x[0]) * (self.y[1] - self.y[0])
+
+    def test_fundamental_modes_equal_gaussian_field(self):
+        z = 0.7 * self.BEAM.rayleigh_range
+        expected = field(self.BEAM, self.x, self.y, z)
+        np.testing.assert_allclose(HermiteGaussMode(self.BEAM).field(self.x, self.y, z), expected, atol=1e-12)
+        np.testing.assert_allclose(LaguerreGaussMode(self.BEAM).field(self.x, self.y, z), expected, atol=1e-12)
+
+    def test_hermite_table_matches_polynomials(self):
+        x = np.linspace(-2e-3, 2e-3, 51)
+        w = 1e-3
+        table = _hermite_table(x, w, 12)
+        xi = np.sqrt(2) * x / w
+        for m in range(13):
+            H = np.polynomial.hermite.hermval(xi, [0] * m + [1])
+            np.testing.assert_allclose(table[m], H * np.exp(-xi**2 / 2) / np.sqrt(2**m * factorial(m) * np.sqrt(np.pi)), atol=1e-12)
+
+    def test_tables_are_cached_and_extended(self):
+        x = np.linspace(-1, 1, 11)
+        table = _hermite_table(x, 0.5, 3)
+        self.assertIs(_hermite_table(x.copy(), 0.5, 2), table)
+        extended = _hermite_table(x, 0.5, 20)
+        self.assertGreaterEqual(len(extended), 21)
+        np.testing.assert_array_equal(extended[:len(table)], table)
+
+    def test_laguerre_tables_are_radial_and_cached(self):
+        x = np.linspace(-1e-3, 1e-3, 201)
+        modes.clear_mode_cache()
+        laguerre_gauss(self.BEAM, [0, 3, 5], [2, -2, 2], x, x)
+        tables = {key: table for key, table in modes._CACHE._tables.items() if key[0] == "laguerre"}
+        self.assertEqual(len(tables), 1)
+        table, = tables.values()
+        # Rows hold the distinct radii of the symmetric grid only, exactly up to the highest order
+        self.assertEqual(table.shape[0], 6)
+        self.assertLess(table.shape[1], x.size**2 / 4)
+        laguerre_gauss(self.BEAM, 4, 2, x, x)
+        self.assertIs(modes._CACHE.get(next(iter(tables))), table)
+
+    def test_modes_are_orthogonal(self):
+        z = 0.3
+        orders = [(0, 0), (1, 0), (0, 1), (2, 1), (3, 3)]
+        hg = hermite_gauss(self.BEAM, [m for m, _ in orders], [n for _, n in orders], self.x, self.y, z)
+        lg = laguerre_gauss(self.BEAM, [0, 0, 1, 1, 2], [0, 2, 0, -1, 1], self.x, self.y, z)
+        power = 4 * np.pi * self.BEAM.waist_radius**2 / 2
+        for batch in (hg, lg):
+            gram = np.array([[self.overlap(a, b) for b in batch] for a in batch])
+            np.testing.assert_allclose(gram, power * np.eye(len(batch)), atol=1e-6 * power)
+
+    def test_batch_matches_single_modes(self):
+        batch = hermite_gauss(self.BEAM, [0, 2, 5], [1, 0, 3], self.x, self.y, 0.2, dtype=np.complex64)
+        self.assertEqual(batch.shape, (3, 301, 401))
+        self.assertEqual(batch.dtype, np.complex64)
+        np.testing.assert_allclose(batch[2], HermiteGaussMode(self.BEAM, 5, 3).field(self.x, self.y, 0.2), atol=1e-6)
+        lg = laguerre_gauss(self.BEAM, [1, 2], [-2, 3], self.x, self.y, 0.2)
+        np.testing.assert_allclose(lg[1], LaguerreGaussMode(self.BEAM, 2, 3).field(self.x, self.y, 0.2), atol=1e-12)
+
+    def test_laguerre_from_hermite(self):
+        z = 0.4
+        hg = hermite_gauss(self.BEAM, [1, 0], [0, 1], self.x, self.y, z)
+        lg = laguerre_gauss(self.BEAM, 0, 1, self.x, self.y, z)
+        np.testing.assert_allclose(lg, (hg[0] + 1j * hg[1]) / np.sqrt(2), atol=1e-12)
+
+    def test_gouy_phase_and_radius(self):
+        z = self.BEAM.rayleigh_range
+        mode = HermiteGaussMode(self.BEAM, 2, 1)
+        self.assertAlmostEqual(mode.gouy_phase(z), 4 * np.pi / 4)
+        self.assertEqual(mode.m_squared, (5, 3))
+        np.testing.assert_allclose(mode.beam_radius(z), (np.sqrt(5) * self.BEAM.beam_radius(z), np.sqrt(3) * self.BEAM.beam_radius(z)))
+        mode = LaguerreGaussMode(self.BEAM, 1, -2)
+        self.assertEqual(mode.m_squared, 5)
+        self.assertAlmostEqual(mode.gouy_phase(z), 5 * np.pi / 4)
+
+    def test_invalid_orders(self):
+        with self.assertRaises(ValueError):
+            HermiteGaussMode(self.BEAM, -1, 0)
+        with self.assertRaises(ValueError):
+            laguerre_gauss(self.BEAM, 0.5, 0, self.x, self.y)
+
+
+class TestModePropagation(unittest.TestCase):
+    BEAM = GaussianBeam(1064e-9, w0=1e-3)
+
+    def test_orders_are_kept(self):
+        path = OpticalPath(FreeSpace(0.2), ThinLens(0.1), FreeSpace(0.05))
+        expected = path.propagate(self.BEAM)
+        for mode in (HermiteGaussMode(self.BEAM, 3, 1), LaguerreGaussMode(self.BEAM, 2, -1)):
+            output = path.propagate_mode(mode)
+            self.assertIs(type(output), type(mode))
+            self.assertEqual(output.m_squared, mode.m_squared)
+            self.assertAlmostEqual(output.beam.waist_location, expected.waist_location)
+            self.assertAlmostEqual(output.beam.rayleigh_range, expected.rayleigh_range)
+
+    def test_astigmatic_path(self):
+        path = OpticalPath(CylindricalLens(0.1), FreeSpace(0.1))
+        output = path.propagate_mode(HermiteGaussMode(self.BEAM, 1, 2))
+        self.assertNotAlmostEqual(output.beam.rayleigh_range, output.sagittal.rayleigh_range)
+        self.assertAlmostEqual(output.sagittal.rayleigh_range, self.BEAM.rayleigh_range)
+        with self.assertRaises(ValueError):
+            path.propagate_mode(LaguerreGaussMode(self.BEAM, 0, 1))
+
+    def test_embedded_gaussian(self):
+        beam = EmbeddedGaussianBeam.from_waist(1064e-9, 2e-3, 4)
+        self.assertAlmostEqual(beam.waist_radius, 2e-3)
+        self.assertAlmostEqual(beam.beam.waist_radius, 1e-3)
+        self.assertAlmostEqual(beam.waist_radius * beam.divergence, 4 * 1064e-9 / np.pi)
+        self.assertAlmostEqual(beam.beam_radius(3.0), 2 * beam.beam.beam_radius(3.0))
+        path = OpticalPath(FreeSpace(0.5), ThinLens(0.2))
+        output = path.propagate_mode(beam)
+        self.assertEqual(output.m_squared, 4)
+        self.assertAlmostEqual(output.waist_radius, 2 * path.propagate(beam.beam).waist_radius)
+        with self.assertRaises(ValueError):
+            EmbeddedGaussianBeam(self.BEAM, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -115,4 +115,108 @@ class TestPlanConvexLens(unittest.TestCase):
 
         
 
-        
\ No newline at end of file
+        
+
+class TestArrayParameters(unittest.TestCase):
+    def test_free_space_stacked_matrix(self):
+        d = np.linspace(0, 1, 5)
+        actual = FreeSpace(d).matrix
+        self.assertEqual(actual.shape, (5, 2, 2))
+        for i, di in enumerate(d):
+            np.testing.assert_array_equal(actual[i], FreeSpace(di).matrix)
+
+    def test_thick_lens_stacked_matrix(self):
+        d = np.array([0.01, 0.02])
+        actual = ThickLens(0.8, 1.2, 0.4, d).matrix
+        for i, di in enumerate(d):
+            np.testing.assert_allclose(actual[i], ThickLens(0.8, 1.2, 0.4, di).matrix)
+
+    def test_with_parameters(self):
+        pcl = PlanoConvexLens(1, 2, 3, inversed=True).with_parameters(d=5)
+        self.assertEqual(pcl.parameters, {"R": 1, "d": 5, "n": 3, "inversed": True})
+        with self.assertRaises(ValueError):
+            ThinLens(1).with_parameters(d=2)
+
+
+class TestCompactElements(unittest.TestCase):
+    def test_no_instance_dict(self):
+        for element in (FreeSpace(1), Media(1, 2), ThinLens(1), FlatInterface(1, 2), CurvedInterface(1, 2, 3), ThickLens(1, 2, 3, 4), PlanoConvexLens(1, 2, 3)):
+            self.assertFalse(hasattr(element, "__dict__"), type(element).__name__)
+
+    def test_explicit_name_overrides_default(self):
+        tl = ThinLens(2)
+        tl.name = "L1"
+        self.assertEqual(tl.name, "L1")
+        self.assertEqual(ABCDElement(1, 2, 3, 4).name, "")
+
+    def test_shared_instances(self):
+        a = CurvedInterface.shared(1, 1.5, 0.1)
+        self.assertIs(a, CurvedInterface.shared(1, 1.5, 0.1))
+        self.assertIsNot(a, CurvedInterface.shared(1.0, 1.5, 0.1))
+        with self.assertRaises(AttributeError):
+            a.matrix = np.identity(2)
+
+    def test_shared_instances_are_immutable(self):
+        media = ThickLens(1, 1.5, 2, 0.1).childs[1]
+        with self.assertRaises(AttributeError):
+            media.n = 1.7
+        with self.assertRaises(AttributeError):
+            media.name = "glass"
+        self.assertEqual(media.n, 1.5)
+        self.assertEqual(Media.shared(0.1, 1.5).n, 1.5)
+        gap = Media(0.1, 1.5)
+        gap.n = 1.7
+        gap.name = "glass"
+        self.assertEqual((gap.n, gap.name), (1.7, "glass"))
+
+    def test_thick_lenses_share_surfaces(self):
+        a = ThickLens(1, 1.5, 2, 0.1)
+        b = ThickLens(1, 1.5, 3, 0.1)
+        self.assertIs(a.childs[0], b.childs[0])
+        self.assertIs(a.childs[1], b.childs[1])
+
+    def test_shared_falls_back_for_arrays(self):
+        d = np.array([1, 2])
+        self.assertIsNot(Media.shared(d, 1), Media.shared(d, 1))
+
+
+class TestRepeat(unittest.TestCase):
+    def setUp(self):
+        self.cell = OpticalPath(FreeSpace(0.2), ThinLens(0.15))
+
+    def test_matches_unrolled_path(self):
+        repeated = Repeat(self.cell, 7)
+        unrolled = OpticalPath(*[self.cell] * 7)
+        np.testing.assert_allclose(repeated.matrix, unrolled.matrix)
+        self.assertAlmostEqual(repeated.length, 1.4)
+        self.assertEqual(len(repeated.childs), 7)
+        self.assertIs(repeated.childs[-1], self.cell)
+        self.assertEqual(Repeat(self.cell, 0).length, 0)
+        np.testing.assert_array_equal(Repeat(self.cell, 0).matrix, np.identity(2))
+
+    def test_million_passes(self):
+        repeated = Repeat(self.cell, 10**6)
+        self.assertAlmostEqual(repeated.length, 2e5)
+        self.assertAlmostEqual(np.linalg.det(repeated.matrix), 1)
+
+    def test_q_sequence(self):
+        q = 0.1 + 0.5j
+        sequence = list(Repeat(self.cell, 5).q_sequence(q))
+        self.assertEqual(len(sequence), 5)
+        for passes, q_pass in enumerate(sequence, 1):
+            self.assertAlmostEqual(q_pass, Repeat(self.cell, passes).act(q))
+
+    def test_follows_cell_changes(self):
+        gap = FreeSpace(0.2)
+        repeated = Repeat(OpticalPath(gap, ThinLens(0.15)), 3)
+        gap.matrix = FreeSpace(0.3).matrix
+        expected = OpticalPath(*[OpticalPath(FreeSpace(0.3), ThinLens(0.15))] * 3)
+        np.testing.assert_allclose(repeated.matrix, expected.matrix)
+
+    def test_parameters(self):
+        repeated = Repeat(ThinLens(0.5), 4).with_parameters(n=2)
+        self.assertEqual(repeated.n, 2)
+        np.testing.assert_allclose(repeated.matrix, ThinLens(0.25).matrix)
+        self.assertEqual(repeated.name, "Repeat(ThinLens(f=0.5), n=2)")
+        stacked = Repeat(ThinLens(np.array([0.5, 1.0])), 2).matrix
+        self.assertEqual(stacked.shape, (2, 2, 2))
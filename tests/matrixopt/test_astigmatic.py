@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+
+class TestAstigmaticElements(unittest.TestCase):
+    def test_cylindrical_lens(self):
+        lens = CylindricalLens(0.2, plane="sagittal")
+        self.assertTrue(lens.astigmatic)
+        np.testing.assert_array_equal(lens.matrix, np.identity(2))
+        np.testing.assert_array_equal(lens.sagittal_matrix, ThinLens(0.2).matrix)
+        self.assertEqual(lens.planes.shape, (2, 2, 2))
+        with self.assertRaises(ValueError):
+            CylindricalLens(0.2, plane="z")
+
+    def test_tilted_mirror(self):
+        mirror = TiltedMirror(0.1, np.radians(10))
+        self.assertAlmostEqual(mirror.matrix[1, 0], -2 / (0.1 * np.cos(np.radians(10))))
+        self.assertAlmostEqual(mirror.sagittal_matrix[1, 0], -2 * np.cos(np.radians(10)) / 0.1)
+        np.testing.assert_allclose(TiltedMirror(0.1, 0).planes, CurvedMirror(0.1).planes)
+
+    def test_composite_planes(self):
+        path = OpticalPath(FreeSpace(0.1), CylindricalLens(0.2), FreeSpace(0.3), CylindricalLens(0.1, "sagittal"))
+        self.assertTrue(path.astigmatic)
+        np.testing.assert_allclose(path.matrix, OpticalPath(FreeSpace(0.1), ThinLens(0.2), FreeSpace(0.3)).matrix)
+        np.testing.assert_allclose(path.sagittal_matrix, OpticalPath(FreeSpace(0.4), ThinLens(0.1)).matrix)
+        self.assertFalse(OpticalPath(FreeSpace(0.1), ThinLens(0.2)).astigmatic)
+
+    def test_sagittal_cache_follows_changes(self):
+        gap = FreeSpace(0.1)
+        path = OpticalPath(gap, CylindricalLens(0.2, "sagittal"))
+        before = path.sagittal_matrix
+        gap.matrix = FreeSpace(0.5).matrix
+        path.append(FreeSpace(0.2))
+        np.testing.assert_allclose(path.sagittal_matrix, OpticalPath(FreeSpace(0.5), ThinLens(0.2), FreeSpace(0.2)).matrix)
+        self.assertFalse(np.allclose(before, path.sagittal_matrix))
+
+    def test_repeat(self):
+        cell = OpticalPath(FreeSpace(0.2), TiltedMirror(0.5, 0.1))
+        repeated = Repeat(cell, 5)
+        self.assertTrue(repeated.astigmatic)
+        np.testing.assert_allclose(repeated.sagittal_matrix, np.linalg.matrix_power(cell.sagittal_matrix, 5))
+
+    def test_array_parameters(self):
+        lens = CylindricalLens(np.array([0.1, 0.2, 0.4]))
+        self.assertEqual(lens.planes.shape, (3, 2, 2, 2))
+        np.testing.assert_array_equal(lens.planes[:, 1], np.broadcast_to(np.identity(2), (3, 2, 2)))
+
+
+class TestPropagateAstigmatic(unittest.TestCase):
+    def setUp(self):
+        self.path = OpticalPath(FreeSpace(0.1), CylindricalLens(0.2), FreeSpace(0.1), TiltedMirror(0.3, 0.2), FreeSpace(0.15))
+        self.tangential_path = OpticalPath(FreeSpace(0.1), ThinLens(0.2), FreeSpace(0.1), ABCDElement(TiltedMirror(0.3, 0.2).matrix), FreeSpace(0.15))
+        self.sagittal_path = OpticalPath(FreeSpace(0.2), ABCDElement(TiltedMirror(0.3, 0.2).sagittal_matrix), FreeSpace(0.15))
+
+    def test_matches_separate_paths(self):
+        x, y = GaussianBeam(633e-9, w0=1e-3), GaussianBeam(633e-9, w0=0.5e-3, waist_location=-0.05)
+        out = self.path.propagate_astigmatic(x, y)
+        expected_x = self.tangential_path.propagate(x)
+        expected_y = self.sagittal_path.propagate(y)
+        self.assertAlmostEqual(out.tangential.waist_radius, expected_x.waist_radius)
+        self.assertAlmostEqual(out.tangential.waist_location, expected_x.waist_location)
+        self.assertAlmostEqual(out.sagittal.waist_radius, expected_y.waist_radius)
+        self.assertAlmostEqual(out.sagittal.waist_location, expected_y.waist_location)
+
+    def test_round_beam_default(self):
+        beam = GaussianBeam(633e-9, w0=1e-3)
+        out = OpticalPath(FreeSpace(0.1), ThinLens(0.2), FreeSpace(0.1)).propagate_astigmatic(beam)
+        self.assertAlmostEqual(out.tangential.waist_radius, out.sagittal.waist_radius)
+
+    def test_batch(self):
+        beams = GaussianBeamArray(np.array([405e-9, 633e-9, 1064e-9]), w0=1e-3)
+        out = self.path.propagate_astigmatic(beams)
+        self.assertEqual(out.sagittal.shape, (3,))
+        for i, beam in enumerate(beams):
+            single = self.path.propagate_astigmatic(beam)
+            self.assertAlmostEqual(out.tangential.waist_radius[i], single.tangential.waist_radius)
+            self.assertAlmostEqual(out.sagittal.waist_location[i], single.sagittal.waist_location)
+
+
+    def test_swept_path(self):
+        # Two sweep values and two beams, so mixing up the axes cannot go unnoticed
+        d = np.array([0.1, 0.25])
+        beams = GaussianBeamArray(np.array([405e-9, 1064e-9]), w0=np.array([1e-3, 0.5e-3]))
+        path = OpticalPath(FreeSpace(d), CylindricalLens(0.2), FreeSpace(0.1))
+        out = path.propagate_astigmatic(beams)
+        self.assertEqual(out.tangential.shape, (2, 2))
+        self.assertEqual(path.propagate_astigmatic(beams[0]).sagittal.shape, (2,))
+        for i, gap in enumerate(d):
+            single = OpticalPath(FreeSpace(gap), CylindricalLens(0.2), FreeSpace(0.1))
+            for j, beam in enumerate(beams):
+                expected = single.propagate_astigmatic(beam)
+                self.assertAlmostEqual(out.tangential.waist_location[i, j], expected.tangential.waist_location)
+                self.assertAlmostEqual(out.tangential.waist_radius[i, j], expected.tangential.waist_radius)
+                self.assertAlmostEqual(out.sagittal.waist_location[i, j], expected.sagittal.waist_location)
+
+
+if __name__ == "__main__":
+    unittest.main()
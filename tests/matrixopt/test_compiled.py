@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+
+
+class TestCompiledPath(unittest.TestCase):
+    def setUp(self):
+        self.lens = ThinLens(0.05)
+        self.thick = PlanoConvexLens(13.1e-3, 11.7e-3, 1.5302)
+        self.op = OpticalPath(
+            FreeSpace(0.1), self.lens, Media(0.02, 1.5), FlatInterface(1.5, 1),
+            ABCDElement(np.array([[1, 0.01], [0, 1]])), self.thick, FreeSpace(0.3))
+
+    def test_matrix_matches_path(self):
+        compiled = self.op.compile()
+        self.assertEqual(len(compiled), 9)
+        np.testing.assert_allclose(compiled.matrix(), self.op.matrix)
+        self.assertAlmostEqual(compiled.length, self.op.length)
+
+    def test_propagate_matches_path(self):
+        beam = GaussianBeam(633e-9, w0=1e-3)
+        expected = self.op.propagate(beam)
+        actual = self.op.compile().propagate(beam)
+        self.assertAlmostEqual(actual.waist_location, expected.waist_location)
+        self.assertAlmostEqual(actual.waist_radius, expected.waist_radius)
+
+    def test_update_in_place(self):
+        compiled = self.op.compile()
+        compiled.update(self.lens, f=0.2)
+        compiled.update(self.thick, d=5e-3)
+        expected = OpticalPath(
+            FreeSpace(0.1), ThinLens(0.2), Media(0.02, 1.5), FlatInterface(1.5, 1),
+            ABCDElement(np.array([[1, 0.01], [0, 1]])), PlanoConvexLens(13.1e-3, 5e-3, 1.5302), FreeSpace(0.3))
+        np.testing.assert_allclose(compiled.matrix(), expected.matrix)
+        self.assertAlmostEqual(compiled.length, expected.length)
+
+    def test_writing_records(self):
+        compiled = OpticalPath(FreeSpace(0.1), ThinLens(0.1), FreeSpace(0.1)).compile()
+        compiled.records[2, 1] = 0.3
+        expected = OpticalPath(FreeSpace(0.1), ThinLens(0.1), FreeSpace(0.3))
+        self.assertAlmostEqual(compiled.length, 0.4)
+        beam = GaussianBeam(633e-9, w0=1e-3)
+        self.assertAlmostEqual(compiled.propagate(beam).waist_location, expected.propagate(beam).waist_location)
+
+    def test_update_unknown_parameter(self):
+        gap = FreeSpace(0.1)
+        compiled = OpticalPath(gap, self.lens).compile()
+        with self.assertRaises(ValueError):
+            compiled.update(gap, n=1.5)
+        with self.assertRaises(ValueError):
+            compiled.update(self.lens, d=1)
+
+    def test_update_repeated_element(self):
+        gap = FreeSpace(0.1)
+        compiled = OpticalPath(gap, self.lens, gap, self.op, self.op).compile()
+        compiled.update(gap, d=0.2)
+        compiled.update(self.lens, f=0.3)
+        lens = ThinLens(0.3)
+        op = OpticalPath(
+            FreeSpace(0.1), lens, Media(0.02, 1.5), FlatInterface(1.5, 1),
+            ABCDElement(np.array([[1, 0.01], [0, 1]])), self.thick, FreeSpace(0.3))
+        expected = OpticalPath(FreeSpace(0.2), lens, FreeSpace(0.2), op, op)
+        self.assertEqual(len(compiled.records_of(self.lens)), 3)
+        np.testing.assert_allclose(compiled.matrix(), expected.matrix)
+        self.assertAlmostEqual(compiled.length, expected.length)
+
+    def test_updated_output_medium(self):
+        medium = Media(0.1, 1.5)
+        compiled = OpticalPath(ThinLens(0.1), medium).compile()
+        beam = GaussianBeam(633e-9, w0=1e-3)
+        compiled.update(medium, n=1.7)
+        expected = OpticalPath(ThinLens(0.1), Media(0.1, 1.7)).propagate(beam)
+        self.assertEqual(compiled.propagate(beam).refractive_index, expected.refractive_index)
+        compiled.records[1, 2] = 1.2
+        self.assertEqual(compiled.propagate(beam).refractive_index, 1.2)
+
+    def test_long_path_matches(self):
+        path = OpticalPath(*[self.op] * 10)
+        compiled = path.compile()
+        self.assertGreater(len(compiled), 32)
+        np.testing.assert_allclose(compiled.matrix(), path.matrix)
+
+    def test_update_unknown_element(self):
+        with self.assertRaises(KeyError):
+            self.op.compile().update(ThinLens(1), f=2)
+
+    def test_empty_path(self):
+        np.testing.assert_array_equal(OpticalPath().compile().matrix(), np.identity(2))
+
+    def test_repeat_is_one_record(self):
+        relay = Repeat(OpticalPath(FreeSpace(0.2), ThinLens(0.1)), 1000)
+        path = OpticalPath(FreeSpace(0.05), relay)
+        compiled = path.compile()
+        self.assertEqual(len(compiled), 2)
+        self.assertEqual(compiled.records_of(relay), [slice(1, 2)])
+        np.testing.assert_allclose(compiled.matrix(), path.matrix)
+        self.assertAlmostEqual(compiled.length, path.length)
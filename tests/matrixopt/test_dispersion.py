@@ -0,0 +1,70 @@
+import pickle
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+
+
+class TestMaterial(unittest.TestCase):
+    def test_catalog_values(self):
+        self.assertAlmostEqual(BK7, 1.5168, places=4)
+        np.testing.assert_allclose(BK7.refractive_index([486.13e-9, 656.27e-9]), [1.52238, 1.51432], atol=1e-5)
+        self.assertAlmostEqual(FUSED_SILICA.refractive_index(1064e-9), 1.4496, places=4)
+
+    def test_cauchy(self):
+        glass = Cauchy(1.5, 0.004, reference_wavelength=500e-9)
+        self.assertAlmostEqual(glass, 1.516)
+        self.assertAlmostEqual(glass.refractive_index(1e-6), 1.504)
+
+    def test_cached_per_grid(self):
+        glass = Sellmeier(BK7.coefficients[0], BK7.coefficients[1])
+        grid = np.linspace(400e-9, 800e-9, 11)
+        index = glass.refractive_index(grid)
+        self.assertIs(glass.refractive_index(grid.copy()), index)
+        self.assertFalse(index.flags.writeable)
+        self.assertIsNot(glass.refractive_index(grid[:5]), index)
+
+    def test_behaves_as_float(self):
+        np.testing.assert_array_equal(ThickLens(0.1, BK7, 0.2, 0.01).matrix, ThickLens(0.1, float(BK7), 0.2, 0.01).matrix)
+        restored = pickle.loads(pickle.dumps(BK7))
+        self.assertEqual(restored, BK7)
+        self.assertEqual(restored.coefficients, BK7.coefficients)
+
+    def test_material_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Material(1.5)
+
+
+class TestPropagateSpectrum(unittest.TestCase):
+    BEAM = GaussianBeam(587.56e-9, w0=1e-3)
+
+    def setUp(self):
+        self.path = OpticalPath(
+            FreeSpace(0.1), ThickLens(0.1, BK7, 0.15, 0.005), FreeSpace(0.05),
+            OpticalPath(PlanoConvexLens(0.2, 0.004, FUSED_SILICA), FreeSpace(0.02)), ThinLens(0.5), FreeSpace(0.1))
+
+    def test_matches_rebuilt_paths(self):
+        wavelength = np.linspace(450e-9, 1100e-9, 7)
+        spectrum = self.path.propagate_spectrum(self.BEAM, wavelength)
+        for i, l in enumerate(wavelength):
+            path = OpticalPath(
+                FreeSpace(0.1), ThickLens(0.1, float(BK7.refractive_index(l)), 0.15, 0.005), FreeSpace(0.05),
+                OpticalPath(PlanoConvexLens(0.2, 0.004, float(FUSED_SILICA.refractive_index(l))), FreeSpace(0.02)), ThinLens(0.5), FreeSpace(0.1))
+            beam = path.propagate(GaussianBeam(l, w0=1e-3))
+            self.assertAlmostEqual(spectrum.waist_radius[i] / beam.waist_radius, 1)
+            self.assertAlmostEqual(spectrum.waist_location[i], beam.waist_location)
+
+    def test_focal_shift(self):
+        spectrum = self.path.propagate_spectrum(self.BEAM, [486.13e-9, 587.56e-9, 656.27e-9])
+        self.assertAlmostEqual(spectrum.focal_shift[1], 0)
+        # Normal dispersion focuses blue light closer to the lens
+        self.assertLess(spectrum.focal_shift[0], 0)
+        self.assertGreater(spectrum.focal_shift[2], 0)
+
+    def test_grid_shape(self):
+        spectrum = self.path.propagate_spectrum(self.BEAM, np.full((2, 3), 600e-9))
+        self.assertEqual(spectrum.waist_radius.shape, (2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
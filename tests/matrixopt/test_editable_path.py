@@ -0,0 +1,99 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+
+
+class TestEditableOpticalPath(unittest.TestCase):
+    def setUp(self):
+        self.elements = [FreeSpace(0.1 * (i + 1)) if i % 2 else ThinLens(i + 1) for i in range(50)]
+        self.op = EditableOpticalPath(*self.elements)
+
+    def assertMatchesPlainPath(self, op: EditableOpticalPath):
+        expected = OpticalPath(*op.childs)
+        np.testing.assert_allclose(op.matrix, expected.matrix)
+        self.assertAlmostEqual(op.length, expected.length)
+
+    def test_init(self):
+        self.assertMatchesPlainPath(self.op)
+        self.assertEqual(len(self.op), 50)
+
+    def test_insert_replace_remove(self):
+        self.op.insert(10, ThickLens(0.8, 1.2, 0.4, 0.01))
+        self.op.insert(-1, FreeSpace(3))
+        self.op.append(ThinLens(-4))
+        self.assertMatchesPlainPath(self.op)
+
+        old = self.op.replace(3, FreeSpace(7))
+        self.assertIs(old, self.elements[3])
+        self.assertMatchesPlainPath(self.op)
+
+        removed = self.op.remove(0)
+        self.assertIs(removed, self.elements[0])
+        self.assertEqual(len(self.op), 52)
+        self.assertMatchesPlainPath(self.op)
+
+        with self.assertRaises(IndexError):
+            self.op.remove(52)
+
+    def test_range_queries(self):
+        expected = OpticalPath(*self.elements[5:20])
+        np.testing.assert_allclose(self.op.range_matrix(5, 20), expected.matrix)
+        self.assertAlmostEqual(self.op.range_length(5, 20), expected.length)
+        np.testing.assert_array_equal(self.op.range_matrix(7, 7), np.identity(2))
+
+    def test_child_mutation(self):
+        self.elements[4].matrix = ThinLens(100).matrix
+        self.assertMatchesPlainPath(self.op)
+
+    def test_propagate(self):
+        beam = GaussianBeam(1e-6, w0=1e-3)
+        self.op.remove(5)
+        expected = OpticalPath(*self.op.childs).propagate(beam)
+        actual = self.op.propagate(beam)
+        self.assertAlmostEqual(actual.waist_location, expected.waist_location)
+        self.assertAlmostEqual(actual.waist_radius, expected.waist_radius)
+
+    def test_remove_all(self):
+        for _ in range(50):
+            self.op.remove(-1)
+        np.testing.assert_array_equal(self.op.matrix, np.identity(2))
+        self.assertEqual(self.op.length, 0)
+
+    def test_edits_ignore_unrelated_mutations(self):
+        other = EditableOpticalPath(FreeSpace(1), ThinLens(2))
+        calls = []
+        build = self.op._build_matrix
+        self.op._build_matrix = lambda: calls.append(1) or build()
+
+        for i in range(10):
+            FreeSpace(1).matrix = ThinLens(5).matrix
+            other.replace(0, FreeSpace(i + 1))
+            self.op.replace(3, FreeSpace(i + 1))
+            self.op.range_matrix(0, 10)
+
+        self.assertEqual(calls, [])
+        self.assertMatchesPlainPath(self.op)
+
+    def test_mutation_before_edit(self):
+        self.elements[4].matrix = ThinLens(100).matrix
+        self.op.insert(0, FreeSpace(2))
+        self.assertMatchesPlainPath(self.op)
+
+    def test_removed_element_is_detached(self):
+        removed = self.op.remove(4)
+        self.op.propagate(GaussianBeam(1e-6, w0=1e-3))
+        removed.matrix = ThinLens(100).matrix
+        self.assertFalse(self.op._dirty)
+        self.assertMatchesPlainPath(self.op)
+
+    def test_pickle_and_deepcopy(self):
+        import copy
+        import pickle
+        for restored in (pickle.loads(pickle.dumps(self.op)), copy.deepcopy(self.op)):
+            restored.remove(0)
+            restored.childs[3].matrix = ThinLens(100).matrix
+            self.assertMatchesPlainPath(restored)
+            self.assertEqual(len(restored), 49)
+        self.assertEqual(len(self.op), 50)
+        self.assertMatchesPlainPath(self.op)
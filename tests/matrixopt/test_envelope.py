@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+
+class TestBeamEnvelope(unittest.TestCase):
+    def setUp(self):
+        self.op = OpticalPath(FreeSpace(0.1), ThinLens(0.05), ThickLens(0.8, 1.5, 0.4, 0.01), FreeSpace(0.2))
+        self.beam = GaussianBeam(633e-9, w0=1e-3)
+
+    def test_matches_prefix_propagation(self):
+        envelope = beam_envelope(self.op, self.beam, samples=10)
+        leaves = [FreeSpace(0.1), ThinLens(0.05), *self.op.childs[2].childs, FreeSpace(0.2)]
+
+        expected_z, expected_w = [], []
+        z = 0
+        for i, leaf in enumerate(leaves):
+            if leaf.length > 0:
+                out = OpticalPath(*leaves[:i + 1]).propagate(self.beam)
+                zs = np.linspace(z, z + leaf.length, 10)
+                expected_z.extend(zs)
+                expected_w.extend(out.beam_radius(zs))
+            z += leaf.length
+
+        np.testing.assert_allclose(envelope.z, expected_z)
+        np.testing.assert_allclose(envelope.w, expected_w)
+        np.testing.assert_allclose(envelope.boundaries, [0.1, 0.1, 0.11, 0.31])
+
+    def test_curviture(self):
+        envelope = beam_envelope(OpticalPath(FreeSpace(2)), GaussianBeam(1, waist_location=-1, zr=1), samples=3)
+        np.testing.assert_allclose(envelope.R, GaussianBeam(1, waist_location=-1, zr=1).curviture(np.array([0, 1, 2])))
+
+
+class TestDrawer(unittest.TestCase):
+    def test_draw(self):
+        import matplotlib
+        matplotlib.use("Agg")
+        from optix.matrixopt.plotting import Drawer
+        op = OpticalPath(FreeSpace(0.1), ThinLens(0.05), FreeSpace(0.2))
+        fig = Drawer(op, GaussianBeam(633e-9, w0=1e-3), samples=5).draw()
+        lines = fig.axes[0].get_lines()
+        self.assertEqual([line.get_label() for line in lines], [op.childs[0].name, op.childs[2].name])
+        self.assertEqual([len(line.get_xdata()) for line in lines], [5, 5])
+        self.assertAlmostEqual(lines[1].get_xdata()[0], 100)
+
+    def test_draw_without_childs(self):
+        import matplotlib
+        matplotlib.use("Agg")
+        from optix.matrixopt.plotting import Drawer
+        beam = GaussianBeam(633e-9, w0=1e-3)
+        fig = Drawer(OpticalPath(FreeSpace(0.1), ThinLens(0.05)), beam, draw_childs=False).draw()
+        self.assertEqual(len(fig.axes[0].get_lines()), 1)
+        with self.assertRaises(AssertionError):
+            Drawer(OpticalPath(OpticalPath(FreeSpace(0.1))), beam, draw_childs=False).draw()
+
+
+class TestBeamCaustics(unittest.TestCase):
+    def test_focusing_lens(self):
+        beam = GaussianBeam(633e-9, waist_location=-0.05, w0=1e-3)
+        op = OpticalPath(FreeSpace(0.1), ThinLens(0.2), FreeSpace(0.5))
+        caustics = op.caustics(beam)
+        expected = op.propagate(beam)
+
+        self.assertTrue(np.isnan(caustics.waist_location[0]))
+        self.assertAlmostEqual(caustics.waist_location[1], expected.waist_location)
+        self.assertAlmostEqual(caustics.waist_radius[1], expected.waist_radius)
+        self.assertAlmostEqual(caustics.w_min[1], expected.waist_radius)
+        self.assertAlmostEqual(caustics.w_max[1], max(expected.beam_radius(0.1), expected.beam_radius(0.6)))
+
+    def test_matches_dense_sampling_for_batches(self):
+        beams = GaussianBeamArray(np.array([405e-9, 1064e-9]), w0=np.array([0.5e-3, 2e-3]))
+        op = OpticalPath(ThinLens(0.1), FreeSpace(0.3), ThickLens(0.05, 1.5, 0.05, 0.01), FreeSpace(0.3))
+        caustics = beam_caustics(op, beams)
+        self.assertEqual(caustics.w_min.shape, (3, 2))
+        for i, beam in enumerate(beams):
+            envelope = beam_envelope(op, beam, samples=20001)
+            w = envelope.w.reshape(3, -1)
+            # Dense sampling can only overestimate a narrow waist
+            self.assertTrue(np.all(caustics.w_min[:, i] <= w.min(axis=1) * (1 + 1e-12)))
+            np.testing.assert_allclose(caustics.w_min[:, i], w.min(axis=1), rtol=1e-3)
+            np.testing.assert_allclose(caustics.w_max[:, i], w.max(axis=1), rtol=1e-9)
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam, GaussianBeamArray
+
+
+class TestBeamGradients(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, w0=0.5e-3)
+
+    def setUp(self):
+        self.elements = [
+            FreeSpace(0.1), ThinLens(0.2), ThickLens(0.1, 1.5, 0.2, 0.01),
+            PlanoConvexLens(0.05, 0.005, 1.5, inversed=True), CurvedInterface(1, 1.4, 0.3),
+            Media(0.05, 1.4), FlatInterface(1.4, 1), CurvedMirror(1.5), FreeSpace(0.3)]
+
+    def test_matches_finite_differences(self):
+        gradients = beam_gradients(OpticalPath(*self.elements), self.BEAM)
+        self.assertEqual(len(gradients.parameters), 17)
+        for k, (index, name) in enumerate(gradients.parameters):
+            value = self.elements[index].parameters[name]
+            step = 1e-6 * abs(value)
+            shifted = list(self.elements)
+            shifted[index] = shifted[index].with_parameters(**{name: value + step})
+            expected = OpticalPath(*shifted).propagate(self.BEAM)
+            np.testing.assert_allclose(gradients.dwaist_location[k], (expected.waist_location - gradients.waist_location) / step, rtol=1e-4, atol=1e-8)
+            np.testing.assert_allclose(gradients.dwaist_radius[k], (expected.waist_radius - gradients.waist_radius) / step, rtol=1e-4, atol=1e-12)
+
+    def test_beam_batch(self):
+        beams = GaussianBeamArray(np.array([405e-9, 1064e-9]), w0=np.array([1e-3, 0.2e-3]))
+        path = OpticalPath(*self.elements)
+        batched = beam_gradients(path, beams)
+        self.assertEqual(batched.dq.shape, (17, 2))
+        for i, beam in enumerate(beams):
+            single = beam_gradients(path, beam)
+            np.testing.assert_allclose(batched.dq[:, i], single.dq)
+            np.testing.assert_allclose(batched.dwaist_radius[:, i], single.dwaist_radius)
+
+
+class TestModeMatch(unittest.TestCase):
+    def test_hits_target(self):
+        beam = GaussianBeam(633e-9, w0=0.5e-3)
+        gap, lens, tail = FreeSpace(0.1), ThinLens(0.2), FreeSpace(0.1)
+        path = OpticalPath(gap, lens, tail)
+
+        result = mode_match(path, beam, target_waist=50e-6, target_location=0.4, parameters=[(gap, "d"), (lens, "f")])
+
+        self.assertTrue(result.converged)
+        out = result.path.propagate(beam)
+        self.assertAlmostEqual(out.waist_radius / 50e-6, 1, places=5)
+        self.assertAlmostEqual(out.waist_location, 0.4, places=6)
+        self.assertGreaterEqual(result.values[(0, "d")], 0)
+        self.assertIs(path.childs[0], gap)
+
+    def test_rejects_foreign_element(self):
+        with self.assertRaises(ValueError):
+            mode_match(OpticalPath(FreeSpace(1)), GaussianBeam(1e-6, w0=1e-3), 1e-4, 1, [(ThinLens(1), "f")])
@@ -1,7 +1,7 @@
 import unittest
 from optix.matrixopt import *
 import numpy as np
-from optix.beams import GaussianBeam
+from optix.beams import GaussianBeam, GaussianBeamArray
 
 class TestOpticalPath(unittest.TestCase):
     def test_propagate(self):
@@ -114,4 +114,139 @@ class TestOpticalPath(unittest.TestCase):
 
         actual = op.propagate(gauss_in).waist_radius
         self.assertAlmostEquals(actual, expected,4)
-        
\ No newline at end of file
+        
+
+class TestOpticalPathBatch(unittest.TestCase):
+    def setUp(self):
+        self.op = OpticalPath(FreeSpace(0.1), ThinLens(0.05), ThickLens(0.8, 1.2, 0.4, 0.01), Media(0.2, 1.5))
+        self.beams = GaussianBeamArray(np.linspace(400e-9, 1000e-9, 7), w0=np.linspace(0.5e-3, 2e-3, 7))
+
+    def test_propagate_batch_matches_propagate(self):
+        actual = self.op.propagate_batch(self.beams)
+        for i, beam in enumerate(self.beams):
+            expected = self.op.propagate(beam)
+            self.assertAlmostEqual(actual.waist_radius[i], expected.waist_radius)
+            self.assertAlmostEqual(actual.waist_location[i], expected.waist_location)
+            self.assertEqual(actual.refractive_index[i], 1.5)
+
+    def test_propagate_batch_q_out_buffer(self):
+        q_in = self.beams.cbeam_parameter(0)
+        out = np.empty_like(q_in)
+        actual = self.op.propagate_batch(q_in, out=out)
+        self.assertIs(actual, out)
+        np.testing.assert_allclose(actual, self.op.propagate_batch(self.beams).cbeam_parameter(self.op.length))
+
+
+class TestOpticalPathSweep(unittest.TestCase):
+    def test_sweep_matches_rebuilt_paths(self):
+        lens = ThinLens(0.1)
+        gap = FreeSpace(0.2)
+        op = OpticalPath(FreeSpace(0.05), lens, gap)
+        f = np.linspace(0.05, 0.2, 4)
+        d = np.linspace(0.1, 0.3, 3)
+
+        actual = op.sweep({lens: {"f": f[:, None]}, gap: {"d": d[None, :]}})
+
+        self.assertEqual(actual.shape, (4, 3, 2, 2))
+        for i, fi in enumerate(f):
+            for j, dj in enumerate(d):
+                expected = OpticalPath(FreeSpace(0.05), ThinLens(fi), FreeSpace(dj))._build_matrix()
+                np.testing.assert_allclose(actual[i, j], expected)
+
+
+class TestOpticalPathCache(unittest.TestCase):
+    def test_propagate_does_not_rebuild_unchanged_path(self):
+        op = OpticalPath(FreeSpace(1), ThinLens(2), FreeSpace(3))
+        calls = []
+        build = op._build_matrix
+        op._build_matrix = lambda: calls.append(1) or build()
+        beam = GaussianBeam(1, zr=1)
+
+        op.propagate(beam)
+        op.propagate(beam)
+        op.append(FreeSpace(4))
+        op.propagate(beam)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(op.length, 8)
+
+    def test_append_matches_full_rebuild(self):
+        op = OpticalPath()
+        for i in range(1, 20):
+            op.append(ThinLens(i) if i % 2 else ThickLens(0.8, 1.2, 0.4, 0.01 * i))
+        np.testing.assert_allclose(op.matrix, op._build_matrix())
+
+    def test_child_mutation_invalidates_cache(self):
+        lens = ThinLens(2)
+        inner = OpticalPath(FreeSpace(1), lens)
+        op = OpticalPath(inner, FreeSpace(3))
+        op.propagate(GaussianBeam(1, zr=1))
+
+        lens.matrix = ThinLens(5).matrix
+
+        expected = OpticalPath(FreeSpace(1), ThinLens(5), FreeSpace(3))._build_matrix()
+        np.testing.assert_allclose(op.matrix, expected)
+
+    def test_append_to_nested_path_invalidates_parent(self):
+        inner = OpticalPath(FreeSpace(1))
+        op = OpticalPath(inner, ThinLens(2))
+        self.assertEqual(op.length, 1)
+
+        inner.append(FreeSpace(2))
+
+        self.assertEqual(op.length, 3)
+        np.testing.assert_allclose(op.matrix, OpticalPath(FreeSpace(3), ThinLens(2))._build_matrix())
+
+    def test_childs_are_read_only(self):
+        op = OpticalPath(FreeSpace(0.1))
+        with self.assertRaises(AttributeError):
+            op.childs.append(FreeSpace(1.0))
+        with self.assertRaises(TypeError):
+            op.childs[0] = FreeSpace(1.0)
+        self.assertEqual(list(op.childs[:]), [op.childs[0]])
+        self.assertAlmostEqual(op.length, 0.1)
+
+    def test_unrelated_mutation_keeps_cache(self):
+        op = OpticalPath(FreeSpace(1), ThinLens(2))
+        op.propagate(GaussianBeam(1, zr=1))
+        calls = []
+        build = op._build_matrix
+        op._build_matrix = lambda: calls.append(1) or build()
+
+        FreeSpace(1).matrix = ThinLens(5).matrix
+        op.propagate(GaussianBeam(1, zr=1))
+
+        self.assertEqual(calls, [])
+
+    def test_pickled_path_tracks_its_childs(self):
+        import pickle
+        op = pickle.loads(pickle.dumps(OpticalPath(FreeSpace(1), OpticalPath(ThinLens(2)))))
+
+        op.childs[1].childs[0].matrix = ThinLens(5).matrix
+
+        np.testing.assert_allclose(op.matrix, OpticalPath(FreeSpace(1), ThinLens(5))._build_matrix())
+
+    def test_pickle_and_deepcopy_keep_attributes(self):
+        import copy
+        import pickle
+        op = OpticalPath(FreeSpace(1), PlanoConvexLens(0.1, 0.01, 1.5, inversed=True), name="relay")
+        op.label = "bench"
+        for restored in (pickle.loads(pickle.dumps(op)), copy.deepcopy(op)):
+            self.assertEqual(restored.label, "bench")
+            self.assertEqual(restored.name, "relay")
+            self.assertTrue(restored.childs[1].is_inversed)
+            np.testing.assert_allclose(restored.matrix, op.matrix)
+
+
+class TestOpticalPathCoupling(unittest.TestCase):
+    def test_focus_into_fiber(self):
+        path = OpticalPath(FreeSpace(0.1), ThinLens(0.05), FreeSpace(0.06))
+        beam = GaussianBeam(1064e-9, w0=1e-3)
+        output = path.propagate(beam)
+        self.assertAlmostEqual(path.coupling_efficiency(beam, output), 1)
+        fiber = GaussianBeam(1064e-9, w0=2 * output.waist_radius, waist_location=output.waist_location)
+        batch = GaussianBeamArray(1064e-9, w0=np.array([1e-3, 0.5e-3]))
+        efficiency = path.coupling_efficiency(batch, fiber, offset=(5e-6, 0))
+        self.assertEqual(efficiency.shape, (2,))
+        self.assertAlmostEqual(efficiency[0], path.coupling_efficiency(beam, fiber, offset=(5e-6, 0)))
+        self.assertLess(efficiency[0], 0.64)
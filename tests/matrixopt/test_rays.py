@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+
+
+class TestTraceRays(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rays = np.column_stack([rng.normal(0, 1e-3, 10_000), rng.normal(0, 1e-4, 10_000)])
+        self.path = OpticalPath(FreeSpace(0.1), ThinLens(0.2), Media(0.01, 1.5), FlatInterface(1.5, 1), FreeSpace(0.25))
+
+    def test_matches_matrix(self):
+        rays = self.rays.copy()
+        trace = self.path.trace_rays(rays, chunk_size=999)
+        np.testing.assert_allclose(rays, self.rays @ self.path.matrix.T)
+        self.assertTrue(trace.alive.all())
+        np.testing.assert_array_equal(trace.fraction, 1)
+        np.testing.assert_allclose(trace.z, np.cumsum([e.length for e in self.path.childs]))
+        np.testing.assert_allclose(trace.rms_radius[-1], rays[:, 0].std())
+        np.testing.assert_allclose(trace.mean_angle[-1], rays[:, 1].mean())
+        self.assertAlmostEqual(trace.max_radius[-1], np.abs(rays[:, 0]).max())
+
+    def test_general_matrix_and_composites(self):
+        path = OpticalPath(ABCDElement(np.array([[0.5, 0.1], [-2, 2.4]])), ThickLens(0.1, 1.5, 0.2, 0.01))
+        rays = self.rays.copy()
+        path.trace_rays(rays)
+        np.testing.assert_allclose(rays, self.rays @ path.matrix.T)
+
+    def test_aperture(self):
+        lens = ThinLens(0.2)
+        lens.aperture = 1e-3
+        path = OpticalPath(FreeSpace(0.1), lens, FreeSpace(0.25))
+        rays = self.rays.copy()
+        trace = path.trace_rays(rays, chunk_size=3000)
+        at_lens = self.rays @ FreeSpace(0.1).matrix.T
+        passed = np.abs(at_lens[:, 0]) <= 1e-3
+        np.testing.assert_array_equal(trace.alive, passed)
+        self.assertEqual(list(trace.transmitted), [10_000, passed.sum(), passed.sum()])
+        self.assertTrue(np.isnan(rays[~passed]).all())
+        np.testing.assert_allclose(rays[passed], (self.rays @ path.matrix.T)[passed])
+        self.assertLessEqual(trace.max_radius[1], 1e-3)
+        self.assertAlmostEqual(trace.centroid[2], rays[passed, 0].mean())
+        self.assertAlmostEqual(trace.rms_angle[2], rays[passed, 1].std())
+
+    def test_aperture_on_free_space_checks_both_ends(self):
+        tube = FreeSpace(1)
+        tube.aperture = 1e-3
+        rays = np.array([[0.0, 2e-3], [0.0, 0.5e-3], [2e-3, -2e-3]])
+        trace = OpticalPath(tube).trace_rays(rays)
+        np.testing.assert_array_equal(trace.alive, [False, True, False])
+
+    def test_shared_elements_keep_no_aperture(self):
+        with self.assertRaises(AttributeError):
+            Media.shared(0.01, 1.5).aperture = 1
+
+    def test_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            self.path.trace_rays(np.zeros(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+
+
+class TestCurvedMirror(unittest.TestCase):
+    def test_matrix(self):
+        np.testing.assert_array_equal(CurvedMirror(0.5).matrix, [[1, 0], [-4, 1]])
+        np.testing.assert_array_equal(CurvedMirror(float("inf")).matrix, np.identity(2))
+
+
+class TestResonator(unittest.TestCase):
+    WAVELENGTH = 1064e-9
+
+    def test_symmetric_linear_cavity(self):
+        L, R = 0.1, 0.2
+        cavity = Resonator(CurvedMirror(R), FreeSpace(L), CurvedMirror(R), linear=True)
+        self.assertEqual(len(cavity), 4)
+        mode = cavity.mode(self.WAVELENGTH)
+        g = 1 - L / R
+        self.assertTrue(mode.stable)
+        self.assertAlmostEqual(mode.stability, 2 * g**2 - 1)
+        self.assertAlmostEqual(abs(mode.gouy_phase), 2 * np.arccos(g))
+        self.assertAlmostEqual(mode.waist_location, L / 2)
+        expected_waist = np.sqrt(self.WAVELENGTH * L / (2 * np.pi) * np.sqrt((1 + g) / (1 - g)))
+        self.assertAlmostEqual(mode.waist_radius / expected_waist, 1)
+
+    def test_mode_is_self_consistent(self):
+        cavity = Resonator(FreeSpace(0.3), CurvedMirror(0.5), FreeSpace(0.2), ThinLens(0.4), FreeSpace(0.1), CurvedMirror(1.0))
+        mode = cavity.mode(self.WAVELENGTH)
+        self.assertTrue(mode.stable)
+        self.assertAlmostEqual(cavity.act(mode.q), mode.q)
+        beam = GaussianBeam(self.WAVELENGTH, w0=mode.waist_radius, waist_location=mode.waist_location)
+        self.assertAlmostEqual(beam.beam_radius(0) / mode.beam_radius, 1)
+
+    def test_stability_map(self):
+        first, gap, second = CurvedMirror(0.2), FreeSpace(0.1), CurvedMirror(0.3)
+        cavity = Resonator(first, gap, second, linear=True)
+        d = np.linspace(0.01, 0.6, 50)
+        R = np.linspace(0.05, 0.8, 40)
+        mode = cavity.stability_map(self.WAVELENGTH, {gap: {"d": d[:, None]}, second: {"R": R[None, :]}})
+        self.assertEqual(mode.q.shape, (50, 40))
+        g1g2 = (1 - d[:, None] / 0.2) * (1 - d[:, None] / R[None, :])
+        np.testing.assert_array_equal(mode.stable, (g1g2 > 0) & (g1g2 < 1))
+        self.assertTrue(np.isnan(mode.waist_radius[~mode.stable]).all())
+        self.assertTrue((mode.waist_radius[mode.stable] > 0).all())
+        single = Resonator(first, FreeSpace(d[10]), CurvedMirror(R[5]), linear=True).mode(self.WAVELENGTH)
+        self.assertAlmostEqual(mode.waist_radius[10, 5], single.waist_radius)
+        self.assertAlmostEqual(mode.gouy_phase[10, 5], single.gouy_phase)
+
+    def test_unstable_is_masked(self):
+        mode = resonator_mode(Resonator(CurvedMirror(0.1), FreeSpace(0.5), CurvedMirror(0.1), linear=True), self.WAVELENGTH)
+        self.assertFalse(mode.stable)
+        self.assertTrue(np.isnan(mode.q))
+        self.assertTrue(np.isnan(mode.gouy_phase))
+
+
+if __name__ == "__main__":
+    unittest.main()
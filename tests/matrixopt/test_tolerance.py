@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+
+
+def _uniform_offsets(rng, size):
+    return rng.uniform(-1e-3, 1e-3, size)
+
+
+class TestStreamingStatistics(unittest.TestCase):
+    def test_merge_matches_batch(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(3, 2, 10_000)
+        stats = StreamingStatistics(["x"], reservoir=10_000, spec={"x": (1, 5)})
+        for chunk in np.array_split(values, 7):
+            stats.update({"x": chunk}, rng)
+        result = stats.result([0.5])
+        self.assertEqual(result.n_samples, 10_000)
+        self.assertAlmostEqual(result.mean["x"], values.mean())
+        self.assertAlmostEqual(result.std["x"], values.std(ddof=1))
+        self.assertEqual(result.min["x"], values.min())
+        self.assertAlmostEqual(result.quantiles["x"][0.5], np.median(values))
+        self.assertAlmostEqual(result.yield_, ((values >= 1) & (values <= 5)).mean())
+
+    def test_reservoir_is_bounded(self):
+        rng = np.random.default_rng(1)
+        stats = StreamingStatistics(["x"], reservoir=100)
+        for _ in range(5):
+            stats.update({"x": rng.random(1000)}, rng)
+        self.assertEqual(len(stats._samples["x"]), 100)
+        self.assertAlmostEqual(stats.result([0.5]).quantiles["x"][0.5], 0.5, delta=0.15)
+
+
+class TestTolerance(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, w0=1e-3)
+
+    def setUp(self):
+        self.gap = FreeSpace(0.1)
+        self.lens = ThinLens(0.2)
+        self.path = OpticalPath(self.gap, self.lens, FreeSpace(0.3))
+
+    def test_no_perturbation(self):
+        nominal = self.path.propagate(self.BEAM)
+        result = self.path.tolerance(self.BEAM, {}, n_samples=10)
+        self.assertAlmostEqual(result.mean["waist_radius"], nominal.waist_radius)
+        self.assertAlmostEqual(result.mean["waist_location"], nominal.waist_location)
+        self.assertEqual(result.std["waist_radius"], 0)
+
+    def test_matches_explicit_sampling(self):
+        perturbations = {self.gap: {"d": 1e-3}, self.lens: {"f": 2e-3}}
+        result = self.path.tolerance(self.BEAM, perturbations, n_samples=2000, chunk_size=300, seed=3, quantiles=(0.5,))
+        # Samples drawn explicitly, one path per sample
+        rng = np.random.default_rng(4)
+        waists = [OpticalPath(FreeSpace(0.1 + rng.normal(0, 1e-3)), ThinLens(0.2 + rng.normal(0, 2e-3)), FreeSpace(0.3)).propagate(self.BEAM).waist_location for _ in range(2000)]
+        self.assertAlmostEqual(result.mean["waist_location"], np.mean(waists), delta=4 * np.std(waists) / np.sqrt(2000))
+        self.assertAlmostEqual(result.std["waist_location"] / np.std(waists), 1, delta=0.1)
+
+    def test_length_follows_distance(self):
+        result = self.path.tolerance(self.BEAM, {self.gap: {"d": _uniform_offsets}}, n_samples=1000, seed=0)
+        nominal = self.path.propagate(self.BEAM)
+        # A nearly collimated beam focuses at the lens focal point, so the waist moves with the lens
+        self.assertLess(result.max["waist_location"] - result.min["waist_location"], 2e-3)
+        self.assertAlmostEqual(result.mean["waist_location"], nominal.waist_location, delta=1e-4)
+
+    def test_yield_and_reproducibility(self):
+        perturbations = {self.lens: {"f": 1e-3}}
+        nominal = self.path.propagate(self.BEAM).waist_location
+        spec = {"waist_location": (nominal - 1e-3, nominal + 1e-3)}
+        single = self.path.tolerance(self.BEAM, perturbations, n_samples=5000, chunk_size=1000, spec=spec, seed=7)
+        pooled = self.path.tolerance(self.BEAM, perturbations, n_samples=5000, chunk_size=1000, spec=spec, seed=7, processes=2)
+        self.assertTrue(0 < single.yield_ < 1)
+        self.assertEqual(single.yield_, pooled.yield_)
+        self.assertAlmostEqual(single.mean["waist_location"], pooled.mean["waist_location"])
+        self.assertEqual(single.quantiles, pooled.quantiles)
+
+    def test_unknown_element(self):
+        with self.assertRaises(ValueError):
+            self.path.tolerance(self.BEAM, {ThinLens(0.1): {"f": 1e-3}}, n_samples=10)
+        with self.assertRaises(ValueError):
+            self.path.tolerance(self.BEAM, {self.lens: {"d": 1e-3}}, n_samples=10)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            self.path.tolerance(self.BEAM, {self.lens: {"f": 1e-3}}, n_samples=0)
+        with self.assertRaises(ValueError):
+            self.path.tolerance(self.BEAM, {self.lens: {"f": 1e-3}}, n_samples=10, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+from optix.optimize import *
+
+CSV = """part, R1, n, R2, d, diameter, material
+LA1001, inf, 1.5168, 0.0257, 0.0086, 0.0254, N-BK7
+LA1002, 0.0515, 1.5168, inf, 0.0051, 0.0254, N-BK7
+LB1003, 0.1, 1.4585, 0.1, 0.004, 0.0127, UVFS
+LB1004, 0.2, 1.5168, 0.3, 0.003, 0.0127, N-BK7
+LB1005, 0.05, 1.4585, 0.08, 0.006, 0.05, UVFS
+"""
+
+
+class TestLensCatalog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "parts.csv")
+        with open(path, "w") as f:
+            f.write(CSV)
+        self.catalog = LensCatalog.from_csv(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_precomputed_optics(self):
+        self.assertEqual(len(self.catalog), 5)
+        for i in range(len(self.catalog)):
+            element = self.catalog[i]
+            np.testing.assert_allclose(self.catalog.matrices[i], element.matrix)
+            (A, B), (C, D) = element.matrix
+            self.assertAlmostEqual(self.catalog.f[i], -1 / C)
+            self.assertAlmostEqual(self.catalog.front_principal_plane[i], (D - 1) / C)
+            self.assertAlmostEqual(self.catalog.back_principal_plane[i], (1 - A) / C)
+        self.assertIsInstance(self.catalog[0], PlanoConvexLens)
+        self.assertFalse(self.catalog[0].is_inversed)
+        self.assertTrue(self.catalog[1].is_inversed)
+        self.assertIsInstance(self.catalog[2], ThickLens)
+        self.assertEqual(self.catalog[3].name, "LB1004")
+
+    def test_symmetric_lens_principal_planes(self):
+        # A symmetric biconvex lens has its principal planes inside, at equal depth from both faces
+        self.assertAlmostEqual(self.catalog.front_principal_plane[2], -self.catalog.back_principal_plane[2])
+
+    def test_nearest(self):
+        f = self.catalog.f
+        self.assertEqual(list(self.catalog.nearest(0.1, k=2)), list(np.argsort(np.abs(f - 0.1))[:2]))
+        self.assertEqual(list(self.catalog.nearest(1e3)), [int(np.argmax(f))])
+        uvfs = self.catalog.nearest(0.05, k=5, material="UVFS")
+        self.assertEqual(sorted(uvfs), [2, 4])
+        self.assertEqual(len(self.catalog.nearest(0.05, k=3, material="none")), 0)
+
+    def test_within_and_select(self):
+        f = self.catalog.f
+        indices = self.catalog.within(0.04, 0.2)
+        self.assertEqual(sorted(indices), sorted(np.flatnonzero((f >= 0.04) & (f <= 0.2))))
+        self.assertTrue((np.diff(f[indices]) >= 0).all())
+        small = self.catalog.within(0, np.inf, diameter=(0, 0.02))
+        self.assertEqual(sorted(small), [2, 3])
+        mask = self.catalog.select(material={"N-BK7"}, d=(0, 0.006))
+        self.assertEqual(list(np.flatnonzero(mask)), [1, 3])
+        with self.assertRaises(KeyError):
+            self.catalog.select(color="red")
+
+    def test_npy_round_trip(self):
+        path = os.path.join(self.directory.name, "parts.npy")
+        self.catalog.save(path)
+        loaded = LensCatalog.from_npy(path)
+        np.testing.assert_array_equal(loaded.f, self.catalog.f)
+        np.testing.assert_array_equal(loaded.columns["material"], self.catalog.columns["material"])
+
+    def test_from_elements(self):
+        lenses = [ThickLens(0.1, 1.5, 0.2, 0.01), PlanoConvexLens(0.05, 0.004, 1.5)]
+        catalog = LensCatalog.from_elements(lenses, part=["a", "b"])
+        np.testing.assert_allclose(catalog.matrices, [l.matrix for l in lenses])
+        with self.assertRaises(ValueError):
+            LensCatalog({"R1": [1], "n": [1.5]})
+
+    def test_search_with_catalog(self):
+        rng = np.random.default_rng(1)
+        R = rng.uniform(0.01, 0.25, 30)
+        catalog = LensCatalog({"R1": np.full(30, np.inf), "n": np.full(30, 1.5), "R2": R, "d": np.full(30, 4e-3)})
+        beam = GaussianBeam(633e-9, w0=0.5e-3)
+        results = search_lenses(beam, catalog, target_waist=20e-6, target_location=0.6, spacing=(0.02, 0.3), n_lenses=2, top=3, processes=1)
+        reference = search_lenses(beam, [catalog[i] for i in range(30)], target_waist=20e-6, target_location=0.6, spacing=(0.02, 0.3), n_lenses=2, top=3, processes=1)
+        self.assertEqual([r.cost for r in results], [r.cost for r in reference])
+        self.assertIsInstance(results[0].lenses[0], PlanoConvexLens)
+
+
+if __name__ == "__main__":
+    unittest.main()
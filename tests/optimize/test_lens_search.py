@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from optix.matrixopt import *
+from optix.beams import GaussianBeam
+from optix.optimize import *
+
+
+class TestSearchLenses(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, w0=0.5e-3)
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.catalog = [ThinLens(f) for f in rng.uniform(0.02, 0.5, 20)] + [PlanoConvexLens(R, 4e-3, 1.5) for R in rng.uniform(0.01, 0.25, 20)]
+
+    def assertConsistent(self, arrangement: LensArrangement):
+        out = arrangement.to_path().propagate(self.BEAM)
+        self.assertAlmostEqual(out.waist_radius, arrangement.waist_radius)
+        self.assertAlmostEqual(out.waist_location, arrangement.waist_location)
+
+    def test_two_lens_search_hits_target(self):
+        results = search_lenses(self.BEAM, self.catalog, target_waist=20e-6, target_location=0.6, spacing=(0.02, 0.3), n_lenses=2, top=5, processes=1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual([r.cost for r in results], sorted(r.cost for r in results))
+        self.assertLess(results[0].cost, 0.05)
+        for r in results:
+            self.assertEqual(len(r.lenses), 2)
+            self.assertTrue(all(0.02 <= s <= 0.3 for s in r.spacings))
+            self.assertConsistent(r)
+
+    def test_aperture_bound(self):
+        results = search_lenses(self.BEAM, self.catalog, target_waist=20e-6, target_location=0.6, spacing=(0.02, 0.3), n_lenses=2, max_radius=0.6e-3, processes=1)
+        for r in results:
+            path = r.to_path()
+            radius = beam_caustics(path, self.BEAM).w_max
+            self.assertLessEqual(radius.max(), 0.6e-3 * (1 + 1e-9))
+
+    def test_process_pool_matches_serial(self):
+        kwargs = dict(target_waist=30e-6, target_location=0.8, spacing=(0.02, 0.3), n_lenses=3, spacing_steps=4, top=3, chunk_size=10)
+        serial = search_lenses(self.BEAM, self.catalog, processes=1, **kwargs)
+        pooled = search_lenses(self.BEAM, self.catalog, processes=2, **kwargs)
+        self.assertEqual([r.cost for r in serial], [r.cost for r in pooled])
+        self.assertConsistent(pooled[0])
+
+    def test_duplicate_parts_are_searched_once(self):
+        catalog = [ThinLens(0.1), ThinLens(0.1), ThinLens(0.2)]
+        results = search_lenses(self.BEAM, catalog, target_waist=50e-6, target_location=0.5, spacing=(0.01, 0.4), n_lenses=1, top=10, processes=1)
+        self.assertTrue(results)
+        for r in results:
+            self.assertNotIn(id(catalog[1]), [id(lens) for lens in r.lenses])
@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from optix.cli import main, process
+from optix.matrixopt import OpticalPath, FreeSpace, ThinLens
+from optix.beams import GaussianBeam
+
+PATH = [{"type": "FreeSpace", "d": 0.1}, {"type": "ThinLens", "f": 0.05}, {"type": "FreeSpace", "d": 0.05}]
+
+
+def _request(i, path=PATH, **beam):
+    return json.dumps({"id": i, "beam": {"wavelength": 633e-9, **(beam or {"w0": 1e-3})}, "path": path})
+
+
+class TestCli(unittest.TestCase):
+    def run_lines(self, lines, **kwargs):
+        output = io.StringIO()
+        process(lines, output, **kwargs)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_matches_propagate(self):
+        lines = [_request(i, w0=(i + 1) * 1e-4) for i in range(10)]
+        results = self.run_lines(lines, batch_size=4)
+        path = OpticalPath(FreeSpace(0.1), ThinLens(0.05), FreeSpace(0.05))
+        self.assertEqual([r["id"] for r in results], list(range(10)))
+        for i, result in enumerate(results):
+            expected = path.propagate(GaussianBeam(633e-9, w0=(i + 1) * 1e-4))
+            self.assertAlmostEqual(result["waist_radius"], expected.waist_radius)
+            self.assertAlmostEqual(result["waist_location"], expected.waist_location)
+
+    def test_errors_do_not_stop_the_stream(self):
+        lines = [
+            _request(1), "{not json", _request(2, zr=1.0, w0=1e-3), _request(3, path=[{"type": "Unknown"}]),
+            json.dumps({"id": 4, "beam": {"wavelength": 633e-9, "w0": 1e-3}}), _request(5)]
+        results = self.run_lines(lines)
+        self.assertEqual([r.get("id") for r in results], [1, None, 2, 3, 4, 5])
+        self.assertEqual([("error" in r) for r in results], [False, True, True, True, True, False])
+
+    def test_non_physical_output_is_an_error(self):
+        flip = [{"type": "ABCDElement", "matrix": [[1, 0], [0, -1]]}]
+        output = io.StringIO()
+        process([_request(1, path=flip), _request(2)], output)
+        # Strict JSON, NaN or Infinity would raise
+        results = [json.loads(line, parse_constant=lambda c: self.fail(f"{c} in output")) for line in output.getvalue().splitlines()]
+        self.assertIn("error", results[0])
+        self.assertNotIn("error", results[1])
+
+    def test_composites_and_matrices(self):
+        path = [{"type": "Repeat", "n": 2, "element": {"type": "OpticalPath", "elements": [{"type": "FreeSpace", "d": 0.1}, {"matrix": [[1, 0], [-10, 1]]}]}}]
+        result = self.run_lines([_request(1, path=path)])[0]
+        expected = OpticalPath(FreeSpace(0.1), ThinLens(0.1), FreeSpace(0.1), ThinLens(0.1)).propagate(GaussianBeam(633e-9, w0=1e-3))
+        self.assertAlmostEqual(result["waist_location"], expected.waist_location)
+
+    def test_worker_pool_keeps_order(self):
+        other = [{"type": "FreeSpace", "d": 0.2}, {"type": "ThinLens", "f": 0.1}]
+        lines = [_request(i, path=PATH if (i // 3) % 2 else other) for i in range(30)]
+        serial = self.run_lines(lines, batch_size=2)
+        pooled = self.run_lines(lines, batch_size=2, workers=2, max_pending=2)
+        self.assertEqual(serial, pooled)
+
+    def test_main_with_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source, target = os.path.join(directory, "in.jsonl"), os.path.join(directory, "out.jsonl")
+            with open(source, "w") as f:
+                f.write("\n".join(_request(i) for i in range(3)) + "\n")
+            self.assertEqual(main([source, "-o", target]), 0)
+            with open(target) as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+import unittest
+
+
+class TestImport(unittest.TestCase):
+    # Generous budget for a cold interpreter, numpy alone takes a fraction of it
+    IMPORT_TIME_BUDGET = 1.0
+
+    def run_python(self, code: str) -> str:
+        return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+    def test_import_does_not_load_matplotlib(self):
+        out = self.run_python("import sys, optix, optix.matrixopt; print('matplotlib' in sys.modules)")
+        self.assertEqual(out.strip(), "False")
+
+    def test_import_time_budget(self):
+        out = self.run_python("import time; t = time.perf_counter(); import optix; print(time.perf_counter() - t)")
+        self.assertLess(float(out), self.IMPORT_TIME_BUDGET)
+
+    def test_drawer_is_loaded_lazily(self):
+        out = self.run_python("import sys, optix.matrixopt as m; m.Drawer; print('matplotlib' in sys.modules)")
+        self.assertEqual(out.strip(), "True")
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from optix.instrumentation import active_profile, instrument
+from optix.matrixopt import ABCDElement, ABCDCompositeElement, OpticalPath, FreeSpace, ThinLens, ThickLens
+from optix.beams import GaussianBeam
+
+
+class TestInstrumentation(unittest.TestCase):
+    BEAM = GaussianBeam(633e-9, w0=1e-3)
+
+    def test_counts_per_type_and_path(self):
+        gap = FreeSpace(0.1)
+        path = OpticalPath(gap, ThinLens(0.05), name="relay")
+        with instrument() as profile:
+            path.propagate(self.BEAM)
+            gap.matrix = FreeSpace(0.2).matrix
+            path.propagate(self.BEAM)
+            ThickLens(0.1, 1.5, 0.1, 0.01)
+        stats = profile.as_dict()
+        self.assertEqual(stats["functions"]["OpticalPath.propagate"]["OpticalPath"]["calls"], 2)
+        self.assertEqual(stats["paths"]["OpticalPath.propagate"]["relay"]["calls"], 2)
+        builds = stats["functions"]["ABCDCompositeElement._build_matrix"]
+        self.assertEqual(builds["OpticalPath"]["calls"], 1)
+        self.assertEqual(builds["ThickLens"]["calls"], 1)
+        self.assertGreater(stats["functions"]["ABCDElement.matrix"]["FreeSpace"]["calls"], 0)
+        self.assertGreater(stats["functions"]["OpticalPath.propagate"]["OpticalPath"]["time"], 0)
+
+    def test_overrides_are_counted_once(self):
+        path = OpticalPath(FreeSpace(0.1))
+        with instrument() as profile:
+            path.matrix
+        self.assertEqual(profile.as_dict()["functions"]["ABCDElement.matrix"]["OpticalPath"]["calls"], 1)
+
+    def test_disabled_restores_methods(self):
+        originals = (ABCDElement.__dict__["matrix"], ABCDCompositeElement.__dict__["_build_matrix"], OpticalPath.__dict__["propagate"])
+        with instrument():
+            self.assertIsNot(OpticalPath.__dict__["propagate"], originals[2])
+            self.assertIsNotNone(active_profile())
+        self.assertEqual((ABCDElement.__dict__["matrix"], ABCDCompositeElement.__dict__["_build_matrix"], OpticalPath.__dict__["propagate"]), originals)
+        self.assertIsNone(active_profile())
+
+    def test_chrome_trace(self):
+        with instrument() as profile:
+            OpticalPath(FreeSpace(0.1), ThinLens(0.05)).propagate(self.BEAM)
+        trace = profile.chrome_trace()
+        names = {event["name"] for event in trace["traceEvents"]}
+        self.assertIn("OpticalPath.propagate", names)
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"]))
+        json.dumps(trace)
+
+    def test_environment_variable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, "trace.json")
+            code = (
+                "import optix\n"
+                "from optix.matrixopt import OpticalPath, FreeSpace\n"
+                "from optix.beams import GaussianBeam\n"
+                "OpticalPath(FreeSpace(1)).propagate(GaussianBeam(1e-6, w0=1e-3))\n"
+                "print(optix.instrumentation.active_profile().as_dict()['functions']['OpticalPath.propagate']['OpticalPath']['calls'])\n")
+            env = dict(os.environ, OPTIX_INSTRUMENT=target)
+            out = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True).stdout
+            self.assertEqual(out.strip(), "1")
+            with open(target) as f:
+                self.assertTrue(json.load(f)["traceEvents"])
+
+
+if __name__ == "__main__":
+    unittest.main()